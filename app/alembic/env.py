@@ -39,6 +39,8 @@ from app.models.course_model import Course  # noqa
 from app.models.score_model import Score  # noqa
 from app.models.notification_model import Notification  # noqa
 from app.models.upload_history_model import UploadHistory  # noqa
+from app.models.upload_history_monthly_model import UploadHistoryMonthly  # noqa
+from app.models.user_archive_model import UserArchive  # noqa
 
 target_metadata = SQLModel.metadata
 
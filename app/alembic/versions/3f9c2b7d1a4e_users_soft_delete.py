@@ -0,0 +1,57 @@
+"""users_soft_delete
+
+Revision ID: 3f9c2b7d1a4e
+Revises: a656e3ca1e0f
+Create Date: 2026-10-19 09:12:40.115302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2b7d1a4e'
+down_revision = 'a656e3ca1e0f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('del_flag', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    # Unique email only among live rows, so deleted emails can register again
+    op.drop_index('ix_users_email', table_name='users')
+    op.create_index(
+        'ix_users_email_active', 'users', ['email'], unique=True,
+        postgresql_where=sa.text('NOT del_flag'),
+        postgresql_include=['is_active'],
+        sqlite_where=sa.text('NOT del_flag'),
+    )
+    op.create_index(
+        'ix_users_user_id_active', 'users', ['user_id'],
+        postgresql_where=sa.text('NOT del_flag'),
+        sqlite_where=sa.text('NOT del_flag'),
+    )
+
+    op.create_table('users_archive',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('fullname', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_users_archive_email'), 'users_archive', ['email'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_users_archive_email'), table_name='users_archive')
+    op.drop_table('users_archive')
+    op.drop_index('ix_users_user_id_active', table_name='users')
+    op.drop_index('ix_users_email_active', table_name='users')
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.drop_column('users', 'deleted_at')
+    op.drop_column('users', 'del_flag')
@@ -0,0 +1,33 @@
+"""notification_delivery
+
+Revision ID: 7b1e4d2c9a60
+Revises: 3f9c2b7d1a4e
+Create Date: 2026-10-19 10:05:12.480771
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1e4d2c9a60'
+down_revision = '3f9c2b7d1a4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('notification', sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
+    op.add_column('notification', sa.Column('message', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('notification', sa.Column('is_read', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('notification', sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.create_index('ix_notification_user_id_notification_id', 'notification', ['user_id', 'notification_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notification_user_id_notification_id', table_name='notification')
+    op.drop_column('notification', 'created_at')
+    op.drop_column('notification', 'is_read')
+    op.drop_column('notification', 'message')
+    op.drop_column('notification', 'title')
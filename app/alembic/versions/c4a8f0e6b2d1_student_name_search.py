@@ -0,0 +1,70 @@
+"""student_name_search
+
+Revision ID: c4a8f0e6b2d1
+Revises: 7b1e4d2c9a60
+Create Date: 2026-10-19 11:20:33.904618
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8f0e6b2d1'
+down_revision = '7b1e4d2c9a60'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+_SPECIAL_CHARS = str.maketrans({'đ': 'd', 'Đ': 'd'})
+
+
+def normalize_name(value):
+    # Frozen copy of app.core.text.normalize_name at this revision
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFD', value.translate(_SPECIAL_CHARS))
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.lower().split())
+
+
+def upgrade():
+    bind = op.get_bind()
+    op.add_column('student', sa.Column('fullname_normalized', sqlmodel.sql.sqltypes.AutoString(length=255), server_default='', nullable=False))
+
+    # Backfill with the same normalization the import pipeline uses
+    student = sa.table('student', sa.column('student_id', sa.String), sa.column('fullname', sa.String), sa.column('fullname_normalized', sa.String))
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(student.c.student_id, student.c.fullname)
+            .where(student.c.student_id > last_id)
+            .order_by(student.c.student_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            student.update()
+            .where(student.c.student_id == sa.bindparam('sid'))
+            .values(fullname_normalized=sa.bindparam('normalized')),
+            [{'sid': sid, 'normalized': normalize_name(fullname)} for sid, fullname in rows],
+        )
+        last_id = rows[-1][0]
+
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_student_fullname_normalized_trgm', 'student', ['fullname_normalized'], unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'fullname_normalized': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    op.drop_index('ix_student_fullname_normalized_trgm', table_name='student')
+    op.drop_column('student', 'fullname_normalized')
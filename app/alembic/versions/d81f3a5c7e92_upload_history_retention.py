@@ -0,0 +1,130 @@
+"""upload_history_retention
+
+Revision ID: d81f3a5c7e92
+Revises: c4a8f0e6b2d1
+Create Date: 2026-10-19 12:10:05.512877
+
+"""
+from datetime import date, datetime
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f3a5c7e92'
+down_revision = 'c4a8f0e6b2d1'
+branch_labels = None
+depends_on = None
+
+ERROR_MESSAGE_MAX_LENGTH = 4000
+PARTITIONS_AHEAD = 3
+
+COLUMNS = 'id, file_name, status, success_count, failure_count, total_processed, error_message, created_at, created_by_id'
+
+
+def _month_start(value, months_offset=0):
+    index = value.year * 12 + value.month - 1 + months_offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(dialect, month):
+    # DDL không nhận bind parameter: tên quote theo dialect, bound render thành literal
+    name = dialect.identifier_preparer.quote(f"upload_history_p{month:%Y%m}")
+    lower, upper = (
+        sa.literal(value, sa.Date()).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        for value in (month, _month_start(month, 1))
+    )
+    op.execute(f"CREATE TABLE {name} PARTITION OF upload_history FOR VALUES FROM ({lower}) TO ({upper})")
+
+
+def upgrade():
+    dialect = op.get_context().dialect
+
+    op.create_table('upload_history_monthly',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('created_by_id', sa.Integer(), nullable=True),
+    sa.Column('uploads', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('total_processed', sa.Integer(), nullable=False),
+    sa.Column('success_count', sa.Integer(), nullable=False),
+    sa.Column('failure_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('created_by_id', 'month', name='uq_upload_history_monthly_user_month')
+    )
+
+    # Bound error_message
+    op.execute(
+        sa.text(
+            "UPDATE upload_history SET error_message = substr(error_message, 1, :max_length) "
+            "WHERE length(error_message) > :max_length"
+        ).bindparams(max_length=ERROR_MESSAGE_MAX_LENGTH)
+    )
+
+    if dialect.name != 'postgresql':
+        op.create_index('ix_upload_history_created_by_id_created_at', 'upload_history', ['created_by_id', 'created_at'], unique=False)
+        return
+
+    # PostgreSQL: chuyển sang bảng partition theo tháng (RANGE created_at).
+    # Primary key của bảng partition phải chứa partition key: (id, created_at).
+    op.execute('ALTER TABLE upload_history RENAME TO upload_history_legacy')
+    op.execute('ALTER TABLE upload_history_legacy RENAME CONSTRAINT upload_history_pkey TO upload_history_legacy_pkey')
+    op.execute(f"""
+        CREATE TABLE upload_history (
+            id INTEGER NOT NULL DEFAULT nextval('upload_history_id_seq'),
+            file_name VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            success_count INTEGER NOT NULL,
+            failure_count INTEGER NOT NULL,
+            total_processed INTEGER NOT NULL,
+            error_message VARCHAR({int(ERROR_MESSAGE_MAX_LENGTH)}),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_by_id INTEGER REFERENCES users (user_id),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('CREATE TABLE upload_history_default PARTITION OF upload_history DEFAULT')
+
+    # Offline (--sql): không đọc được dữ liệu, chỉ tạo partition từ tháng hiện tại
+    oldest = None
+    if not context.is_offline_mode():
+        oldest = op.get_bind().execute(sa.text('SELECT min(created_at) FROM upload_history_legacy')).scalar()
+    current = _month_start(datetime.utcnow().date())
+    month = _month_start(oldest) if oldest else current
+    while month <= _month_start(current, PARTITIONS_AHEAD):
+        _create_partition(dialect, month)
+        month = _month_start(month, 1)
+
+    op.execute(f'INSERT INTO upload_history ({COLUMNS}) SELECT {COLUMNS} FROM upload_history_legacy')
+    op.execute('ALTER SEQUENCE upload_history_id_seq OWNED BY upload_history.id')
+    op.execute('DROP TABLE upload_history_legacy')
+    op.create_index('ix_upload_history_created_by_id_created_at', 'upload_history', ['created_by_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE upload_history RENAME TO upload_history_partitioned')
+        op.execute('ALTER TABLE upload_history_partitioned RENAME CONSTRAINT upload_history_pkey TO upload_history_partitioned_pkey')
+        op.execute("""
+            CREATE TABLE upload_history (
+                id INTEGER NOT NULL DEFAULT nextval('upload_history_id_seq'),
+                file_name VARCHAR NOT NULL,
+                status VARCHAR NOT NULL,
+                success_count INTEGER NOT NULL,
+                failure_count INTEGER NOT NULL,
+                total_processed INTEGER NOT NULL,
+                error_message VARCHAR,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                created_by_id INTEGER REFERENCES users (user_id),
+                PRIMARY KEY (id)
+            )
+        """)
+        op.execute(f'INSERT INTO upload_history ({COLUMNS}) SELECT {COLUMNS} FROM upload_history_partitioned')
+        op.execute('ALTER SEQUENCE upload_history_id_seq OWNED BY upload_history.id')
+        op.execute('DROP TABLE upload_history_partitioned')
+    else:
+        op.drop_index('ix_upload_history_created_by_id_created_at', table_name='upload_history')
+    op.drop_table('upload_history_monthly')
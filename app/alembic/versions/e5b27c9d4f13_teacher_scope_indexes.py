@@ -0,0 +1,29 @@
+"""teacher_scope_indexes
+
+Revision ID: e5b27c9d4f13
+Revises: d81f3a5c7e92
+Create Date: 2026-10-19 13:02:41.274193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b27c9d4f13'
+down_revision = 'd81f3a5c7e92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_class_user_id'), 'class', ['user_id'], unique=False)
+    op.create_index(op.f('ix_student_class_id'), 'student', ['class_id'], unique=False)
+    op.create_index(op.f('ix_score_student_id'), 'score', ['student_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_score_student_id'), table_name='score')
+    op.drop_index(op.f('ix_student_class_id'), table_name='student')
+    op.drop_index(op.f('ix_class_user_id'), table_name='class')
@@ -0,0 +1,74 @@
+"""write_path_indexes
+
+Revision ID: f7a3c1d9b284
+Revises: e5b27c9d4f13
+Create Date: 2026-10-19 14:21:37.908145
+
+"""
+import logging
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a3c1d9b284'
+down_revision = 'e5b27c9d4f13'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Bản ghi score có 1 bản ghi khác cùng (student_id, course_id) tốt hơn: điểm cao
+# hơn (NULL thấp nhất), cùng điểm thì id_score lớn hơn
+_DUPLICATE_SCORES = (
+    "FROM score "
+    "WHERE student_id IS NOT NULL AND course_id IS NOT NULL "
+    "AND EXISTS ("
+    "SELECT 1 FROM score AS better "
+    "WHERE better.student_id = score.student_id "
+    "AND better.course_id = score.course_id "
+    "AND (COALESCE(better.score, -1) > COALESCE(score.score, -1) "
+    "OR (COALESCE(better.score, -1) = COALESCE(score.score, -1) "
+    "AND better.id_score > score.id_score)))"
+)
+
+
+def upgrade():
+    op.create_index(op.f('ix_class_major_id'), 'class', ['major_id'], unique=False)
+    op.create_index(op.f('ix_class_intake_id'), 'class', ['intake_id'], unique=False)
+    op.create_index(op.f('ix_course_major_id'), 'course', ['major_id'], unique=False)
+    op.create_index(op.f('ix_course_intake_id'), 'course', ['intake_id'], unique=False)
+    op.create_index(op.f('ix_users_role_id'), 'users', ['role_id'], unique=False)
+    op.create_index(op.f('ix_score_course_id'), 'score', ['course_id'], unique=False)
+
+    # Trùng (student_id, course_id): giữ điểm cao nhất, cùng điểm thì bản ghi mới nhất
+    if not context.is_offline_mode():
+        duplicates = op.get_bind().execute(
+            sa.text(f"SELECT count(*) {_DUPLICATE_SCORES}")
+        ).scalar()
+        if duplicates:
+            logger.warning(
+                "Deleting %d duplicate score rows (same student_id, course_id), "
+                "keeping the highest score of each pair",
+                duplicates,
+            )
+    op.execute(f"DELETE {_DUPLICATE_SCORES}")
+    # Unique constraint thay thế index đơn trên student_id (cột đầu của constraint)
+    with op.batch_alter_table('score') as batch_op:
+        batch_op.create_unique_constraint('uq_score_student_id_course_id', ['student_id', 'course_id'])
+    op.drop_index(op.f('ix_score_student_id'), table_name='score')
+
+
+def downgrade():
+    # Bản ghi trùng đã xóa khi upgrade không được khôi phục
+    op.create_index(op.f('ix_score_student_id'), 'score', ['student_id'], unique=False)
+    with op.batch_alter_table('score') as batch_op:
+        batch_op.drop_constraint('uq_score_student_id_course_id', type_='unique')
+    op.drop_index(op.f('ix_score_course_id'), table_name='score')
+    op.drop_index(op.f('ix_users_role_id'), table_name='users')
+    op.drop_index(op.f('ix_course_intake_id'), table_name='course')
+    op.drop_index(op.f('ix_course_major_id'), table_name='course')
+    op.drop_index(op.f('ix_class_intake_id'), table_name='class')
+    op.drop_index(op.f('ix_class_major_id'), table_name='class')
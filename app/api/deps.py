@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from typing import Annotated
 
 import jwt
@@ -10,7 +10,14 @@ from sqlmodel import Session
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import engine, replica_router
+from app.core.permissions import Permission, permission_registry
+from app.core.scope import (
+    UNRESTRICTED,
+    StudentScope,
+    restrict_session,
+    teacher_class_registry,
+)
 from app.models.user_model import User
 from app.api.schemas.token import TokenPayload
 
@@ -29,6 +36,47 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+# Read-only session: replica nếu có cấu hình, primary ngay sau write của user
+# hoặc khi replica lag. Token chỉ dùng để định tuyến, auth vẫn do route kiểm tra.
+# Khi đọc từ primary thì dùng lại session của request (SessionDep, cache theo
+# request) thay vì giữ connection thứ 2 của cùng pool: route vừa auth vừa đọc
+# sẽ chiếm 2 connection/request và làm cạn pool khi tải cao.
+def get_read_db(session: SessionDep, token: TokenDep) -> Generator[Session, None, None]:
+    user_id: int | None = None
+    if token:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            sub = TokenPayload(**payload).sub
+            user_id = int(sub) if sub is not None else None
+        except (InvalidTokenError, ValidationError, ValueError):
+            pass
+    read_engine = replica_router.engine_for_read(user_id)
+    if read_engine is engine:
+        yield session
+        return
+    with Session(read_engine) as read_session:
+        yield read_session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+
+
+# `sub` claim -> user_id; a token without a numeric subject is not authenticated
+def _token_user_id(token_data: TokenPayload) -> int:
+    try:
+        if token_data.sub is None:
+            raise ValueError("missing sub claim")
+        return int(token_data.sub)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 # Get current user
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
@@ -42,12 +90,14 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             detail="Could not validate credentials",
         )
     # Convert to integer user_id
-    user_id = int(token_data.sub)
+    user_id = _token_user_id(token_data)
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Writes của session này bật read-your-writes cho user (ReadSessionDep)
+    session.info["user_id"] = user.user_id
     return user
 
 
@@ -55,6 +105,25 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+# Get current user id from the token only, without loading the user (no DB query).
+# Used by long-lived / polling endpoints where a query per request is too expensive.
+def get_current_user_id(token: TokenDep) -> int:
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+        )
+        token_data = TokenPayload(**payload)
+    except (InvalidTokenError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    return _token_user_id(token_data)
+
+
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
+
+
 # Get current user optional, if token is None, return None. It is used for anonymous user - guest.
 def get_current_user_optional(
     session: SessionDep, token: TokenDep | None = Depends(reusable_oauth2)
@@ -69,8 +138,11 @@ def get_current_user_optional(
     except (InvalidTokenError, ValidationError):
         # If the token is invalid, we can treat it as an anonymous user.
         return None
+    try:
+        user_id = _token_user_id(token_data)
+    except HTTPException:
+        return None
 
-    user_id = int(token_data.sub)
     user = session.get(User, user_id)
     if not user or not user.is_active:
         # If user not found or inactive, treat as an anonymous user.
@@ -82,10 +154,40 @@ def get_current_user_optional(
 CurrentUserOptional = Annotated[User | None, Depends(get_current_user_optional)]
 
 
-# Get current active superuser
-def get_current_active_superuser(current_user: CurrentUser) -> User:
-    if not current_user.is_superuser:
+# Get current active superuser (Role.is_superuser via the cached role map)
+def get_current_active_superuser(session: SessionDep, current_user: CurrentUser) -> User:
+    if not permission_registry.is_superuser(session, current_user.role_id):
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+# Dependency factory: route declares the permissions it requires
+def require_permissions(*permissions: Permission) -> Callable[..., User]:
+    def _require_permissions(session: SessionDep, current_user: CurrentUser) -> User:
+        if not permission_registry.has_permissions(
+            session, current_user.role_id, *permissions
+        ):
+            raise HTTPException(
+                status_code=403, detail="The user doesn't have enough privileges"
+            )
+        return current_user
+
+    return _require_permissions
+
+
+# Row-level scope: superuser thấy tất cả, user khác chỉ thấy sinh viên thuộc
+# class mình phụ trách (Class.user_id). Scope cũng được áp cho mọi SELECT trên
+# student / score của session request (app.core.scope.restrict_session)
+def get_student_scope(session: SessionDep, current_user: CurrentUser) -> StudentScope:
+    if permission_registry.is_superuser(session, current_user.role_id):
+        return UNRESTRICTED
+    scope = StudentScope(
+        class_ids=teacher_class_registry.class_ids(session, current_user.user_id)
+    )
+    restrict_session(session, scope)
+    return scope
+
+
+ScopeDep = Annotated[StudentScope, Depends(get_student_scope)]
@@ -0,0 +1,35 @@
+from sqlmodel import Session
+
+from app.api.services.upload_history_service import UploadHistoryService
+from app.api.services.user_service import UserService
+from app.core.config import settings
+from app.core.scheduler import Scheduler
+
+scheduler = Scheduler()
+
+
+def archive_deleted_users(session: Session) -> int:
+    return UserService(session).archive_deleted_users(
+        older_than_days=settings.USER_ARCHIVE_AFTER_DAYS,
+        batch_size=settings.USER_ARCHIVE_BATCH_SIZE,
+    )
+
+
+scheduler.add_job(
+    "archive_deleted_users",
+    settings.USER_ARCHIVE_INTERVAL_SECONDS,
+    archive_deleted_users,
+)
+
+
+def maintain_upload_history(session: Session) -> int:
+    service = UploadHistoryService(session)
+    service.ensure_partitions(settings.UPLOAD_HISTORY_PARTITIONS_AHEAD)
+    return service.compact(settings.UPLOAD_HISTORY_RETENTION_MONTHS)
+
+
+scheduler.add_job(
+    "maintain_upload_history",
+    settings.UPLOAD_HISTORY_MAINTENANCE_INTERVAL_SECONDS,
+    maintain_upload_history,
+)
@@ -1,7 +1,22 @@
 from fastapi import APIRouter
 
-from app.api.routes import login, students_upload
+from app.api.routes import (
+    login,
+    notifications,
+    reference,
+    students,
+    students_upload,
+    upload_history,
+    users,
+    utils,
+)
 
 api_router = APIRouter()
 api_router.include_router(login.router)
+api_router.include_router(users.router)
 api_router.include_router(students_upload.router, prefix="/students", tags=["students"])
+api_router.include_router(students.router, prefix="/students", tags=["students"])
+api_router.include_router(reference.router)
+api_router.include_router(notifications.router)
+api_router.include_router(upload_history.router)
+api_router.include_router(utils.router)
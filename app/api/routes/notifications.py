@@ -0,0 +1,181 @@
+"""
+Notification Routes
+Inbox, gửi notification hàng loạt, và realtime delivery qua long-poll / SSE.
+Client đang chờ (idle) không tốn query DB: chỉ chờ trên in-process pub/sub.
+
+Khi subscribe luôn query notification bị lỡ (1 query theo index), trừ khi
+broker dùng chung giữa các worker và latest_ids (có TTL) đã biết không có gì mới:
+với LocalBroker, notification tạo ở worker khác chỉ thấy được qua DB.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import (
+    CurrentUser,
+    CurrentUserId,
+    ReadSessionDep,
+    SessionDep,
+    require_permissions,
+)
+from app.api.schemas.message import Message
+from app.api.schemas.notification import (
+    NotificationCreate,
+    NotificationPublic,
+    NotificationsPublic,
+    NotificationsRead,
+)
+from app.api.services.notification_service import (
+    NotificationService,
+    latest_ids,
+    user_topic,
+)
+from app.core.config import settings
+from app.core.db import engine
+from app.core.permissions import Permission
+from app.core.pubsub import broker
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+
+def _load_after(user_id: int, after_id: int) -> list[dict[str, Any]]:
+    with Session(engine) as session:
+        notifications = NotificationService(session).list_notifications(
+            user_id, after_id=after_id, limit=100
+        )
+        return [
+            NotificationPublic.model_validate(n).model_dump(mode="json")
+            for n in notifications
+        ]
+
+
+@router.get("/", response_model=NotificationsPublic)
+def read_notifications(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    after_id: int = 0,
+    limit: int = 50,
+) -> Any:
+    """
+    List own notifications newer than `after_id`.
+    """
+    notifications = NotificationService(session).list_notifications(
+        current_user.user_id, after_id=after_id, limit=min(limit, 100)
+    )
+    return NotificationsPublic(data=notifications, count=len(notifications))
+
+
+@router.post(
+    "/",
+    dependencies=[Depends(require_permissions(Permission.NOTIFICATIONS_SEND))],
+    response_model=Message,
+)
+def send_notification(session: SessionDep, body: NotificationCreate) -> Any:
+    """
+    Send a notification to users and/or to the teachers of classes.
+    """
+    service = NotificationService(session)
+    count = service.notify_users(body.user_ids, body.title, body.message)
+    count += service.notify_class_teachers(body.class_ids, body.title, body.message)
+    return Message(message=f"{count} notifications sent")
+
+
+@router.post("/read", response_model=Message)
+def mark_notifications_read(
+    session: SessionDep, current_user: CurrentUser, body: NotificationsRead
+) -> Any:
+    """
+    Mark own notifications as read.
+    """
+    count = NotificationService(session).mark_read(
+        current_user.user_id, body.notification_ids
+    )
+    return Message(message=f"{count} notifications marked as read")
+
+
+@router.get("/poll", response_model=list[NotificationPublic])
+async def poll_notifications(
+    user_id: CurrentUserId,
+    after_id: int = 0,
+    timeout: int = Query(default=25, ge=0),
+) -> Any:
+    """
+    Long-poll: return notifications newer than `after_id`, or wait up to
+    `timeout` seconds for a new one. Returns an empty list on timeout.
+    """
+    timeout = min(timeout, settings.NOTIFICATION_POLL_TIMEOUT_SECONDS)
+    async with broker.subscribe(user_topic(user_id)) as subscription:
+        if _may_have_missed(user_id, after_id):
+            missed = await run_in_threadpool(_load_after, user_id, after_id)
+            if missed:
+                return missed
+        try:
+            message = await subscription.get(timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        latest_ids.advance(user_id, message["notification_id"])
+        return [message]
+
+
+@router.get("/stream")
+async def stream_notifications(
+    user_id: CurrentUserId,
+    last_event_id: int | None = Header(default=None),
+    after_id: int = 0,
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of own notifications.
+    Resumes from `Last-Event-ID` (or `after_id`) after a reconnect.
+    """
+    resume_from = last_event_id if last_event_id is not None else after_id
+
+    async def events() -> AsyncIterator[str]:
+        async with broker.subscribe(user_topic(user_id)) as subscription:
+            last_sent = resume_from
+            if _may_have_missed(user_id, resume_from):
+                for notification in await run_in_threadpool(
+                    _load_after, user_id, resume_from
+                ):
+                    last_sent = notification["notification_id"]
+                    yield _sse_event(notification)
+            while True:
+                try:
+                    notification = await subscription.get(
+                        timeout=settings.NOTIFICATION_SSE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if notification["notification_id"] <= last_sent:
+                    continue
+                last_sent = notification["notification_id"]
+                yield _sse_event(notification)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _may_have_missed(user_id: int, after_id: int) -> bool:
+    """False chỉ khi chắc chắn không có notification nào mới hơn after_id"""
+    if not broker.shared:
+        return True
+    latest = latest_ids.get(user_id)
+    return latest is None or latest > after_id
+
+
+def _sse_event(notification: dict[str, Any]) -> str:
+    return (
+        f"id: {notification['notification_id']}\n"
+        f"event: notification\n"
+        f"data: {json.dumps(notification, ensure_ascii=False)}\n\n"
+    )
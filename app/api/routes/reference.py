@@ -0,0 +1,118 @@
+"""
+Reference Data Routes
+Major, Intake, Course, Class, Role - đọc nhiều, ghi rất ít.
+Trả về strong ETag và 304 khi If-None-Match khớp (không chạm DB nếu cache hit).
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, File, Request, Response, UploadFile
+
+from app.api.deps import SessionDep, require_permissions
+from app.api.schemas.reference import BulkLoadResult
+from app.api.services.reference_bulk_load_service import ReferenceBulkLoadService
+from app.api.services.reference_service import ReferenceService
+from app.core.cache import CacheEntry
+from app.core.config import settings
+from app.core.permissions import Permission
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.intake_model import Intake
+from app.models.major_model import Major
+from app.models.role_model import Role
+
+router = APIRouter(prefix="/reference", tags=["reference"])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match dùng weak comparison (RFC 9110), bỏ prefix W/"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def _reference_response(
+    request: Request, session: SessionDep, namespace: str
+) -> Response:
+    entry: CacheEntry = ReferenceService(session).get(namespace)
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE_SECONDS}, must-revalidate",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.value, media_type="application/json", headers=headers)
+
+
+@router.get("/majors", response_model=list[Major])
+def read_majors(request: Request, session: SessionDep) -> Response:
+    """
+    List majors
+    """
+    return _reference_response(request, session, "majors")
+
+
+@router.get("/intakes", response_model=list[Intake])
+def read_intakes(request: Request, session: SessionDep) -> Response:
+    """
+    List intakes
+    """
+    return _reference_response(request, session, "intakes")
+
+
+@router.get("/courses", response_model=list[Course])
+def read_courses(request: Request, session: SessionDep) -> Response:
+    """
+    List courses
+    """
+    return _reference_response(request, session, "courses")
+
+
+@router.get("/classes", response_model=list[Class])
+def read_classes(request: Request, session: SessionDep) -> Response:
+    """
+    List classes
+    """
+    return _reference_response(request, session, "classes")
+
+
+@router.get("/roles", response_model=list[Role])
+def read_roles(request: Request, session: SessionDep) -> Response:
+    """
+    List roles
+    """
+    return _reference_response(request, session, "roles")
+
+
+@router.post(
+    "/bulk-load",
+    response_model=BulkLoadResult,
+    dependencies=[Depends(require_permissions(Permission.REFERENCE_WRITE))],
+)
+def bulk_load_reference(
+    session: SessionDep, files: list[UploadFile] = File(...)
+) -> Any:
+    """
+    Load majors, intakes, classes và courses trong 1 transaction.
+
+    **Bundle:**
+    - Nhiều file CSV: `majors.csv`, `intakes.csv`, `classes.csv`, `courses.csv`
+    - Hoặc 1 file `.zip` chứa các CSV trên (tối đa IMPORT_MAX_ZIP_MEMBERS file,
+      tổng dung lượng giải nén tối đa IMPORT_MAX_DECOMPRESSED_BYTES)
+
+    **Columns:**
+    - majors: `major_name`
+    - intakes: `kdb`, optional `tdc`, `sum_tc`
+    - classes: `class_name`, optional `major_name`/`major_id`, `kdb`/`intake_id`,
+      `teacher_email`/`user_id`
+    - courses: `course_name`, `major_name`/`major_id`, `kdb`/`intake_id`,
+      optional `tcdh`, `is_bb` (natural key: course_name + major + intake)
+
+    Foreign key được resolve theo tên (natural key), kể cả các row trong cùng bundle.
+    Row có natural key đã tồn tại sẽ được update. Nếu có lỗi ở bất kỳ row nào,
+    không có gì được ghi (status: FAILED, xem `errors`).
+    """
+    return ReferenceBulkLoadService(session).load(files)
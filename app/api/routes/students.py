@@ -0,0 +1,146 @@
+"""
+Students Routes
+Đọc dữ liệu sinh viên (search, statistics, ...)
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.deps import ScopeDep, SessionDep, require_permissions
+from app.api.schemas.graduation import GraduationReport
+from app.api.schemas.student import ClassStats, StudentRank, StudentSearchResult
+from app.api.schemas.transcript import Transcript
+from app.api.services.graduation_service import GraduationService
+from app.api.services.student_rank_service import StudentRankService
+from app.api.services.student_search_service import StudentSearchService
+from app.api.services.student_stats_service import StudentStatsService
+from app.api.services.transcript_service import TranscriptService
+from app.core.permissions import Permission
+from app.core.scope import StudentScope
+
+router = APIRouter(
+    dependencies=[Depends(require_permissions(Permission.STUDENTS_READ))]
+)
+
+
+def _check_class(scope: StudentScope, class_id: int) -> None:
+    """404 cho class ngoài scope, không tiết lộ class có tồn tại hay không"""
+    if not scope.allows_class(class_id):
+        raise HTTPException(status_code=404, detail="Class not found")
+
+
+@router.get("/stats/classes", response_model=list[ClassStats])
+def read_class_stats(
+    session: SessionDep, scope: ScopeDep, class_ids: list[int] = Query(...)
+) -> Any:
+    """
+    Student count and average GPA per class (cached, refreshed after imports).
+    Reads the primary: cache misses filled from a lagging replica would stay stale.
+    Classes outside the caller's scope are left out.
+    """
+    return StudentStatsService(session).get_class_stats(scope.filter_classes(class_ids))
+
+
+@router.get("/search", response_model=list[StudentSearchResult])
+def search_students(
+    session: SessionDep,
+    scope: ScopeDep,
+    q: str = Query(min_length=1, max_length=255),
+    limit: int = Query(default=10, ge=1, le=50),
+) -> Any:
+    """
+    Search students by name, accent- and case-insensitive, ranked by similarity.
+    "nguyen van a" matches "Nguyễn Văn A".
+    Reads the primary: the in-memory index built on a cache miss from a lagging
+    replica would stay stale.
+    """
+    return StudentSearchService(session).search(q, limit, scope)
+
+
+@router.get(
+    "/transcripts",
+    response_model=list[Transcript],
+    dependencies=[Depends(require_permissions(Permission.SCORES_READ))],
+)
+def read_class_transcripts(session: SessionDep, scope: ScopeDep, class_id: int) -> Any:
+    """
+    Transcripts of every student in a class, loaded in one query.
+    """
+    _check_class(scope, class_id)
+    return TranscriptService(session).get_class_transcripts(class_id)
+
+
+@router.get(
+    "/graduation-progress",
+    response_model=GraduationReport,
+    dependencies=[Depends(require_permissions(Permission.SCORES_READ))],
+)
+def read_graduation_progress(
+    session: SessionDep,
+    scope: ScopeDep,
+    class_id: int | None = None,
+    intake_id: int | None = None,
+    at_risk_only: bool = False,
+) -> Any:
+    """
+    Earned credits against Intake.sum_tc and mandatory courses for a class or a whole intake.
+    Students are compared with their intake; `at_risk_only` returns only flagged students.
+    """
+    service = GraduationService(session)
+    if class_id is not None:
+        _check_class(scope, class_id)
+        return service.class_report(class_id, at_risk_only)
+    if intake_id is not None:
+        return service.intake_report(intake_id, at_risk_only=at_risk_only, scope=scope)
+    raise HTTPException(status_code=400, detail="class_id or intake_id is required")
+
+
+@router.get(
+    "/rankings",
+    response_model=list[StudentRank],
+    dependencies=[Depends(require_permissions(Permission.SCORES_READ))],
+)
+def read_class_ranking(session: SessionDep, scope: ScopeDep, class_id: int) -> Any:
+    """
+    Students of a class ordered by GPA rank, with their class, major and intake rank.
+    """
+    _check_class(scope, class_id)
+    ranking = StudentRankService(session).get_class_ranking(class_id)
+    if ranking is None:
+        raise HTTPException(status_code=404, detail="Class not found")
+    return ranking
+
+
+@router.get(
+    "/{student_id}/rank",
+    response_model=StudentRank,
+    dependencies=[Depends(require_permissions(Permission.SCORES_READ))],
+)
+def read_student_rank(session: SessionDep, scope: ScopeDep, student_id: str) -> Any:
+    """
+    GPA rank and percentile within the student's class, major and intake.
+    Served from in-memory sorted GPA arrays; window functions while the index builds.
+    """
+    rank = StudentRankService(session).get_rank(student_id)
+    if rank is None or not scope.allows_class(
+        rank.class_rank.group_id if rank.class_rank else None
+    ):
+        raise HTTPException(status_code=404, detail="Student not found")
+    return rank
+
+
+@router.get(
+    "/{student_id}/transcript",
+    response_model=Transcript,
+    dependencies=[Depends(require_permissions(Permission.SCORES_READ))],
+)
+def read_transcript(session: SessionDep, scope: ScopeDep, student_id: str) -> Any:
+    """
+    Scores per course with credit-weighted average (10-point scale) and GPA (4-point scale).
+    Cached per student, invalidated when the student's scores change.
+    """
+    transcript = TranscriptService(session).get_transcript(student_id)
+    if transcript is None or not scope.allows_class(transcript.class_id):
+        raise HTTPException(status_code=404, detail="Student not found")
+    return transcript
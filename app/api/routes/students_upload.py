@@ -4,12 +4,14 @@ Upload CSV file để import danh sách sinh viên
 """
 from typing import Any
 
-from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi import APIRouter, UploadFile, File, Depends, Query
 from sqlmodel import Session
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import ScopeDep, SessionDep, require_permissions
+from app.api.schemas.student import StudentUploadResult
 from app.api.services.student_service import StudentService
-from app.models.upload_history_model import UploadHistory
+from app.core.permissions import Permission
+from app.models.user_model import User
 
 router = APIRouter()
 
@@ -17,30 +19,45 @@ router = APIRouter()
 @router.post(
     "/upload-csv",
     summary="Upload CSV file to import students",
-    response_model=UploadHistory
+    response_model=StudentUploadResult
 )
-async def upload_students_csv(
-    current_user: CurrentUser,
+def upload_students_csv(
     session: SessionDep,
+    scope: ScopeDep,
+    current_user: User = Depends(require_permissions(Permission.STUDENTS_IMPORT)),
     file: UploadFile = File(...),
+    detect_duplicates: bool = Query(
+        default=False,
+        description="Report students that look like duplicates (same name + dob, different student_id)"
+    ),
 ) -> Any:
     """
     Upload CSV file chứa thông tin sinh viên.
-    
+
     **CSV Format:**
     - Required columns: `student_id`, `fullname`
     - Optional columns: `dob`, `gpa`, `class_id`
-    
+    - File có thể nén gzip (`.csv.gz`), được giải nén dạng stream
+
+    `class_id` nhận id hoặc class_name (vd. `65CNTT1`); class không tồn tại
+    làm row bị reject trước khi ghi vào DB (xem `errors`).
+
+    Yêu cầu permission `students:import` (role Teacher hoặc superuser). User
+    chưa được gán role, gồm cả tài khoản tự đăng ký qua `/users/signup`, bị 403.
+
+    Giáo viên (không phải superuser) chỉ import được vào class mình phụ trách:
+    `class_id` bắt buộc, và sinh viên đã có thuộc class khác bị reject.
+
     **Date format:**
     - Supported: YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY
-    
+
     **Example CSV:**
     ```
     student_id,fullname,dob,gpa,class_id
     SV001,Nguyen Van A,2000-01-15,3.5,1
     SV002,Tran Thi B,2000-05-20,3.8,1
     ```
-    
+
     **Process:**
     1. Create upload history record (status: PROCESSING)
     2. Validate CSV format and headers
@@ -48,15 +65,24 @@ async def upload_students_csv(
        - If student exists: update information
        - If student doesn't exist: create new
     4. Update history with result (status: COMPLETED/FAILED)
-    
+
+    **Duplicate detection** (`detect_duplicates=true`):
+    Rows có dob được so với các row khác trong file và với sinh viên đã có
+    (blocking theo tên đã bỏ dấu + dob). Kết quả trong `suspected_duplicates`,
+    các row vẫn được import bình thường.
+
     **Response:**
     Returns UploadHistory với thông tin:
     - total_processed: Tổng số rows đã xử lý
     - success_count: Số rows thành công
     - failure_count: Số rows thất bại
     - status: COMPLETED hoặc FAILED
+    - errors: Lý do từng row bị reject
+    - suspected_duplicates: Các sinh viên nghi trùng (nếu bật detect_duplicates)
     """
     service = StudentService(session)
-    result = await service.import_students_from_csv(file, current_user)
-    
+    result = service.import_students_from_csv(
+        file, current_user, detect_duplicates=detect_duplicates, scope=scope
+    )
+
     return result
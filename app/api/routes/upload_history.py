@@ -0,0 +1,60 @@
+"""
+Upload History Routes
+Lịch sử upload (student import, bulk user jobs) phân trang bằng cursor
+và các tổng hợp theo tháng sau khi retention job gộp entry cũ.
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.deps import CurrentUser, ReadSessionDep
+from app.api.schemas.upload_history import UploadHistoriesPublic
+from app.api.services.upload_history_service import UploadHistoryService
+from app.core.permissions import permission_registry
+from app.models.upload_history_monthly_model import UploadHistoryMonthly
+from app.models.user_model import User
+
+router = APIRouter(prefix="/upload-history", tags=["upload-history"])
+
+
+def _target_user_id(
+    session: ReadSessionDep, current_user: User, user_id: int | None
+) -> int | None:
+    """Superuser xem được history của user khác (hoặc tất cả), user thường chỉ của mình"""
+    if permission_registry.is_superuser(session, current_user.role_id):
+        return user_id
+    if user_id is not None and user_id != current_user.user_id:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user.user_id
+
+
+@router.get("/", response_model=UploadHistoriesPublic)
+def read_upload_history(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    user_id: int | None = None,
+) -> Any:
+    """
+    Upload history, mới nhất trước. Truyền `next_cursor` của response vào
+    `cursor` để lấy trang tiếp theo.
+    """
+    return UploadHistoryService(session).list_history(
+        _target_user_id(session, current_user, user_id), cursor, limit
+    )
+
+
+@router.get("/monthly", response_model=list[UploadHistoryMonthly])
+def read_upload_history_monthly(
+    session: ReadSessionDep, current_user: CurrentUser, user_id: int | None = None
+) -> Any:
+    """
+    Tổng hợp theo tháng của các upload đã quá thời gian lưu chi tiết.
+    """
+    return UploadHistoryService(session).list_monthly(
+        _target_user_id(session, current_user, user_id)
+    )
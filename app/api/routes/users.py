@@ -1,21 +1,27 @@
-import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select, update
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from sqlmodel import Session, func, select
 
 from app.api.deps import (
     CurrentUser,
+    ReadSessionDep,
     SessionDep,
-    get_current_active_superuser,
+    require_permissions,
 )
+from app.api.services.user_provisioning_service import UserProvisioningService
 from app.api.services.user_service import UserService
-from app.core.config import settings
+from app.core.db import engine
+from app.core.permissions import Permission, permission_registry
 from app.core.security import get_password_hash, verify_password
 from app.api.schemas.message import Message
+from app.models.upload_history_model import UploadHistory
 from app.models.user_model import User
-from app.serializers.user_serializer import (
+from app.api.schemas.user import (
     UpdatePassword,
+    UserBulkCreate,
+    UserBulkResult,
+    UserBulkRowResult,
     UserCreate,
     UserPublic,
     UserRegister,
@@ -29,10 +35,10 @@ router = APIRouter(prefix="/users", tags=["users"])
 # Get all users
 @router.get(
     "/",
-    dependencies=[Depends(get_current_active_superuser)],
+    dependencies=[Depends(require_permissions(Permission.USERS_READ))],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(session: ReadSessionDep, skip: int = 0, limit: int = 100) -> Any:
     """
     Retrieve users.
     """
@@ -47,7 +53,9 @@ def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
 
 # Create a new user
 @router.post(
-    "/", dependencies=[Depends(get_current_active_superuser)], response_model=UserPublic
+    "/",
+    dependencies=[Depends(require_permissions(Permission.USERS_WRITE))],
+    response_model=UserPublic,
 )
 def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     """
@@ -66,6 +74,92 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     # Email notification removed - admin should inform user manually
     return user
 
+# Bulk create users (JSON)
+@router.post(
+    "/bulk",
+    dependencies=[Depends(require_permissions(Permission.USERS_WRITE))],
+    response_model=UserBulkResult,
+)
+def create_users_bulk(*, session: SessionDep, body: UserBulkCreate) -> Any:
+    """
+    Create many users at once.
+    Emails are checked in one query, passwords are hashed in parallel and
+    new users are inserted in one batched statement. Returns per-row results.
+    """
+    service = UserProvisioningService(session)
+    return service.provision_users(body.users)
+
+# Bulk create users (CSV)
+@router.post(
+    "/bulk/upload-csv",
+    dependencies=[Depends(require_permissions(Permission.USERS_WRITE))],
+    response_model=UserBulkResult,
+)
+def create_users_bulk_csv(
+    session: SessionDep, file: UploadFile = File(...)
+) -> Any:
+    """
+    Create many users from a CSV file.
+    Sync route: bcrypt hashing and the insert run in the threadpool, not on the event loop.
+
+    **CSV Format:**
+    - Required columns: `email`, `password`
+    - Optional columns: `fullname`, `role_id`, `is_active`
+    """
+    service = UserProvisioningService(session)
+    return service.provision_users_from_csv(file)
+
+
+def _run_provisioning_job(
+    history_id: int,
+    candidates: list[tuple[int, UserCreate]],
+    invalid: list[UserBulkRowResult],
+) -> None:
+    with Session(engine) as session:
+        UserProvisioningService(session).run_job(history_id, candidates, invalid)
+
+# Bulk create users (CSV) in background, tracked in upload history
+@router.post("/bulk/jobs", response_model=UploadHistory)
+def create_users_bulk_job(
+    session: SessionDep,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(require_permissions(Permission.USERS_WRITE)),
+    file: UploadFile = File(...),
+) -> Any:
+    """
+    Same as `/bulk/upload-csv` but runs in the background.
+    Returns the upload history record (status: PENDING), poll `/bulk/jobs/{job_id}`.
+    """
+    service = UserProvisioningService(session)
+    candidates, invalid = service.parse_csv(file)
+
+    history = UploadHistory(
+        file_name=file.filename or "users.csv",
+        created_by_id=current_user.user_id,
+        status="PENDING",
+    )
+    session.add(history)
+    session.commit()
+    session.refresh(history)
+
+    background_tasks.add_task(_run_provisioning_job, history.id, candidates, invalid)
+    return history
+
+# Get a bulk provisioning job
+@router.get(
+    "/bulk/jobs/{job_id}",
+    dependencies=[Depends(require_permissions(Permission.USERS_READ))],
+    response_model=UploadHistory,
+)
+def read_users_bulk_job(session: SessionDep, job_id: int) -> Any:
+    """
+    Get status of a background provisioning job.
+    """
+    history = session.get(UploadHistory, job_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return history
+
 # Update own user
 @router.patch("/me", response_model=UserPublic)
 def update_user_me(
@@ -77,7 +171,7 @@ def update_user_me(
     service = UserService(session)
     if user_in.email:
         existing_user = service.get_user_by_email(email=user_in.email)
-        if existing_user and existing_user.id != current_user.id:
+        if existing_user and existing_user.user_id != current_user.user_id:
             raise HTTPException(
                 status_code=409, detail="User with this email already exists"
             )
@@ -122,13 +216,11 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
     """
     Delete own user.
     """
-    if current_user.is_superuser:
+    if permission_registry.is_superuser(session, current_user.role_id):
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    current_user.del_flag = True
-    session.add(current_user)
-    session.commit()
+    UserService(session).soft_delete_user(current_user)
     return Message(message="User deleted successfully")
 
 # Create a new user without the need to be logged in
@@ -151,7 +243,7 @@ def register_user(session: SessionDep, user_in: UserRegister) -> Any:
 # Get a specific user by id
 @router.get("/{user_id}", response_model=UserPublic)
 def read_user_by_id(
-    user_id: uuid.UUID, session: SessionDep, current_user: CurrentUser
+    user_id: int, session: SessionDep, current_user: CurrentUser
 ) -> Any:
     """
     Get a specific user by id.
@@ -159,7 +251,9 @@ def read_user_by_id(
     user = session.get(User, user_id)
     if user == current_user:
         return user
-    if not current_user.is_superuser:
+    if not permission_registry.has_permissions(
+        session, current_user.role_id, Permission.USERS_READ
+    ):
         raise HTTPException(
             status_code=403,
             detail="The user doesn't have enough privileges",
@@ -169,13 +263,13 @@ def read_user_by_id(
 # Update a user
 @router.patch(
     "/{user_id}",
-    dependencies=[Depends(get_current_active_superuser)],
+    dependencies=[Depends(require_permissions(Permission.USERS_WRITE))],
     response_model=UserPublic,
 )
 def update_user(
     *,
     session: SessionDep,
-    user_id: uuid.UUID,
+    user_id: int,
     user_in: UserUpdate,
 ) -> Any:
     """
@@ -190,7 +284,7 @@ def update_user(
         )
     if user_in.email:
         existing_user = service.get_user_by_email(email=user_in.email)
-        if existing_user and existing_user.id != user_id:
+        if existing_user and existing_user.user_id != user_id:
             raise HTTPException(
                 status_code=409, detail="User with this email already exists"
             )
@@ -199,9 +293,12 @@ def update_user(
     return db_user
 
 # Delete a user 
-@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
+@router.delete(
+    "/{user_id}",
+    dependencies=[Depends(require_permissions(Permission.USERS_WRITE))],
+)
 def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
+    session: SessionDep, current_user: CurrentUser, user_id: int
 ) -> Message:
     """
     Delete a user.
@@ -214,7 +311,5 @@ def delete_user(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
     # Item model removed - no cascade delete needed
-    user.del_flag = True
-    session.add(user)
-    session.commit()
+    UserService(session).soft_delete_user(user)
     return Message(message="User deleted successfully")
\ No newline at end of file
@@ -1,4 +1,18 @@
-from fastapi import APIRouter
+import threading
+from dataclasses import asdict
+from typing import Any
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.api.deps import get_current_active_superuser
+from app.api.schemas.health import Readiness
+from app.core.config import settings
+from app.core.health import readiness_probe
+from app.core.loop_monitor import loop_lag_monitor
+from app.core.profiler import MIN_INTERVAL_MS, ProfilerBusy, profiler
+from app.core.rate_limit import rate_limiter
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -9,3 +23,84 @@ async def health_check() -> bool:
     Health check endpoint
     """
     return True
+
+
+@router.get("/health/live")
+async def liveness() -> bool:
+    """
+    Liveness: process and event loop are responsive, no dependency checked
+    """
+    return True
+
+
+@router.get(
+    "/health/ready",
+    response_model=Readiness,
+    responses={
+        503: {"model": Readiness, "description": "Worker should not receive traffic"}
+    },
+)
+async def readiness() -> Any:
+    """
+    Readiness: DB connectivity (cached, at most one query per interval), pool
+    usage, import queue depth and event-loop lag. 503 when any limit is exceeded.
+    """
+    report = Readiness.model_validate(asdict(await readiness_probe.check()))
+    if not report.ready:
+        return JSONResponse(status_code=503, content=report.model_dump())
+    return report
+
+
+@router.get(
+    "/rate-limits",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_rate_limit_metrics() -> Any:
+    """
+    Rate limiter metrics of this worker: allowed / rejected requests and active buckets per rule.
+    """
+    return rate_limiter.metrics()
+
+
+@router.get(
+    "/loop-lag",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_loop_lag_metrics() -> Any:
+    """
+    Event-loop lag of this worker and the blocking call sites seen so far,
+    grouped by route and call site, most total blocked time first.
+    """
+    return loop_lag_monitor.metrics()
+
+
+@router.get(
+    "/profile",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_class=PlainTextResponse,
+)
+async def profile_worker(
+    request: Request,
+    seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=MIN_INTERVAL_MS, le=1000),
+    include_idle: bool = False,
+) -> Any:
+    """
+    Sample stacks of every thread of this worker for `seconds` and return them
+    as collapsed stacks ("route;thread;frame;...;frame count"), ready for
+    flamegraph.pl or speedscope. Only one profile runs per worker at a time.
+    """
+    loop_thread = threading.get_ident()
+    try:
+        output, samples = await anyio.to_thread.run_sync(
+            lambda: profiler.profile(
+                seconds,
+                interval_ms / 1000,
+                routes=request.app.routes,
+                loop_thread=loop_thread,
+                include_idle=include_idle,
+            )
+        )
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PlainTextResponse(output, headers={"X-Profile-Samples": str(samples)})
@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel
+
+
+class GraduationProgress(SQLModel):
+    student_id: str
+    fullname: str
+    class_id: int | None = None
+    earned_credits: float = 0
+    # Intake.sum_tc, hoặc tổng tín chỉ của chương trình nếu intake không khai báo
+    required_credits: float = 0
+    progress: float = 0
+    mandatory_total: int = 0
+    mandatory_passed: int = 0
+    # Học phần bắt buộc mà phần lớn khóa đã học nhưng sinh viên chưa đạt
+    overdue_courses: list[str] = []
+    at_risk: bool = False
+    reasons: list[str] = []
+
+
+class GraduationReport(SQLModel):
+    intake_id: int
+    class_id: int | None = None
+    students_total: int = 0
+    at_risk_count: int = 0
+    median_earned_credits: float = 0
+    students: list[GraduationProgress] = []
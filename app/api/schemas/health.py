@@ -0,0 +1,25 @@
+from sqlmodel import SQLModel
+
+
+class DependencyStatus(SQLModel):
+    ok: bool
+    latency_ms: float | None = None
+    detail: str | None = None
+    # Tuổi (giây) của kết quả check được cache
+    age_seconds: float = 0.0
+
+
+class PoolStatus(SQLModel):
+    checked_out: int
+    capacity: int | None = None
+    usage: float | None = None
+
+
+class Readiness(SQLModel):
+    ready: bool
+    database: DependencyStatus
+    pool: PoolStatus
+    import_queue_depth: int
+    import_queue_limit: int
+    loop_lag_ms: float
+    reasons: list[str] = []
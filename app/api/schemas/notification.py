@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class NotificationPublic(SQLModel):
+    notification_id: int
+    title: str | None = None
+    message: str | None = None
+    is_read: bool = False
+    created_at: datetime
+
+
+class NotificationsPublic(SQLModel):
+    data: list[NotificationPublic]
+    count: int
+
+
+# Send to users and/or to the teachers of classes
+class NotificationCreate(SQLModel):
+    title: str = Field(max_length=255)
+    message: str
+    user_ids: list[int] = []
+    class_ids: list[int] = []
+
+
+class NotificationsRead(SQLModel):
+    notification_ids: list[int]
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel
+
+
+class BulkLoadEntityResult(SQLModel):
+    entity: str
+    created: int = 0
+    updated: int = 0
+
+
+class BulkLoadError(SQLModel):
+    entity: str
+    row: int
+    error: str
+
+
+# COMPLETED: đã commit, FAILED: có lỗi, không ghi gì vào DB
+class BulkLoadResult(SQLModel):
+    status: str
+    entities: list[BulkLoadEntityResult] = []
+    errors: list[BulkLoadError] = []
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+
+class ClassStats(SQLModel):
+    class_id: int
+    student_count: int = 0
+    avg_gpa: float | None = None
+
+
+class GroupRank(SQLModel):
+    group_id: int
+    # Số sinh viên có GPA trong nhóm
+    size: int = 0
+    # None nếu sinh viên chưa có GPA
+    rank: int | None = None
+    percentile: float | None = None
+
+
+class StudentRank(SQLModel):
+    student_id: str
+    gpa: float | None = None
+    class_rank: GroupRank | None = None
+    major_rank: GroupRank | None = None
+    intake_rank: GroupRank | None = None
+
+
+class StudentSearchResult(SQLModel):
+    student_id: str
+    fullname: str
+    class_id: int | None = None
+    score: float
+
+
+class StudentDuplicate(SQLModel):
+    """Cặp sinh viên nghi trùng (cùng người, khác student_id)"""
+
+    row: int
+    student_id: str
+    fullname: str
+    duplicate_of: str
+    duplicate_fullname: str
+    # BATCH: trùng với row khác trong file, EXISTING: trùng với sinh viên đã có
+    source: str
+    score: float
+
+
+class StudentRowError(SQLModel):
+    row: int
+    student_id: str | None = None
+    error: str
+
+
+class StudentUploadResult(SQLModel):
+    id: int
+    file_name: str
+    status: str
+    success_count: int = 0
+    failure_count: int = 0
+    total_processed: int = 0
+    error_message: str | None = None
+    created_at: datetime
+    created_by_id: int | None = None
+    errors: list[StudentRowError] = []
+    suspected_duplicates: list[StudentDuplicate] = []
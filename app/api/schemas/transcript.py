@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel
+
+
+class TranscriptCourse(SQLModel):
+    course_id: int
+    course_name: str
+    credits: float | None = None
+    is_bb: bool = False
+    intake_kdb: str | None = None
+    score: float | None = None
+    grade_point: float | None = None
+    passed: bool = False
+
+
+class Transcript(SQLModel):
+    student_id: str
+    fullname: str
+    class_id: int | None = None
+    # Điểm trung bình có trọng số tín chỉ: thang 10 và hệ 4
+    average_score: float | None = None
+    gpa: float | None = None
+    # GPA hệ 4 chỉ tính các học phần bắt buộc (is_bb)
+    mandatory_gpa: float | None = None
+    attempted_credits: float = 0
+    earned_credits: float = 0
+    courses: list[TranscriptCourse] = []
@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel
+
+from app.models.upload_history_model import UploadHistory
+
+
+class UploadHistoriesPublic(SQLModel):
+    data: list[UploadHistory]
+    # Truyền vào `cursor` để lấy trang tiếp theo, None khi hết
+    next_cursor: str | None = None
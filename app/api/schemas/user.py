@@ -1,4 +1,39 @@
-from sqlmodel import SQLModel
+from pydantic import EmailStr
+from sqlmodel import Field, SQLModel
+
+
+class UserBase(SQLModel):
+    email: EmailStr = Field(max_length=255)
+    fullname: str | None = Field(default=None, max_length=255)
+    is_active: bool = True
+    role_id: int | None = None
+
+
+# Properties to receive via API on creation
+class UserCreate(UserBase):
+    password: str = Field(min_length=8, max_length=40)
+
+
+class UserRegister(SQLModel):
+    email: EmailStr = Field(max_length=255)
+    password: str = Field(min_length=8, max_length=40)
+    fullname: str | None = Field(default=None, max_length=255)
+
+
+# Properties to receive via API on update, all are optional
+class UserUpdate(UserBase):
+    email: EmailStr | None = Field(default=None, max_length=255)  # type: ignore
+    password: str | None = Field(default=None, min_length=8, max_length=40)
+
+
+class UserUpdateMe(SQLModel):
+    fullname: str | None = Field(default=None, max_length=255)
+    email: EmailStr | None = Field(default=None, max_length=255)
+
+
+class UpdatePassword(SQLModel):
+    current_password: str = Field(min_length=8, max_length=40)
+    new_password: str = Field(min_length=8, max_length=40)
 
 
 class UserPublic(SQLModel):
@@ -6,3 +41,28 @@ class UserPublic(SQLModel):
     email: str
     fullname: str | None = None
     is_active: bool = True
+
+
+class UsersPublic(SQLModel):
+    data: list[UserPublic]
+    count: int
+
+
+# Bulk provisioning
+class UserBulkCreate(SQLModel):
+    users: list[UserCreate]
+
+
+class UserBulkRowResult(SQLModel):
+    row: int
+    email: str
+    status: str  # CREATED, EXISTS, DUPLICATE, INVALID
+    user_id: int | None = None
+    error: str | None = None
+
+
+class UserBulkResult(SQLModel):
+    total_processed: int = 0
+    success_count: int = 0
+    failure_count: int = 0
+    results: list[UserBulkRowResult] = []
@@ -0,0 +1,340 @@
+"""
+Graduation Progress Service
+Tiến độ tốt nghiệp: tín chỉ tích lũy so với Intake.sum_tc và các học phần
+bắt buộc (Course.is_bb) của chương trình.
+
+Chương trình của mỗi (intake, major) được index 1 lần: mỗi học phần có 1 vị trí
+bit, học phần bắt buộc gom thành 1 bitmask. Học phần đã đạt của sinh viên cũng là
+1 bitmask, nên kiểm tra cả intake chỉ là vài phép AND/popcount trên mỗi sinh viên
+thay vì query chương trình cho từng người.
+"""
+
+import statistics
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import String, cast
+from sqlmodel import Session, case, col, func, select
+
+from app.api.schemas.graduation import GraduationProgress, GraduationReport
+from app.core.cache import invalidate_on_write
+from app.core.config import settings
+from app.core.grading import PASSING_SCORE, parse_credits
+from app.core.scope import UNRESTRICTED, StudentScope
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.intake_model import Intake
+from app.models.score_model import Score
+from app.models.student_model import Student
+
+
+@dataclass(frozen=True)
+class Curriculum:
+    intake_id: int
+    major_id: int | None
+    required_credits: float
+    # course_id (dạng chuỗi, như trong danh sách id gộp từ SQL) -> bit / tín chỉ
+    bits: dict[str, int]
+    credits: dict[str, float]
+    # Tên học phần theo vị trí bit
+    course_names: tuple[str, ...]
+    mandatory_mask: int
+    mandatory_total: int
+
+
+@dataclass
+class _IntakeCourses:
+    sum_tc: int | None
+    # (course_id, course_name, credits, is_bb, major_id)
+    courses: list[tuple[int, str, float, bool, int | None]]
+    curricula: dict[int | None, Curriculum] = field(default_factory=dict)
+
+
+class CurriculumIndex:
+    """Index chương trình theo intake, xóa khi course/intake bị ghi"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._intakes: dict[int, _IntakeCourses] = {}
+        # Tăng mỗi lần invalidate: index load trước đó không được lưu lại
+        self.generation = 0
+
+    def bump(self, *namespaces: str) -> None:
+        with self._lock:
+            self.generation += 1
+            self._intakes.clear()
+
+    def curriculum(
+        self, session: Session, intake_id: int, major_id: int | None
+    ) -> Curriculum:
+        """
+        Chương trình của ngành `major_id` trong intake: học phần của intake có
+        major_id trùng hoặc không gắn ngành
+        """
+        intake = self._intakes.get(intake_id)
+        if intake is None:
+            generation = self.generation
+            intake = self._load(session, intake_id)
+            with self._lock:
+                if generation == self.generation:
+                    intake = self._intakes.setdefault(intake_id, intake)
+
+        curriculum = intake.curricula.get(major_id)
+        if curriculum is None:
+            courses = [c for c in intake.courses if c[4] is None or c[4] == major_id]
+            mandatory_mask = 0
+            for position, (_, _, _, is_bb, _) in enumerate(courses):
+                if is_bb:
+                    mandatory_mask |= 1 << position
+            curriculum = Curriculum(
+                intake_id=intake_id,
+                major_id=major_id,
+                required_credits=float(
+                    intake.sum_tc
+                    if intake.sum_tc is not None
+                    else sum(credits for _, _, credits, _, _ in courses)
+                ),
+                bits={
+                    str(course[0]): 1 << position
+                    for position, course in enumerate(courses)
+                },
+                credits={str(course[0]): course[2] for course in courses},
+                course_names=tuple(name for _, name, _, _, _ in courses),
+                mandatory_mask=mandatory_mask,
+                mandatory_total=mandatory_mask.bit_count(),
+            )
+            intake.curricula[major_id] = curriculum
+        return curriculum
+
+    @staticmethod
+    def _load(session: Session, intake_id: int) -> _IntakeCourses:
+        sum_tc = session.exec(
+            select(Intake.sum_tc).where(Intake.intake_id == intake_id)
+        ).first()
+        rows = session.exec(
+            select(  # type: ignore[call-overload]
+                Course.course_id,
+                Course.course_name,
+                Course.tcdh,
+                Course.is_bb,
+                Course.major_id,
+            )
+            .where(Course.intake_id == intake_id)
+            .order_by(Course.course_id)
+        ).all()
+        return _IntakeCourses(
+            sum_tc=sum_tc,
+            courses=[
+                (course_id, name, parse_credits(tcdh), bool(is_bb), major_id)
+                for course_id, name, tcdh, is_bb, major_id in rows
+            ],
+        )
+
+
+curriculum_index = CurriculumIndex()
+invalidate_on_write(
+    curriculum_index,
+    {Course.__tablename__: "curriculum", Intake.__tablename__: "curriculum"},
+)
+
+
+class GraduationService:
+    """Service to evaluate graduation progress of an intake"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def class_report(
+        self, class_id: int, at_risk_only: bool = False
+    ) -> GraduationReport:
+        intake_id = self.session.exec(
+            select(Class.intake_id).where(Class.class_id == class_id)
+        ).first()
+        if intake_id is None:
+            raise HTTPException(
+                status_code=404, detail="Class not found or has no intake"
+            )
+        return self.intake_report(
+            intake_id, class_id=class_id, at_risk_only=at_risk_only
+        )
+
+    def intake_report(
+        self,
+        intake_id: int,
+        class_id: int | None = None,
+        at_risk_only: bool = False,
+        scope: StudentScope = UNRESTRICTED,
+    ) -> GraduationReport:
+        """
+        Đánh giá cả intake (so sánh với cả khóa), `class_id` / `scope` chỉ lọc kết quả
+
+        Args:
+            class_id: Chỉ trả về sinh viên của class này
+            at_risk_only: Chỉ trả về sinh viên at risk
+            scope: Chỉ trả về sinh viên trong scope của user
+        """
+        # Cả intake (kể cả ngoài scope): trung vị / học phần đến hạn tính trên cả khóa
+        students = self.session.exec(
+            select(
+                Student.student_id, Student.fullname, Student.class_id, Class.major_id
+            )
+            .join(Class, col(Class.class_id) == Student.class_id)
+            .where(Class.intake_id == intake_id)
+            .execution_options(all_students=True)
+        ).all()
+
+        # 1 row mỗi sinh viên: id các học phần đã học / đã đạt (>= PASSING_SCORE),
+        # gộp thành chuỗi để không phải trả về từng cặp
+        # (sinh viên, học phần). Chạy qua Core connection: bỏ qua ORM row processing
+        intake_students = (
+            select(Student.student_id)
+            .join(Class, col(Class.class_id) == Student.class_id)
+            .where(Class.intake_id == intake_id)
+        )
+        scores = self.session.connection().execute(
+            select(
+                Score.student_id,
+                self._id_list(Score.course_id),
+                self._id_list(
+                    case((col(Score.score) >= PASSING_SCORE, Score.course_id))
+                ),
+            )
+            .where(
+                col(Score.student_id).in_(intake_students),
+                col(Score.score).is_not(None),
+            )
+            .group_by(Score.student_id)
+        )
+
+        curricula: dict[str, Curriculum] = {}
+        cohort_sizes: Counter[int | None] = Counter()
+        for student_id, _, _, major_id in students:
+            curricula[student_id] = curriculum_index.curriculum(
+                self.session, intake_id, major_id
+            )
+            cohort_sizes[major_id] += 1
+
+        # Bitmask học phần đã đạt theo sinh viên, số sinh viên đã học mỗi học phần
+        # theo chương trình
+        attempts: dict[int | None, Counter[str]] = {
+            major: Counter() for major in cohort_sizes
+        }
+        passed: dict[str, int] = dict.fromkeys(curricula, 0)
+        earned: dict[str, float] = dict.fromkeys(curricula, 0.0)
+        # Học phần đạt nằm ngoài chương trình: tín chỉ tra sau trong 1 query
+        outside: list[tuple[str, int]] = []
+        for student_id, attempted_ids, passed_ids in scores:
+            curriculum = curricula[student_id]
+            attempts[curriculum.major_id].update(attempted_ids.split(","))
+            if not passed_ids:
+                continue
+            bits = curriculum.bits
+            course_ids = passed_ids.split(",")
+            inside = [course_id for course_id in course_ids if course_id in bits]
+            passed[student_id] = sum(map(bits.__getitem__, inside))
+            earned[student_id] = sum(map(curriculum.credits.__getitem__, inside))
+            if len(inside) < len(course_ids):
+                outside.extend(
+                    (student_id, int(course_id))
+                    for course_id in course_ids
+                    if course_id not in bits
+                )
+        if outside:
+            credits_by_id = self._course_credits(
+                {course_id for _, course_id in outside}
+            )
+            for student_id, course_id in outside:
+                earned[student_id] += credits_by_id.get(course_id, 0.0)
+
+        # Học phần "đến hạn" của mỗi chương trình: ít nhất nửa số sinh viên đã học
+        due_masks: dict[int | None, int] = {}
+        for curriculum in curricula.values():
+            if curriculum.major_id not in due_masks:
+                size = cohort_sizes[curriculum.major_id]
+                due_masks[curriculum.major_id] = sum(
+                    curriculum.bits[course_id]
+                    for course_id, count in attempts[curriculum.major_id].items()
+                    if course_id in curriculum.bits and count * 2 >= size
+                )
+        median_earned = statistics.median(earned.values()) if earned else 0.0
+        credit_floor = median_earned * settings.GRADUATION_AT_RISK_CREDIT_RATIO
+
+        progress: list[GraduationProgress] = []
+        students_total = at_risk_count = 0
+        for student_id, fullname, student_class_id, _ in students:
+            if class_id is not None and student_class_id != class_id:
+                continue
+            if not scope.allows_class(student_class_id):
+                continue
+            curriculum = curricula[student_id]
+            missing = curriculum.mandatory_mask & ~passed[student_id]
+            overdue = missing & due_masks[curriculum.major_id]
+            reasons = []
+            if overdue.bit_count() >= settings.GRADUATION_AT_RISK_OVERDUE_MANDATORY:
+                reasons.append(f"{overdue.bit_count()} overdue mandatory courses")
+            if earned[student_id] < credit_floor:
+                reasons.append(
+                    f"earned credits below {settings.GRADUATION_AT_RISK_CREDIT_RATIO:.0%} "
+                    "of intake median"
+                )
+
+            students_total += 1
+            at_risk_count += bool(reasons)
+            if at_risk_only and not reasons:
+                continue
+            progress.append(
+                GraduationProgress(
+                    student_id=student_id,
+                    fullname=fullname,
+                    class_id=student_class_id,
+                    earned_credits=earned[student_id],
+                    required_credits=curriculum.required_credits,
+                    progress=(
+                        round(
+                            min(earned[student_id] / curriculum.required_credits, 1.0),
+                            4,
+                        )
+                        if curriculum.required_credits
+                        else 0.0
+                    ),
+                    mandatory_total=curriculum.mandatory_total,
+                    mandatory_passed=curriculum.mandatory_total - missing.bit_count(),
+                    overdue_courses=self._course_names(curriculum, overdue),
+                    at_risk=bool(reasons),
+                    reasons=reasons,
+                )
+            )
+        return GraduationReport(
+            intake_id=intake_id,
+            class_id=class_id,
+            students_total=students_total,
+            at_risk_count=at_risk_count,
+            median_earned_credits=median_earned,
+            students=progress,
+        )
+
+    def _id_list(self, expression: Any) -> Any:
+        """Các id khác nhau (bỏ NULL), nối bằng dấu phẩy"""
+        if self.session.get_bind().dialect.name == "postgresql":
+            return func.string_agg(cast(expression, String).distinct(), ",")
+        return func.group_concat(expression.distinct())
+
+    def _course_credits(self, course_ids: set[int]) -> dict[int, float]:
+        rows = self.session.exec(
+            select(Course.course_id, Course.tcdh).where(
+                col(Course.course_id).in_(course_ids)
+            )
+        ).all()
+        return {course_id: parse_credits(tcdh) for course_id, tcdh in rows}
+
+    @staticmethod
+    def _course_names(curriculum: Curriculum, mask: int) -> list[str]:
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(curriculum.course_names[low.bit_length() - 1])
+            mask ^= low
+        return names
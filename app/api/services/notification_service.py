@@ -0,0 +1,161 @@
+"""
+Notification Service
+Tạo notification hàng loạt (1 câu INSERT batched) và publish sau commit
+để SSE / long-poll clients nhận realtime qua in-process pub/sub
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sqlmodel import Session, col, insert, select, update
+
+from app.api.schemas.notification import NotificationPublic
+from app.core.config import settings
+from app.core.pubsub import broker
+from app.models.class_model import Class
+from app.models.notification_model import Notification
+
+
+def user_topic(user_id: int) -> str:
+    return f"notifications:user:{user_id}"
+
+
+class LatestIdIndex:
+    """
+    notification_id mới nhất đã biết của từng user trong worker này.
+    Long-poll dùng để trả lời "không có gì mới" mà không cần query DB.
+
+    Chỉ biết notification tạo / đọc trong worker này: entry hết hạn sau
+    `ttl_seconds` để notification tạo ở worker khác không bị bỏ sót lâu hơn TTL.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # user_id -> (notification_id, monotonic time hết hạn)
+        self._latest: dict[int, tuple[int, float]] = {}
+
+    def get(self, user_id: int) -> int | None:
+        entry = self._latest.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def advance(self, user_id: int, notification_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            current = self._latest.get(user_id)
+            if current is not None and current[1] > now:
+                notification_id = max(notification_id, current[0])
+            self._latest[user_id] = (notification_id, now + self.ttl_seconds)
+            # Dọn các entry hết hạn, tránh dict lớn dần
+            if len(self._latest) > 10_000:
+                self._latest = {
+                    uid: entry for uid, entry in self._latest.items() if entry[1] > now
+                }
+
+
+latest_ids = LatestIdIndex(ttl_seconds=settings.NOTIFICATION_LATEST_ID_TTL_SECONDS)
+
+
+class NotificationService:
+    """Service to create, list and deliver notifications"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def notify_users(self, user_ids: Iterable[int], title: str, message: str) -> int:
+        """
+        Tạo 1 notification cho mỗi user bằng 1 câu INSERT, commit rồi publish
+
+        Returns:
+            Số notification đã tạo
+        """
+        recipients = sorted(set(user_ids))
+        if not recipients:
+            return 0
+        created = self.session.execute(
+            insert(Notification).returning(
+                col(Notification.notification_id),
+                col(Notification.user_id),
+                col(Notification.created_at),
+            ),
+            [
+                {"user_id": user_id, "title": title, "message": message}
+                for user_id in recipients
+            ],
+        ).all()
+        self.session.commit()
+
+        for notification_id, user_id, created_at in created:
+            self._publish(
+                user_id,
+                NotificationPublic(
+                    notification_id=notification_id,
+                    title=title,
+                    message=message,
+                    is_read=False,
+                    created_at=created_at,
+                ),
+            )
+        return len(created)
+
+    def notify_class_teachers(
+        self, class_ids: Iterable[int], title: str, message: str
+    ) -> int:
+        """Notify teachers (Class.user_id) của các class"""
+        return self.notify_users(self.class_teacher_ids(class_ids), title, message)
+
+    def class_teacher_ids(self, class_ids: Iterable[int]) -> list[int]:
+        class_ids = list(set(class_ids))
+        if not class_ids:
+            return []
+        teacher_ids = self.session.exec(
+            select(Class.user_id)
+            .where(col(Class.class_id).in_(class_ids), col(Class.user_id).is_not(None))
+            .distinct()
+        ).all()
+        return [user_id for user_id in teacher_ids if user_id is not None]
+
+    def list_notifications(
+        self, user_id: int, after_id: int = 0, limit: int = 50
+    ) -> list[Notification]:
+        """Notifications mới hơn `after_id`, theo thứ tự tăng dần"""
+        notifications = list(
+            self.session.exec(
+                select(Notification)
+                .where(
+                    Notification.user_id == user_id,
+                    Notification.notification_id > after_id,
+                )
+                .order_by(col(Notification.notification_id))
+                .limit(limit)
+            ).all()
+        )
+        if notifications:
+            latest_ids.advance(user_id, notifications[-1].notification_id)
+        else:
+            latest_ids.advance(user_id, after_id)
+        return notifications
+
+    def mark_read(self, user_id: int, notification_ids: list[int]) -> int:
+        if not notification_ids:
+            return 0
+        updated = self.session.execute(
+            update(Notification)
+            .where(
+                col(Notification.user_id) == user_id,
+                col(Notification.notification_id).in_(notification_ids),
+            )
+            .values(is_read=True)
+            .returning(col(Notification.notification_id))
+        ).all()
+        self.session.commit()
+        return len(updated)
+
+    @staticmethod
+    def _publish(user_id: Any, notification: NotificationPublic) -> None:
+        latest_ids.advance(user_id, notification.notification_id)
+        broker.publish(user_topic(user_id), notification.model_dump(mode="json"))
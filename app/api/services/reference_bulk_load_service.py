@@ -0,0 +1,457 @@
+"""
+Reference Bulk Load Service
+Load majors, intakes, classes, courses từ 1 bundle trong 1 transaction:
+nhiều file CSV hoặc file .zip chứa các CSV (mỗi file 1 entity).
+
+- Foreign key resolve theo natural key (major_name, kdb, teacher_email) qua
+  lookup map in-memory, mỗi bảng 1 query
+- Ghi theo thứ tự phụ thuộc bằng bulk INSERT ... RETURNING / bulk UPDATE theo PK
+- Có lỗi ở bất kỳ row nào thì rollback toàn bộ bundle
+- Zip: giới hạn số file và tổng dung lượng giải nén (đếm khi đọc, không tin
+  kích thước khai báo trong zip)
+"""
+
+import csv
+import io
+import os
+import zipfile
+import zlib
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from typing import IO, Any
+
+from fastapi import HTTPException, UploadFile
+from sqlmodel import Session, SQLModel, col, insert, or_, select, update
+
+from app.api.schemas.reference import (
+    BulkLoadEntityResult,
+    BulkLoadError,
+    BulkLoadResult,
+)
+from app.core.config import settings
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.intake_model import Intake
+from app.models.major_model import Major
+from app.models.user_model import User
+
+Row = dict[str, str]
+RowSource = Callable[[], Iterator[Row]]
+NaturalKey = tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    model: type[SQLModel]
+    pk: str
+    natural_key: tuple[str, ...]
+
+
+# Thứ tự phụ thuộc: entity sau có thể tham chiếu entity trước
+ENTITY_SPECS: dict[str, EntitySpec] = {
+    "majors": EntitySpec(Major, "major_id", ("major_name",)),
+    "intakes": EntitySpec(Intake, "intake_id", ("kdb",)),
+    "classes": EntitySpec(Class, "class_id", ("class_name",)),
+    "courses": EntitySpec(
+        Course, "course_id", ("course_name", "major_id", "intake_id")
+    ),
+}
+
+# Tên file / sheet được chấp nhận cho mỗi entity
+ENTITY_ALIASES = {
+    "majors": "majors",
+    "major": "majors",
+    "intakes": "intakes",
+    "intake": "intakes",
+    "classes": "classes",
+    "class": "classes",
+    "courses": "courses",
+    "course": "courses",
+}
+
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+FALSE_VALUES = {"0", "false", "no", "n", ""}
+
+
+class ReferenceBulkLoadService:
+    """Service to bulk load reference data (majors, intakes, classes, courses)"""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, session: Session):
+        self.session = session
+        # entity -> natural key -> primary key
+        self._keys: dict[str, dict[NaturalKey, int]] = {}
+        self._ids: dict[str, set[int]] = {}
+        # teacher email (lowercase) -> user_id
+        self._teachers: dict[str, int] = {}
+
+    def load(self, files: list[UploadFile]) -> BulkLoadResult:
+        """
+        Load bundle và ghi trong 1 transaction
+
+        Raises:
+            HTTPException: Nếu bundle không hợp lệ (file type, tên sheet, encoding)
+        """
+        sources, closers = self._collect_sources(files)
+        try:
+            return self._load(sources)
+        except UnicodeDecodeError:
+            self.session.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail="File encoding error. Please use UTF-8 encoding",
+            )
+        except Exception:
+            self.session.rollback()
+            raise
+        finally:
+            for close in closers:
+                close()
+
+    def _load(self, sources: dict[str, RowSource]) -> BulkLoadResult:
+        self._build_lookups()
+        errors: list[BulkLoadError] = []
+        entities: list[BulkLoadEntityResult] = []
+        for entity in ENTITY_SPECS:
+            source = sources.get(entity)
+            if source is None:
+                continue
+            rows = list(source())
+            if entity == "classes":
+                self._load_teachers(rows)
+            entities.append(self._load_entity(entity, rows, errors))
+
+        if errors:
+            self.session.rollback()
+            return BulkLoadResult(status="FAILED", entities=entities, errors=errors)
+        self.session.commit()
+        return BulkLoadResult(status="COMPLETED", entities=entities)
+
+    def _load_entity(
+        self, entity: str, rows: list[Row], errors: list[BulkLoadError]
+    ) -> BulkLoadEntityResult:
+        spec = ENTITY_SPECS[entity]
+        clean: Callable[[Row], dict[str, Any]] = getattr(self, f"_clean_{entity}")
+        keys = self._keys[entity]
+
+        seen: dict[NaturalKey, int] = {}
+        to_insert: list[dict[str, Any]] = []
+        to_update: list[dict[str, Any]] = []
+        for row_number, row in enumerate(rows, start=1):
+            try:
+                values = clean(row)
+            except ValueError as e:
+                errors.append(
+                    BulkLoadError(entity=entity, row=row_number, error=str(e))
+                )
+                continue
+            key = self._natural_key(spec, values)
+            if key in seen:
+                errors.append(
+                    BulkLoadError(
+                        entity=entity,
+                        row=row_number,
+                        error=f"Duplicate of row {seen[key]}",
+                    )
+                )
+                continue
+            seen[key] = row_number
+            pk = keys.get(key)
+            if pk is None:
+                to_insert.append(values)
+            else:
+                to_update.append({spec.pk: pk, **values})
+
+        # Vẫn ghi khi có lỗi (sẽ rollback) để entity sau resolve được key
+        pk_column = getattr(spec.model, spec.pk)
+        for start in range(0, len(to_update), self.BATCH_SIZE):
+            self.session.execute(
+                update(spec.model), to_update[start : start + self.BATCH_SIZE]
+            )
+        for start in range(0, len(to_insert), self.BATCH_SIZE):
+            batch = to_insert[start : start + self.BATCH_SIZE]
+            created = (
+                self.session.execute(
+                    insert(spec.model).returning(
+                        pk_column, sort_by_parameter_order=True
+                    ),
+                    batch,
+                )
+                .scalars()
+                .all()
+            )
+            for values, pk in zip(batch, created, strict=True):
+                keys[self._natural_key(spec, values)] = pk
+                self._ids[entity].add(pk)
+
+        return BulkLoadEntityResult(
+            entity=entity, created=len(to_insert), updated=len(to_update)
+        )
+
+    def _build_lookups(self) -> None:
+        """Natural key -> id cho mỗi bảng, 1 query mỗi bảng"""
+        for entity, spec in ENTITY_SPECS.items():
+            columns = [
+                getattr(spec.model, name) for name in (spec.pk, *spec.natural_key)
+            ]
+            keys: dict[NaturalKey, int] = {}
+            for pk, *natural in self.session.exec(select(*columns)).all():
+                keys[tuple(self._normalize(value) for value in natural)] = pk
+            self._keys[entity] = keys
+            self._ids[entity] = set(keys.values())
+
+    def _load_teachers(self, rows: list[Row]) -> None:
+        """Teacher của các class trong bundle, theo email hoặc user_id (1 query)"""
+        emails = {
+            row["teacher_email"].strip().lower()
+            for row in rows
+            if (row.get("teacher_email") or "").strip()
+        }
+        user_ids = {
+            int(row["user_id"])
+            for row in rows
+            if (row.get("user_id") or "").strip().isdigit()
+        }
+        if not emails and not user_ids:
+            return
+        users = self.session.exec(
+            select(User.user_id, User.email).where(
+                or_(col(User.email).in_(emails), col(User.user_id).in_(user_ids))
+            )
+        ).all()
+        self._teachers = {email.lower(): user_id for user_id, email in users}
+        self._ids["users"] = {user_id for user_id, _ in users}
+
+    # Row cleaning: chỉ set các cột có trong file, để update không xóa dữ liệu cũ
+
+    def _clean_majors(self, row: Row) -> dict[str, Any]:
+        return {"major_name": self._required(row, "major_name")}
+
+    def _clean_intakes(self, row: Row) -> dict[str, Any]:
+        values: dict[str, Any] = {"kdb": self._required(row, "kdb")}
+        if "tdc" in row:
+            values["tdc"] = (row["tdc"] or "").strip() or None
+        if "sum_tc" in row:
+            values["sum_tc"] = self._parse_int(row, "sum_tc")
+        return values
+
+    def _clean_classes(self, row: Row) -> dict[str, Any]:
+        values: dict[str, Any] = {"class_name": self._required(row, "class_name")}
+        self._set_reference(values, row, "majors", "major_name", "major_id")
+        self._set_reference(values, row, "intakes", "kdb", "intake_id")
+        if "teacher_email" in row or "user_id" in row:
+            values["user_id"] = self._teacher(row)
+        return values
+
+    def _clean_courses(self, row: Row) -> dict[str, Any]:
+        values: dict[str, Any] = {"course_name": self._required(row, "course_name")}
+        if "tcdh" in row:
+            values["tcdh"] = (row["tcdh"] or "").strip() or None
+        if "is_bb" in row:
+            values["is_bb"] = self._parse_bool(row, "is_bb")
+        self._set_reference(values, row, "majors", "major_name", "major_id")
+        self._set_reference(values, row, "intakes", "kdb", "intake_id")
+        # major / intake thuộc natural key: thiếu thì không match được course đã có
+        if values.get("major_id") is None:
+            raise ValueError("Missing required field: major_name or major_id")
+        if values.get("intake_id") is None:
+            raise ValueError("Missing required field: kdb or intake_id")
+        return values
+
+    def _set_reference(
+        self,
+        values: dict[str, Any],
+        row: Row,
+        entity: str,
+        name_column: str,
+        id_column: str,
+    ) -> None:
+        """Resolve foreign key theo natural key (ưu tiên) hoặc id"""
+        if name_column not in row and id_column not in row:
+            return
+        name = (row.get(name_column) or "").strip()
+        if name:
+            pk = self._keys[entity].get((self._normalize(name),))
+            if pk is None:
+                raise ValueError(f"Unknown {name_column} '{name}'")
+            values[id_column] = pk
+            return
+        pk = self._parse_int(row, id_column)
+        if pk is not None and pk not in self._ids[entity]:
+            raise ValueError(f"Unknown {id_column} {pk}")
+        values[id_column] = pk
+
+    def _teacher(self, row: Row) -> int | None:
+        email = (row.get("teacher_email") or "").strip().lower()
+        if email:
+            if email not in self._teachers:
+                raise ValueError(f"Unknown teacher_email '{email}'")
+            return self._teachers[email]
+        user_id = self._parse_int(row, "user_id")
+        if user_id is not None and user_id not in self._ids.get("users", set()):
+            raise ValueError(f"Unknown user_id {user_id}")
+        return user_id
+
+    @staticmethod
+    def _required(row: Row, column: str) -> str:
+        value = (row.get(column) or "").strip()
+        if not value:
+            raise ValueError(f"Missing required field: {column}")
+        return value
+
+    @staticmethod
+    def _parse_int(row: Row, column: str) -> int | None:
+        value = (row.get(column) or "").strip()
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Invalid {column} '{value}'")
+
+    @staticmethod
+    def _parse_bool(row: Row, column: str) -> bool:
+        value = (row.get(column) or "").strip().lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid {column} '{value}'")
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        """Natural key không phân biệt hoa thường / khoảng trắng thừa"""
+        if isinstance(value, str):
+            return " ".join(value.split()).casefold()
+        return value
+
+    @classmethod
+    def _natural_key(cls, spec: EntitySpec, values: dict[str, Any]) -> NaturalKey:
+        return tuple(cls._normalize(values.get(name)) for name in spec.natural_key)
+
+    # Sources: mỗi entity 1 iterator row, đọc streaming khi tới lượt
+
+    def _collect_sources(
+        self, files: list[UploadFile]
+    ) -> tuple[dict[str, RowSource], list[Callable[[], None]]]:
+        sources: dict[str, RowSource] = {}
+        closers: list[Callable[[], None]] = []
+
+        def add(name: str, source: RowSource) -> None:
+            stem = os.path.splitext(os.path.basename(name))[0].strip().lower()
+            entity = ENTITY_ALIASES.get(stem)
+            if entity is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown sheet '{name}'. "
+                    f"Expected: {', '.join(ENTITY_SPECS)}",
+                )
+            if entity in sources:
+                raise HTTPException(
+                    status_code=400, detail=f"Duplicate sheet for {entity}"
+                )
+            sources[entity] = source
+
+        for file in files:
+            filename = (file.filename or "").lower()
+            if filename.endswith(".csv"):
+                add(filename, partial(self._csv_rows, file.file))
+            elif filename.endswith(".zip"):
+                archive = self._open_zip(file.file)
+                closers.append(archive.close)
+                budget = _DecompressedBudget(settings.IMPORT_MAX_DECOMPRESSED_BYTES)
+                for member in archive.namelist():
+                    if member.lower().endswith(".csv"):
+                        add(
+                            member,
+                            partial(self._zip_member_rows, archive, member, budget),
+                        )
+            else:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Only .csv and .zip (of CSVs) files are allowed",
+                )
+
+        if not sources:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+        return sources, closers
+
+    @staticmethod
+    def _csv_rows(binary: IO[bytes]) -> Iterator[Row]:
+        text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+        reader = csv.DictReader(text)
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        yield from reader
+
+    @classmethod
+    def _zip_member_rows(
+        cls, archive: zipfile.ZipFile, member: str, budget: "_DecompressedBudget"
+    ) -> Iterator[Row]:
+        yield from cls._csv_rows(budget.wrap(archive.open(member)))
+
+    @staticmethod
+    def _open_zip(binary: IO[bytes]) -> zipfile.ZipFile:
+        try:
+            archive = zipfile.ZipFile(binary)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Invalid zip file")
+        members = archive.infolist()
+        # Kiểm tra sớm theo central directory; kích thước thật được đếm khi đọc
+        if len(members) > settings.IMPORT_MAX_ZIP_MEMBERS:
+            archive.close()
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many files in zip: {len(members)}. "
+                f"Maximum is {settings.IMPORT_MAX_ZIP_MEMBERS}",
+            )
+        if (
+            sum(member.file_size for member in members)
+            > settings.IMPORT_MAX_DECOMPRESSED_BYTES
+        ):
+            archive.close()
+            raise HTTPException(status_code=413, detail=_decompressed_too_large())
+        return archive
+
+
+def _decompressed_too_large() -> str:
+    return (
+        "Decompressed upload too large. "
+        f"Maximum size is {settings.IMPORT_MAX_DECOMPRESSED_BYTES} bytes"
+    )
+
+
+class _DecompressedBudget:
+    """Tổng số byte giải nén được đọc từ các file trong 1 zip"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+
+    def wrap(self, member: IO[bytes]) -> IO[bytes]:
+        return io.BufferedReader(_BudgetReader(member, self))
+
+
+class _BudgetReader(io.RawIOBase):
+    def __init__(self, member: IO[bytes], budget: _DecompressedBudget):
+        self._member = member
+        self._budget = budget
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        try:
+            count: int = self._member.readinto(buffer)  # type: ignore[attr-defined]
+        except (zipfile.BadZipFile, zlib.error, EOFError):
+            raise HTTPException(status_code=400, detail="Invalid or truncated zip file")
+        self._budget.used += count
+        if self._budget.used > self._budget.max_bytes:
+            raise HTTPException(status_code=413, detail=_decompressed_too_large())
+        return count
+
+    def close(self) -> None:
+        self._member.close()
+        super().close()
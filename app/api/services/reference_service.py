@@ -0,0 +1,63 @@
+"""
+Reference Data Service
+Đọc các bảng tham chiếu (major, intake, course, class, roles) qua in-process cache
+"""
+
+import json
+
+from sqlmodel import Session, SQLModel, select
+
+from app.core.cache import CacheEntry, VersionedCache, invalidate_on_write
+from app.core.config import settings
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.intake_model import Intake
+from app.models.major_model import Major
+from app.models.role_model import Role
+
+# namespace -> (model, order by column)
+REFERENCE_MODELS: dict[str, tuple[type[SQLModel], str]] = {
+    "majors": (Major, "major_id"),
+    "intakes": (Intake, "intake_id"),
+    "courses": (Course, "course_id"),
+    "classes": (Class, "class_id"),
+    "roles": (Role, "role_id"),
+}
+
+reference_cache = VersionedCache(ttl_seconds=settings.REFERENCE_CACHE_TTL_SECONDS)
+
+# Bump version khi các bảng tham chiếu bị ghi
+invalidate_on_write(
+    reference_cache,
+    {
+        # SQLModel khai báo __tablename__ kiểu str | Callable[..., str]
+        str(model.__tablename__): namespace
+        for namespace, (model, _) in REFERENCE_MODELS.items()
+    },
+)
+
+
+class ReferenceService:
+    """Service to read cached reference tables"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, namespace: str) -> CacheEntry:
+        """Trả về payload JSON đã serialize, chỉ query DB khi cache miss"""
+        entry = reference_cache.get(namespace)
+        if entry is not None:
+            return entry
+        return self._load(namespace)
+
+    def _load(self, namespace: str) -> CacheEntry:
+        # Đọc version trước khi query để không cache dữ liệu bị ghi đè giữa chừng
+        version = reference_cache.version(namespace)
+        model, order_by = REFERENCE_MODELS[namespace]
+        rows = self.session.exec(select(model).order_by(getattr(model, order_by))).all()
+        payload = json.dumps(
+            [row.model_dump(mode="json") for row in rows],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return reference_cache.set(namespace, payload, version=version)
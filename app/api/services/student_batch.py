@@ -0,0 +1,78 @@
+"""
+Student Batch
+Biểu diễn column-oriented cho các row import: mỗi cột là 1 list/array,
+không có dict hay ORM object cho từng row. Row chỉ được materialize thành
+dict theo từng chunk nhỏ lúc ghi bulk.
+"""
+
+import math
+from array import array
+from collections.abc import Iterator
+from datetime import date
+from typing import Any
+
+from app.core.text import normalize_name
+
+# Sentinel cho giá trị None trong các cột array
+_NO_DATE = 0
+_NO_CLASS = -1
+
+
+class StudentBatch:
+    __slots__ = ("rows", "student_ids", "fullnames", "_dobs", "_gpas", "_class_ids")
+
+    def __init__(self) -> None:
+        # Số thứ tự row trong file (để báo lỗi / duplicate)
+        self.rows = array("I")
+        self.student_ids: list[str] = []
+        self.fullnames: list[str] = []
+        self._dobs = array("i")  # date.toordinal()
+        self._gpas = array("d")  # NaN = None
+        self._class_ids = array("q")
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    def append(
+        self,
+        row: int,
+        student_id: str,
+        fullname: str,
+        dob: date | None,
+        gpa: float | None,
+        class_id: int | None,
+    ) -> None:
+        self.rows.append(row)
+        self.student_ids.append(student_id)
+        self.fullnames.append(fullname)
+        self._dobs.append(dob.toordinal() if dob else _NO_DATE)
+        self._gpas.append(math.nan if gpa is None else gpa)
+        self._class_ids.append(_NO_CLASS if class_id is None else class_id)
+
+    def dob(self, index: int) -> date | None:
+        ordinal = self._dobs[index]
+        return date.fromordinal(ordinal) if ordinal != _NO_DATE else None
+
+    def gpa(self, index: int) -> float | None:
+        value = self._gpas[index]
+        return None if math.isnan(value) else value
+
+    def class_id(self, index: int) -> int | None:
+        value = self._class_ids[index]
+        return None if value == _NO_CLASS else value
+
+    def values(self, index: int) -> dict[str, Any]:
+        """Params cho bulk INSERT/UPDATE của 1 row"""
+        fullname = self.fullnames[index]
+        return {
+            "student_id": self.student_ids[index],
+            "fullname": fullname,
+            "fullname_normalized": normalize_name(fullname),
+            "dob": self.dob(index),
+            "gpa": self.gpa(index),
+            "class_id": self.class_id(index),
+        }
+
+    def chunks(self, size: int) -> Iterator[range]:
+        for start in range(0, len(self), size):
+            yield range(start, min(start + size, len(self)))
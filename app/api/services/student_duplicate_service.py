@@ -0,0 +1,161 @@
+"""
+Student Duplicate Detection
+Phát hiện sinh viên nghi trùng (cùng người, khác student_id) khi import.
+
+Blocking: mỗi sinh viên có vài blocking key (hash của tên đã normalize + dob),
+chỉ so sánh các cặp trong cùng block nên chạy gần tuyến tính theo
+số row của batch + số sinh viên đã có cùng dob.
+Row không có dob không được kiểm tra.
+"""
+
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import date
+from typing import NamedTuple
+
+from sqlmodel import Session, col, select
+
+from app.api.schemas.student import StudentDuplicate
+from app.core.text import normalize_name, trigrams
+from app.models.student_model import Student
+
+
+class DuplicateCandidate(NamedTuple):
+    # row trong file, 0 với sinh viên đã có trong DB
+    row: int
+    student_id: str
+    fullname: str
+    name: str
+    dob: date
+
+
+class StudentDuplicateService:
+    """Service to find suspected duplicate students in an import batch"""
+
+    # Score tối thiểu (trigram similarity của tên) để báo trùng
+    MIN_SCORE = 0.6
+    # Block lớn hơn chỉ so sánh MAX_BLOCK_SIZE phần tử đầu, tránh O(n²)
+    MAX_BLOCK_SIZE = 50
+    # Số dob mỗi query khi load sinh viên đã có
+    DOB_CHUNK_SIZE = 1000
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find_duplicates(
+        self, candidates: list[DuplicateCandidate]
+    ) -> list[StudentDuplicate]:
+        """
+        So sánh các row của batch với nhau và với sinh viên đã có.
+
+        Args:
+            candidates: rows đã parse (có dob)
+        """
+        if not candidates:
+            return []
+
+        blocks: dict[bytes, list[DuplicateCandidate]] = defaultdict(list)
+        for candidate in candidates:
+            for key in self.blocking_keys(candidate.name, candidate.dob):
+                blocks[key].append(candidate)
+
+        batch_ids = {candidate.student_id for candidate in candidates}
+        for existing in self._existing_students({c.dob for c in candidates}):
+            if existing.student_id in batch_ids:
+                continue
+            for key in self.blocking_keys(existing.name, existing.dob):
+                block = blocks.get(key)
+                if block is not None:
+                    block.append(existing)
+
+        return self._score_blocks(blocks.values())
+
+    @staticmethod
+    def blocking_keys(name: str, dob: date) -> set[bytes]:
+        """
+        Blocking keys:
+        - tên đầy đủ + dob
+        - tên với các từ đã sort + dob (đảo thứ tự họ/tên)
+        - tên gọi (từ cuối) + dob (gõ sai họ/tên đệm)
+        """
+        words = name.split()
+        if not words:
+            return set()
+        parts = (
+            f"n|{name}",
+            f"s|{' '.join(sorted(words))}",
+            f"g|{words[-1]}",
+        )
+        return {
+            hashlib.blake2b(
+                f"{part}|{dob.isoformat()}".encode(), digest_size=8
+            ).digest()
+            for part in parts
+        }
+
+    @staticmethod
+    def score(name: str, other: str) -> float:
+        if name == other:
+            return 1.0
+        if sorted(name.split()) == sorted(other.split()):
+            return 0.95
+        grams, other_grams = trigrams(name), trigrams(other)
+        return len(grams & other_grams) / len(grams | other_grams)
+
+    def _score_blocks(
+        self, blocks: Iterable[list[DuplicateCandidate]]
+    ) -> list[StudentDuplicate]:
+        # (row của batch, student_id bị trùng) -> kết quả có score cao nhất
+        best: dict[tuple[int, str], StudentDuplicate] = {}
+        for block in blocks:
+            members = block[: self.MAX_BLOCK_SIZE]
+            for i, candidate in enumerate(members):
+                if not candidate.row:
+                    continue
+                for other in members[:i] + members[i + 1 :]:
+                    if other.student_id == candidate.student_id:
+                        continue
+                    # Cặp trong batch chỉ báo 1 lần, ở row sau
+                    if other.row and other.row > candidate.row:
+                        continue
+                    pair = (candidate.row, other.student_id)
+                    if pair in best:
+                        continue
+                    score = self.score(candidate.name, other.name)
+                    if score < self.MIN_SCORE:
+                        continue
+                    best[pair] = StudentDuplicate(
+                        row=candidate.row,
+                        student_id=candidate.student_id,
+                        fullname=candidate.fullname,
+                        duplicate_of=other.student_id,
+                        duplicate_fullname=other.fullname,
+                        source="BATCH" if other.row else "EXISTING",
+                        score=round(score, 4),
+                    )
+        return sorted(best.values(), key=lambda d: (d.row, -d.score))
+
+    def _existing_students(self, dobs: set[date]) -> Iterator[DuplicateCandidate]:
+        dob_list = sorted(dobs)
+        for start in range(0, len(dob_list), self.DOB_CHUNK_SIZE):
+            rows = self.session.exec(
+                select(
+                    Student.student_id,
+                    Student.fullname,
+                    Student.fullname_normalized,
+                    col(Student.dob),
+                ).where(
+                    col(Student.dob).in_(dob_list[start : start + self.DOB_CHUNK_SIZE])
+                )
+            )
+            for student_id, fullname, normalized, dob in rows:
+                if dob is None:  # IN không khớp NULL
+                    continue
+                yield DuplicateCandidate(
+                    row=0,
+                    student_id=student_id,
+                    fullname=fullname,
+                    name=normalized or normalize_name(fullname),
+                    dob=dob,
+                )
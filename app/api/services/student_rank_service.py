@@ -0,0 +1,363 @@
+"""
+Student Rank Service
+Thứ hạng GPA và percentile của sinh viên trong Class, Major và Intake.
+
+- In-memory: mỗi nhóm giữ 1 mảng GPA đã sắp xếp, tra hạng bằng binary search
+  (O(log n)); cập nhật theo event StudentsUpserted của import pipeline, ghi vào
+  bảng class (đổi major/intake) thì bỏ index và build lại
+- Ghi vào bảng student ngoài import (worker này) và index quá TTL (ghi từ
+  worker khác / SQL trực tiếp): build lại ở background, trong lúc đó vẫn trả
+  lời bằng index hiện tại
+- Cache nguội: trả lời bằng window function (rank / percent_rank) và build
+  index ở background
+
+Quy ước giống window function: rank = 1 + số bạn cùng nhóm có GPA cao hơn,
+percentile = 100 * số bạn có GPA thấp hơn / (n - 1). Sinh viên chưa có GPA không
+được xếp hạng.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
+from typing import Any
+
+from sqlmodel import Session, col, func, or_, select
+
+from app.api.schemas.student import GroupRank, StudentRank
+from app.core.cache import invalidate_on_write
+from app.core.config import settings
+from app.core.db import engine
+from app.models.class_model import Class
+from app.models.student_model import Student
+
+logger = logging.getLogger(__name__)
+
+GROUPS = ("class", "major", "intake")
+
+# (student_id, gpa, class_id, major_id, intake_id)
+RankRow = tuple[str, float | None, int | None, int | None, int | None]
+
+
+class GpaRankIndex:
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.built = False
+        self._building = False
+        # time.monotonic(): build lại khi quá _expires_at; lần ghi student gần nhất
+        self._expires_at = 0.0
+        self._written_at = 0.0
+        # Tăng mỗi lần invalidate / upsert khi chưa build: build đang chạy bị bỏ
+        self.generation = 0
+        # (group, group_id) -> GPA tăng dần
+        self._groups: dict[tuple[str, int], list[float]] = {}
+        # student_id -> (gpa, (class_id, major_id, intake_id))
+        self._students: dict[str, tuple[float | None, tuple[int | None, ...]]] = {}
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def bump(self, *namespaces: str) -> None:
+        with self._lock:
+            if "classes" in namespaces:
+                self.generation += 1
+                self.built = False
+                self._groups = {}
+                self._students = {}
+            else:
+                # Giữ index tới khi build lại xong
+                self._expires_at = 0.0
+                self._written_at = time.monotonic()
+
+    def start_build(self) -> bool:
+        """
+        True nếu caller được giao build: index chưa build hoặc đã cũ, và chưa
+        có build nào đang chạy
+        """
+        with self._lock:
+            if self._building or (self.built and not self.stale):
+                return False
+            self._building = True
+            return True
+
+    def build(
+        self, rows: Iterable[RankRow], generation: int, started_at: float
+    ) -> None:
+        """
+        Args:
+            started_at: time.monotonic() trước khi đọc `rows`; student bị ghi
+                sau thời điểm này thì index vẫn cũ, lần tra sau build lại
+        """
+        groups: dict[tuple[str, int], list[float]] = {}
+        students = {}
+        for student_id, gpa, *group_ids in rows:
+            students[student_id] = (gpa, tuple(group_ids))
+            if gpa is None:
+                continue
+            for group, group_id in zip(GROUPS, group_ids, strict=True):
+                if group_id is not None:
+                    groups.setdefault((group, group_id), []).append(gpa)
+        for gpas in groups.values():
+            gpas.sort()
+        with self._lock:
+            self._building = False
+            if generation == self.generation:
+                self._groups = groups
+                self._students = students
+                self.built = True
+                fresh = self._written_at < started_at
+                self._expires_at = started_at + self.ttl_seconds if fresh else 0.0
+
+    def abort_build(self) -> None:
+        with self._lock:
+            self._building = False
+
+    def upsert(self, rows: Iterable[RankRow], removed: Iterable[str] = ()) -> None:
+        with self._lock:
+            if not self.built:
+                self.generation += 1
+                return
+            for student_id in removed:
+                self._remove(student_id)
+            for student_id, gpa, *group_ids in rows:
+                self._remove(student_id)
+                self._students[student_id] = (gpa, tuple(group_ids))
+                if gpa is None:
+                    continue
+                for group, group_id in zip(GROUPS, group_ids, strict=True):
+                    if group_id is not None:
+                        insort(self._groups.setdefault((group, group_id), []), gpa)
+
+    def lookup(
+        self, student_id: str
+    ) -> tuple[float | None, dict[str, GroupRank]] | None:
+        """(gpa, {"<group>_rank": GroupRank}); None nếu sinh viên không có trong index"""
+        with self._lock:
+            entry = self._students.get(student_id)
+            if entry is None:
+                return None
+            gpa, group_ids = entry
+            ranks = {}
+            for group, group_id in zip(GROUPS, group_ids, strict=True):
+                if group_id is None:
+                    continue
+                gpas = self._groups.get((group, group_id), [])
+                size = len(gpas)
+                if gpa is None:
+                    ranks[f"{group}_rank"] = GroupRank(group_id=group_id, size=size)
+                    continue
+                lower = bisect_left(gpas, gpa)
+                ranks[f"{group}_rank"] = GroupRank(
+                    group_id=group_id,
+                    size=size,
+                    rank=size - bisect_right(gpas, gpa) + 1,
+                    percentile=round(100 * lower / (size - 1), 2) if size > 1 else 0.0,
+                )
+            return gpa, ranks
+
+    def _remove(self, student_id: str) -> None:
+        entry = self._students.pop(student_id, None)
+        if entry is None:
+            return
+        gpa, group_ids = entry
+        if gpa is None:
+            return
+        for group, group_id in zip(GROUPS, group_ids, strict=True):
+            if group_id is None:
+                continue
+            gpas = self._groups.get((group, group_id))
+            if gpas:
+                index = bisect_left(gpas, gpa)
+                if index < len(gpas) and gpas[index] == gpa:
+                    del gpas[index]
+
+
+gpa_rank_index = GpaRankIndex(ttl_seconds=settings.GPA_RANK_INDEX_TTL_SECONDS)
+# Import cập nhật index từng sinh viên qua StudentsUpserted (refresh)
+invalidate_on_write(
+    gpa_rank_index,
+    {Class.__tablename__: "classes", Student.__tablename__: "students"},
+    updated_by_events={Student.__tablename__},
+)
+
+
+class StudentRankService:
+    """Service to rank students by GPA within class, major and intake"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_rank(self, student_id: str) -> StudentRank | None:
+        self._build_in_background()
+        if gpa_rank_index.built:
+            return self._lookup(student_id)
+        target = self.session.exec(
+            select(Student.class_id, Class.major_id, Class.intake_id)
+            .select_from(Student)
+            .outerjoin(Class, col(Class.class_id) == Student.class_id)
+            .where(Student.student_id == student_id)
+        ).first()
+        if target is None:
+            return None
+        class_id, major_id, intake_id = target
+        return self._rank_sql(
+            class_id, major_id, intake_id, Student.student_id == student_id
+        ).get(student_id)
+
+    def get_class_ranking(self, class_id: int) -> list[StudentRank] | None:
+        """Sinh viên của class theo thứ hạng trong class (chưa có GPA xếp cuối)"""
+        target = self.session.exec(
+            select(Class.major_id, Class.intake_id).where(Class.class_id == class_id)
+        ).first()
+        if target is None:
+            return None
+        self._build_in_background()
+        if gpa_rank_index.built:
+            student_ids = self.session.exec(
+                select(Student.student_id).where(Student.class_id == class_id)
+            ).all()
+            ranks = [
+                rank for rank in map(self._lookup, student_ids) if rank is not None
+            ]
+        else:
+            major_id, intake_id = target
+            ranks = list(
+                self._rank_sql(
+                    class_id, major_id, intake_id, Student.class_id == class_id
+                ).values()
+            )
+        return sorted(ranks, key=self._class_order)
+
+    def refresh(self, student_ids: Iterable[str]) -> None:
+        """Cập nhật index cho các sinh viên vừa được import"""
+        student_ids = list(student_ids)
+        for start in range(0, len(student_ids), 1000):
+            chunk = student_ids[start : start + 1000]
+            rows = self.session.exec(
+                self._rows_statement(col(Student.student_id).in_(chunk))
+            ).all()
+            found = {row[0] for row in rows}
+            gpa_rank_index.upsert(
+                rows, removed=[sid for sid in chunk if sid not in found]
+            )
+
+    @staticmethod
+    def _lookup(student_id: str) -> StudentRank | None:
+        found = gpa_rank_index.lookup(student_id)
+        if found is None:
+            return None
+        gpa, ranks = found
+        return StudentRank(student_id=student_id, gpa=gpa, **ranks)
+
+    @staticmethod
+    def _class_order(rank: StudentRank) -> tuple[bool, int, str]:
+        position = rank.class_rank.rank if rank.class_rank is not None else None
+        return position is None, position or 0, rank.student_id
+
+    def _rank_sql(
+        self,
+        class_id: int | None,
+        major_id: int | None,
+        intake_id: int | None,
+        target: Any,
+    ) -> dict[str, StudentRank]:
+        """
+        Fallback khi index chưa build: window function trên các sinh viên cùng
+        class / major / intake với `target` (các target phải cùng 3 nhóm này)
+        """
+        group_ids = (class_id, major_id, intake_id)
+        group_columns = (
+            col(Student.class_id),
+            col(Class.major_id),
+            col(Class.intake_id),
+        )
+        # Mỗi partition cần đủ thành viên: lấy mọi sinh viên thuộc ít nhất 1 nhóm
+        peers = [
+            column == group_id
+            for column, group_id in zip(group_columns, group_ids, strict=True)
+            if group_id is not None
+        ]
+        windows: list[Any] = []
+        for group, column in zip(GROUPS, group_columns, strict=True):
+            # GPA NULL nằm ở partition riêng, không ảnh hưởng hạng của người khác
+            ranked = [column, col(Student.gpa).is_(None)]
+            windows += [
+                func.rank()
+                .over(partition_by=ranked, order_by=col(Student.gpa).desc())
+                .label(f"{group}_rank"),
+                func.percent_rank()
+                .over(partition_by=ranked, order_by=col(Student.gpa))
+                .label(f"{group}_percent_rank"),
+                func.count(col(Student.gpa))
+                .over(partition_by=column)
+                .label(f"{group}_size"),
+            ]
+        ranked_peers = (
+            select(Student.student_id, Student.gpa, *windows)
+            .select_from(Student)
+            .outerjoin(Class, col(Class.class_id) == Student.class_id)
+            .where(or_(target, *peers))
+            .subquery()
+        )
+        target_ids = select(Student.student_id).where(target)
+        # Xếp hạng so với mọi sinh viên cùng nhóm, kể cả ngoài scope
+        rows = self.session.exec(
+            select(*ranked_peers.c)
+            .where(ranked_peers.c.student_id.in_(target_ids))
+            .execution_options(all_students=True)
+        ).all()
+
+        ranks = {}
+        for student_id, gpa, *values in rows:
+            groups = {}
+            for index, (group, group_id) in enumerate(
+                zip(GROUPS, group_ids, strict=True)
+            ):
+                if group_id is None:
+                    continue
+                rank, percent_rank, size = values[3 * index : 3 * index + 3]
+                groups[f"{group}_rank"] = GroupRank(
+                    group_id=group_id,
+                    size=size,
+                    rank=rank if gpa is not None else None,
+                    percentile=round(100 * float(percent_rank), 2)
+                    if gpa is not None
+                    else None,
+                )
+            ranks[student_id] = StudentRank(student_id=student_id, gpa=gpa, **groups)
+        return ranks
+
+    @staticmethod
+    def _rows_statement(where: Any = None) -> Any:
+        statement = (
+            select(  # type: ignore[call-overload]
+                Student.student_id,
+                Student.gpa,
+                Student.class_id,
+                Class.major_id,
+                Class.intake_id,
+            )
+            .select_from(Student)
+            .outerjoin(Class, col(Class.class_id) == Student.class_id)
+        )
+        return statement.where(where) if where is not None else statement
+
+    def _build_in_background(self) -> None:
+        if not gpa_rank_index.start_build():
+            return
+        generation = gpa_rank_index.generation
+
+        def build() -> None:
+            try:
+                started_at = time.monotonic()
+                with Session(engine) as session:
+                    rows = session.exec(self._rows_statement()).all()
+                gpa_rank_index.build(rows, generation, started_at)
+            except Exception:
+                gpa_rank_index.abort_build()
+                logger.exception("Could not build GPA rank index")
+
+        threading.Thread(target=build, name="gpa-rank-index", daemon=True).start()
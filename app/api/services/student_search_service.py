@@ -0,0 +1,383 @@
+"""
+Student Search Service
+Tìm sinh viên theo tên không phân biệt dấu/hoa thường, có xếp hạng.
+
+- PostgreSQL: pg_trgm (GIN index trên student.fullname_normalized)
+- SQLite / khác: in-memory trigram index, build lại trong 1 thread nền sau TTL
+  và cập nhật theo event StudentsUpserted của import pipeline trong lúc chờ;
+  trước lần build đầu tiên tìm bằng substring trong DB
+"""
+
+import heapq
+import logging
+import threading
+import time
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from itertools import islice
+
+from sqlmodel import Session, col, func, or_, select
+
+from app.api.schemas.student import StudentSearchResult
+from app.core.config import settings
+from app.core.db import engine
+from app.core.scope import UNRESTRICTED, StudentScope
+from app.core.text import normalize_name, trigrams
+from app.models.student_model import Student
+
+logger = logging.getLogger(__name__)
+
+# (student_id, fullname_normalized, class_id)
+Row = tuple[str, str, int | None]
+
+
+class TrigramIndex:
+    """
+    Inverted index trigram -> name ids (array of uint32) trên các tên khác nhau
+    (tên trùng rất nhiều: "nguyen van hung"), mỗi tên -> các student_id.
+    Giữ class_id của từng sinh viên để lọc scope trước khi cắt candidate.
+    Tên không còn sinh viên nào là tombstone; index được compact khi tombstone
+    chiếm quá `COMPACT_RATIO` số tên.
+
+    Index thuộc về 1 worker, chỉ được cập nhật theo event của worker đó: hết
+    `ttl_seconds` thì `stale` và được build lại từ DB (mỗi lúc 1 build, search
+    vẫn dùng index cũ trong lúc build).
+    """
+
+    # Số tên (candidate) tối đa được chấm điểm cho 1 query
+    MAX_CANDIDATES = 2000
+    COMPACT_RATIO = 0.25
+    COMPACT_MIN_TOMBSTONES = 1000
+
+    def __init__(self, ttl_seconds: float = float("inf")) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.built = False
+        self._building = False
+        # time.monotonic(): lúc bắt đầu đọc dữ liệu của lần build gần nhất;
+        # lần upsert gần nhất
+        self._built_at = 0.0
+        self._upserted_at = 0.0
+        self._postings: dict[str, array[int]] = {}
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        # name id -> student_ids (dict làm ordered set)
+        self._students: list[dict[str, None]] = []
+        self._name_by_student: dict[str, int] = {}
+        self._class_by_student: dict[str, int | None] = {}
+        self._students_by_class: dict[int | None, dict[str, None]] = {}
+        self._tombstones = 0
+
+    @property
+    def stale(self) -> bool:
+        return not self.built or time.monotonic() - self._built_at >= self.ttl_seconds
+
+    def start_build(self) -> bool:
+        """
+        True nếu caller được giao build: index chưa build hoặc đã cũ, và chưa
+        có build nào đang chạy
+        """
+        with self._lock:
+            if self._building or not self.stale:
+                return False
+            self._building = True
+            return True
+
+    def build(self, rows: Iterable[Row], started_at: float | None = None) -> None:
+        """
+        Args:
+            rows: (student_id, fullname_normalized, class_id)
+            started_at: time.monotonic() trước khi đọc `rows`; có upsert sau
+                thời điểm này thì index vẫn cũ, lần search sau build lại
+        """
+        if started_at is None:
+            started_at = time.monotonic()
+        # Build ngoài lock: search vẫn dùng index cũ trong lúc build
+        fresh = TrigramIndex()
+        for student_id, name, class_id in rows:
+            fresh._add(student_id, name, class_id)
+        with self._lock:
+            self._building = False
+            self._swap(fresh)
+            self.built = True
+            fresh_data = self._upserted_at < started_at
+            self._built_at = started_at if fresh_data else float("-inf")
+
+    def abort_build(self) -> None:
+        with self._lock:
+            self._building = False
+
+    def mark_written(self) -> None:
+        """Sinh viên được ghi khi chưa có index: build đang chạy có thể đã cũ"""
+        with self._lock:
+            self._upserted_at = time.monotonic()
+
+    def upsert(self, rows: Iterable[Row]) -> None:
+        with self._lock:
+            self._upserted_at = time.monotonic()
+            for student_id, name, class_id in rows:
+                name_id = self._name_by_student.get(student_id)
+                if name_id is not None:
+                    old_class_id = self._class_by_student[student_id]
+                    if self._names[name_id] == name and old_class_id == class_id:
+                        continue
+                    del self._students_by_class[old_class_id][student_id]
+                    students = self._students[name_id]
+                    del students[student_id]
+                    if not students:
+                        self._tombstones += 1
+                self._add(student_id, name, class_id)
+            if (
+                self._tombstones >= self.COMPACT_MIN_TOMBSTONES
+                and self._tombstones >= self.COMPACT_RATIO * len(self._names)
+            ):
+                self._compact()
+
+    def search(
+        self, query: str, limit: int, class_ids: frozenset[int] | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Trả về [(student_id, score)] theo score giảm dần
+
+        Args:
+            class_ids: chỉ sinh viên thuộc các class này (None: không giới hạn)
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        with self._lock:
+            # Candidate = tên có nhiều trigram chung với query nhất, đếm trên mọi
+            # posting (cắt theo thứ tự id sẽ bỏ sót kết quả khớp chính xác)
+            overlap: Counter[int] = Counter()
+            for gram in query_grams:
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    overlap.update(posting)
+            students: list[dict[str, None]] | dict[int, dict[str, None]]
+            if class_ids is None:
+                students = self._students
+                counts = (
+                    (c, name_id) for name_id, c in overlap.items() if students[name_id]
+                )
+            else:
+                # Lọc scope trước khi cắt candidate: chỉ tên của sinh viên trong scope
+                students = self._scoped_students(class_ids)
+                counts = (
+                    (c, name_id)
+                    for name_id, c in overlap.items()
+                    if name_id in students
+                )
+            candidates = heapq.nlargest(self.MAX_CANDIDATES, counts)
+            scored = sorted(
+                (
+                    (self._score(query, query_grams, self._names[name_id]), name_id)
+                    for _, name_id in candidates
+                ),
+                reverse=True,
+            )
+            results: list[tuple[str, float]] = []
+            for score, name_id in scored:
+                if score <= 0 or len(results) >= limit:
+                    break
+                results.extend(
+                    (student_id, score)
+                    for student_id in islice(students[name_id], limit - len(results))
+                )
+            return results
+
+    @staticmethod
+    def _score(query: str, query_grams: set[str], name: str) -> float:
+        name_grams = trigrams(name)
+        score = len(query_grams & name_grams) / len(query_grams | name_grams)
+        # Ưu tiên substring, đặc biệt là prefix của một từ (typeahead)
+        if query in name:
+            score += 0.5
+            if name.startswith(query) or f" {query}" in name:
+                score += 0.5
+        return score
+
+    def _scoped_students(self, class_ids: frozenset[int]) -> dict[int, dict[str, None]]:
+        """name id -> student_ids thuộc các class trong scope"""
+        scoped: dict[int, dict[str, None]] = {}
+        for class_id in class_ids:
+            for student_id in self._students_by_class.get(class_id, ()):
+                scoped.setdefault(self._name_by_student[student_id], {})[student_id] = (
+                    None
+                )
+        return scoped
+
+    def _add(self, student_id: str, name: str, class_id: int | None) -> None:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+            self._students.append({})
+            for gram in trigrams(name):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array("I")
+                posting.append(name_id)
+        elif not self._students[name_id]:
+            self._tombstones -= 1
+        self._students[name_id][student_id] = None
+        self._name_by_student[student_id] = name_id
+        self._class_by_student[student_id] = class_id
+        self._students_by_class.setdefault(class_id, {})[student_id] = None
+
+    def _compact(self) -> None:
+        """Build lại postings từ các tên còn sinh viên (gọi khi đang giữ lock)"""
+        fresh = TrigramIndex()
+        for name, students in zip(self._names, self._students, strict=True):
+            for student_id in students:
+                fresh._add(student_id, name, self._class_by_student[student_id])
+        self._swap(fresh)
+
+    def _swap(self, other: "TrigramIndex") -> None:
+        self._postings = other._postings
+        self._names = other._names
+        self._name_ids = other._name_ids
+        self._students = other._students
+        self._name_by_student = other._name_by_student
+        self._class_by_student = other._class_by_student
+        self._students_by_class = other._students_by_class
+        self._tombstones = other._tombstones
+
+
+student_name_index = TrigramIndex(ttl_seconds=settings.STUDENT_SEARCH_INDEX_TTL_SECONDS)
+
+
+class StudentSearchService:
+    """Service to search students by name"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def search(
+        self, query: str, limit: int = 10, scope: StudentScope = UNRESTRICTED
+    ) -> list[StudentSearchResult]:
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        if self.session.get_bind().dialect.name == "postgresql":
+            return self._search_postgres(normalized, limit, scope)
+        return self._search_in_memory(normalized, limit, scope)
+
+    def _search_postgres(
+        self, query: str, limit: int, scope: StudentScope
+    ) -> list[StudentSearchResult]:
+        similarity = func.similarity(Student.fullname_normalized, query)
+        rows = self.session.exec(
+            select(Student, similarity)
+            .where(
+                or_(
+                    col(Student.fullname_normalized).op("%")(query),
+                    col(Student.fullname_normalized).contains(query, autoescape=True),
+                ),
+                scope.condition(),
+            )
+            .order_by(similarity.desc())
+            .limit(limit)
+        ).all()
+        return [self._result(student, score) for student, score in rows]
+
+    def _search_in_memory(
+        self, query: str, limit: int, scope: StudentScope
+    ) -> list[StudentSearchResult]:
+        self._build_in_background()
+        if student_name_index.built:
+            ranked = student_name_index.search(query, limit, scope.class_ids)
+        else:
+            ranked = self._search_substring(query, limit, scope)
+        if not ranked:
+            return []
+        students = {
+            student.student_id: student
+            for student in self.session.exec(
+                select(Student).where(
+                    col(Student.student_id).in_([sid for sid, _ in ranked]),
+                    scope.condition(),
+                )
+            ).all()
+        }
+        return [
+            self._result(students[sid], score)
+            for sid, score in ranked
+            if sid in students
+        ]
+
+    def _search_substring(
+        self, query: str, limit: int, scope: StudentScope
+    ) -> list[tuple[str, float]]:
+        """Trước lần build index đầu tiên: tên chứa query, chấm điểm như index"""
+        rows = self.session.exec(
+            select(Student.student_id, Student.fullname_normalized)
+            .where(
+                col(Student.fullname_normalized).contains(query, autoescape=True),
+                scope.condition(),
+            )
+            .limit(TrigramIndex.MAX_CANDIDATES)
+        ).all()
+        query_grams = trigrams(query)
+        scored = [
+            (TrigramIndex._score(query, query_grams, name), student_id)
+            for student_id, name in rows
+        ]
+        return [
+            (student_id, score) for score, student_id in heapq.nlargest(limit, scored)
+        ]
+
+    @staticmethod
+    def _build_in_background() -> None:
+        if not student_name_index.start_build():
+            return
+
+        def build() -> None:
+            try:
+                started_at = time.monotonic()
+                # Index dùng chung cho mọi user: build trên toàn bộ sinh viên
+                with Session(engine) as session:
+                    rows = session.exec(
+                        select(
+                            Student.student_id,
+                            Student.fullname_normalized,
+                            Student.class_id,
+                        ).execution_options(all_students=True)
+                    ).all()
+                student_name_index.build(rows, started_at)
+            except Exception:
+                student_name_index.abort_build()
+                logger.exception("Could not build student name index")
+
+        threading.Thread(target=build, name="student-name-index", daemon=True).start()
+
+    def refresh_index(self, student_ids: Iterable[str]) -> None:
+        """Cập nhật in-memory index cho các sinh viên vừa được import"""
+        if not student_name_index.built:
+            student_name_index.mark_written()
+            return
+        student_ids = list(student_ids)
+        for start in range(0, len(student_ids), 1000):
+            student_name_index.upsert(
+                self.session.exec(
+                    select(
+                        Student.student_id,
+                        Student.fullname_normalized,
+                        Student.class_id,
+                    )
+                    .where(
+                        col(Student.student_id).in_(student_ids[start : start + 1000])
+                    )
+                    .execution_options(all_students=True)
+                ).all()
+            )
+
+    @staticmethod
+    def _result(student: Student, score: float) -> StudentSearchResult:
+        return StudentSearchResult(
+            student_id=student.student_id,
+            fullname=student.fullname,
+            class_id=student.class_id,
+            score=round(float(score), 4),
+        )
@@ -3,83 +3,128 @@ CSV Upload Service
 Xử lý logic upload và parse CSV file cho students
 """
 import csv
+import io
 from datetime import datetime
-from io import StringIO
-from typing import Dict, Any, List, Tuple
+from typing import Any
 
-from fastapi import UploadFile, HTTPException
-from sqlmodel import Session, select
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import false
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, col, or_, select
 
+from app.api.schemas.student import (
+    StudentDuplicate,
+    StudentRowError,
+    StudentUploadResult,
+)
+from app.api.services.student_batch import StudentBatch
+from app.api.services.student_duplicate_service import (
+    DuplicateCandidate,
+    StudentDuplicateService,
+)
+from app.core.cache import publishing_writes
+from app.core.compression import open_gzip_upload
+from app.core.config import settings
+from app.core.events import StudentsUpserted, UploadFinished, event_bus
+from app.core.scope import UNRESTRICTED, StudentScope
+from app.core.text import normalize_name, truncate
+from app.models.class_model import Class
 from app.models.student_model import Student
-from app.models.upload_history_model import UploadHistory
+from app.models.upload_history_model import ERROR_MESSAGE_MAX_LENGTH, UploadHistory
 from app.models.user_model import User
 
 
 class StudentService:
     """Service to handle all student related operations"""
-    
+
+    # Số row mỗi câu bulk upsert
+    WRITE_BATCH_SIZE = 1000
+    # Cột được ghi đè khi student_id đã tồn tại
+    UPSERT_COLUMNS = ("fullname", "fullname_normalized", "dob", "gpa", "class_id")
+
     def __init__(self, session: Session):
         self.session = session
-    
-    async def import_students_from_csv(
-        self, 
-        file: UploadFile, 
-        current_user: User
-    ) -> UploadHistory:
+
+    def import_students_from_csv(
+        self,
+        file: UploadFile,
+        current_user: User,
+        detect_duplicates: bool = False,
+        scope: StudentScope = UNRESTRICTED
+    ) -> StudentUploadResult:
         """
-        Upload và process CSV file chứa thông tin sinh viên
-        
+        Upload và process CSV file chứa thông tin sinh viên.
+        Đồng bộ (parse + bulk write): route gọi phải là `def` để chạy trong
+        threadpool, không chặn event loop.
+
         Args:
             file: CSV file upload
             current_user: User đang thực hiện upload
-            
+            detect_duplicates: Báo các sinh viên nghi trùng (cùng tên + dob, khác student_id)
+            scope: Chỉ được ghi sinh viên thuộc các class trong scope của user
+
         Returns:
-            UploadHistory: Record chứa kết quả upload
-            
+            StudentUploadResult: Kết quả upload (+ suspected_duplicates)
+
         Raises:
             HTTPException: Nếu file không hợp lệ
         """
         # Validate file
         self._validate_file(file)
-        
+
         # Create upload history record
         upload_history = self._create_upload_history(file.filename, current_user.user_id)
-        
+        result: dict[str, Any] | None = None
+        duplicates: list[StudentDuplicate] = []
+
         try:
-            # Parse CSV content
-            rows = await self._parse_csv(file)
-            
-            # Process rows
-            result = self._process_students(rows, current_user)
-            
+            # Parse + validate CSV thành column batch (foreign key check in-memory)
+            self._load_class_lookup(scope)
+            batch, errors = self._parse_csv(file)
+
+            # Duplicate detection chạy trên dữ liệu trước khi import
+            if detect_duplicates:
+                duplicates = self._find_duplicates(batch)
+
+            # Bulk write; thay đổi được publish qua StudentsUpserted
+            with publishing_writes(self.session, Student.__tablename__):
+                result = self._process_students(batch, errors)
+
             # Update history with success
             self._update_history_success(upload_history, result)
-            
+
         except Exception as e:
+            # Bỏ các thay đổi dở dang (session có thể đã lỗi khi flush)
+            self.session.rollback()
             # Update history with failure
             self._update_history_failure(upload_history, str(e))
             raise
-        
+
         finally:
             self.session.commit()
             self.session.refresh(upload_history)
-        
-        return upload_history
-    
+            self._publish_events(upload_history, result)
+
+        return StudentUploadResult(
+            **upload_history.model_dump(),
+            errors=result["errors"] if result else [],
+            suspected_duplicates=duplicates
+        )
+
     def _validate_file(self, file: UploadFile) -> None:
         """Validate file type"""
         if not file.filename:
             raise HTTPException(status_code=400, detail="File name is required")
-        
-        if not file.filename.endswith('.csv'):
+
+        if not file.filename.endswith(('.csv', '.csv.gz')):
             raise HTTPException(
-                status_code=400, 
-                detail="Only CSV files are allowed. Please upload a .csv file"
+                status_code=400,
+                detail="Only CSV files are allowed. Please upload a .csv or .csv.gz file"
             )
-    
+
     def _create_upload_history(
-        self, 
-        filename: str, 
+        self,
+        filename: str,
         user_id: int
     ) -> UploadHistory:
         """Create upload history record"""
@@ -92,57 +137,86 @@ class StudentService:
         self.session.commit()
         self.session.refresh(upload_history)
         return upload_history
-    
-    async def _parse_csv(self, file: UploadFile) -> List[Dict[str, str]]:
+
+    def _parse_csv(
+        self,
+        file: UploadFile
+    ) -> tuple[StudentBatch, list[StudentRowError]]:
         """
-        Parse CSV file content
-        
+        Parse và validate CSV file (streaming, không giữ toàn bộ content)
+
         Returns:
-            List of dicts, mỗi dict là 1 row
+            (StudentBatch chứa rows hợp lệ, lỗi của các row bị reject)
         """
-        # Read file content
-        content = await file.read()
-        
-        # Decode (support UTF-8 with BOM)
+        self._check_file_size(file)
+
+        batch = StudentBatch()
+        errors: list[StudentRowError] = []
+        # Giải nén (gzip) + decode streaming (support UTF-8 with BOM)
+        content = open_gzip_upload(file.file, settings.IMPORT_MAX_DECOMPRESSED_BYTES)
+        text = io.TextIOWrapper(content, encoding="utf-8-sig", newline="")
         try:
-            decoded_content = content.decode('utf-8-sig')
+            csv_reader = csv.reader(text)
+
+            # Normalize headers (lowercase, strip whitespace)
+            header = next(csv_reader, None)
+            fieldnames = [name.strip().lower() for name in header] if header else None
+
+            # Validate required fields
+            self._validate_csv_headers(fieldnames)
+            columns = {name: index for index, name in enumerate(fieldnames or [])}
+
+            row_number = 0
+            for values in csv_reader:
+                if not values:
+                    continue
+                row_number += 1
+                try:
+                    batch.append(row_number, *self._parse_row(values, columns))
+                except ValueError as row_error:
+                    errors.append(StudentRowError(
+                        row=row_number,
+                        student_id=self._field(values, columns, "student_id") or None,
+                        error=str(row_error)
+                    ))
         except UnicodeDecodeError:
             raise HTTPException(
                 status_code=400,
                 detail="File encoding error. Please use UTF-8 encoding"
             )
-        
-        # Parse CSV
-        csv_file = StringIO(decoded_content)
-        csv_reader = csv.DictReader(csv_file)
-        
-        # Normalize headers (lowercase, strip whitespace)
-        if csv_reader.fieldnames:
-            csv_reader.fieldnames = [
-                name.strip().lower() 
-                for name in csv_reader.fieldnames
-            ]
-        
-        # Validate required fields
-        self._validate_csv_headers(csv_reader.fieldnames)
-        
-        # Convert to list
-        return list(csv_reader)
-    
-    def _validate_csv_headers(self, fieldnames: List[str] | None) -> None:
+        finally:
+            text.detach()
+
+        return batch, errors
+
+    def _check_file_size(self, file: UploadFile) -> None:
+        """413 nếu file vượt IMPORT_MAX_BODY_BYTES"""
+        size = file.size
+        if size is None:
+            file.file.seek(0, io.SEEK_END)
+            size = file.file.tell()
+            file.file.seek(0)
+        if size > settings.IMPORT_MAX_BODY_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is "
+                       f"{settings.IMPORT_MAX_BODY_BYTES} bytes"
+            )
+
+    def _validate_csv_headers(self, fieldnames: list[str] | None) -> None:
         """Validate CSV has required headers"""
         if not fieldnames:
             raise HTTPException(
                 status_code=400,
                 detail="CSV file is empty or has no headers"
             )
-        
+
         required_fields = ["student_id", "fullname"]
         missing_fields = [
-            field for field in required_fields 
+            field for field in required_fields
             if field not in fieldnames
         ]
-        
+
         if missing_fields:
             raise HTTPException(
                 status_code=400,
@@ -150,98 +224,235 @@ class StudentService:
                        f"Required: student_id, fullname. "
                        f"Optional: dob, gpa, class_id"
             )
-    
+
+    def _load_class_lookup(self, scope: StudentScope = UNRESTRICTED) -> None:
+        """Load class_id hợp lệ và class_name -> class_id (1 query mỗi import)"""
+        self._scope = scope
+        self._class_ids: set[int] = set()
+        self._class_names: dict[str, int] = {}
+        for class_id, class_name in self.session.exec(
+            select(Class.class_id, Class.class_name)
+        ).all():
+            self._class_ids.add(class_id)
+            self._class_names[class_name.strip().casefold()] = class_id
+
+    def _resolve_class_id(self, value: str) -> int | None:
+        """
+        class_id trong CSV có thể là id hoặc class_name
+
+        Raises:
+            ValueError: Nếu class không tồn tại
+        """
+        if not value:
+            if not self._scope.unrestricted:
+                raise ValueError("class_id is required")
+            return None
+        class_id = self._parse_int(value)
+        if class_id is not None:
+            if class_id not in self._class_ids:
+                raise ValueError(f"Class {class_id} does not exist")
+        else:
+            class_id = self._class_names.get(value.casefold())
+            if class_id is None:
+                raise ValueError(f"Class '{value}' does not exist")
+        if not self._scope.allows_class(class_id):
+            raise ValueError(f"Class '{value}' is not assigned to you")
+        return class_id
+
+    def _find_duplicates(self, batch: StudentBatch) -> list[StudentDuplicate]:
+        """Tìm sinh viên nghi trùng trong file và với sinh viên đã có"""
+        candidates = [
+            DuplicateCandidate(
+                row=batch.rows[index],
+                student_id=batch.student_ids[index],
+                fullname=batch.fullnames[index],
+                name=normalize_name(batch.fullnames[index]),
+                dob=dob
+            )
+            for index in range(len(batch))
+            if (dob := batch.dob(index)) is not None
+        ]
+        return StudentDuplicateService(self.session).find_duplicates(candidates)
+
     def _process_students(
-        self, 
-        rows: List[Dict[str, str]], 
-        current_user: User
-    ) -> Dict[str, int]:
+        self,
+        batch: StudentBatch,
+        errors: list[StudentRowError]
+    ) -> dict[str, Any]:
         """
-        Process CSV rows và create/update students
-        
+        Create/update students bằng bulk upsert theo chunk
+        (không qua ORM unit-of-work / identity map)
+
         Returns:
-            Dict với keys: total_processed, success_count, failure_count
+            Dict với keys: total_processed, success_count, failure_count,
+            errors (StudentRowError), student_ids, class_ids (các key bị ảnh hưởng)
         """
-        total_processed = 0
-        success_count = 0
-        failure_count = 0
-        
-        for row in rows:
-            total_processed += 1
-            try:
-                self._process_single_student(row, current_user)
-                self.session.flush()
-                success_count += 1
-                
-            except Exception as row_error:
-                print(f"Error processing row {total_processed}: {row_error}")
-                failure_count += 1
-        
+        student_ids: set[str] = set()
+        class_ids: set[int] = set()
+        total_processed = len(batch) + len(errors)
+
+        rejected = 0
+        for chunk in batch.chunks(self.WRITE_BATCH_SIZE):
+            rejected += self._write_chunk(batch, chunk, student_ids, class_ids, errors)
+
         return {
             "total_processed": total_processed,
-            "success_count": success_count,
-            "failure_count": failure_count
+            "success_count": len(batch) - rejected,
+            "failure_count": len(errors),
+            "errors": errors,
+            "student_ids": student_ids,
+            "class_ids": class_ids,
         }
-    
-    def _process_single_student(
-        self, 
-        row: Dict[str, str], 
-        current_user: User
-    ) -> None:
-        """Process a single CSV row"""
-        # Extract and validate data
-        student_id = row.get("student_id", "").strip()
-        fullname = row.get("fullname", "").strip()
-        
+
+    def _write_chunk(
+        self,
+        batch: StudentBatch,
+        chunk: range,
+        student_ids: set[str],
+        class_ids: set[int],
+        errors: list[StudentRowError]
+    ) -> int:
+        """
+        Ghi 1 chunk: 1 query lấy sinh viên đã có (scope + class cũ), 1 câu
+        INSERT ... ON CONFLICT (student_id) DO UPDATE. Upsert nên import chạy
+        đồng thời cùng student_id mới không lỗi unique; class_id mới lấy từ
+        RETURNING. student_id lặp lại trong file: row sau ghi đè row trước.
+
+        Returns:
+            Số row bị reject (sinh viên đã có thuộc class ngoài scope)
+        """
+        positions: dict[str, int] = {}
+        for index in chunk:
+            positions[batch.student_ids[index]] = index
+
+        # student_id -> class_id hiện tại, kể cả sinh viên ngoài scope
+        existing: dict[str, int | None] = dict(self.session.exec(
+            select(Student.student_id, Student.class_id)
+            .where(col(Student.student_id).in_(list(positions)))
+            .execution_options(all_students=True)
+        ).all())
+
+        rejected = 0
+        if not self._scope.unrestricted:
+            for index in chunk:
+                student_id = batch.student_ids[index]
+                if student_id in existing and not self._scope.allows_class(existing[student_id]):
+                    positions.pop(student_id, None)
+                    rejected += self._reject_out_of_scope(batch, index, errors)
+        if not positions:
+            return rejected
+
+        for student_id in positions:
+            previous_class_id = existing.get(student_id)
+            if previous_class_id is not None:
+                class_ids.add(previous_class_id)
+
+        written = self.session.execute(
+            self._upsert_statement(),
+            [batch.values(index) for index in positions.values()],
+            # Giữ NULL trong params: cả chunk là 1 câu lệnh
+            execution_options={"render_nulls": True},
+        ).all()
+        for student_id, class_id in written:
+            student_ids.add(student_id)
+            if class_id is not None:
+                class_ids.add(class_id)
+
+        # Không được RETURNING: sinh viên vừa được import khác tạo trong class
+        # ngoài scope (điều kiện WHERE của DO UPDATE)
+        for student_id in positions.keys() - {student_id for student_id, _ in written}:
+            rejected += self._reject_out_of_scope(batch, positions[student_id], errors)
+        return rejected
+
+    def _upsert_statement(self) -> Any:
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement: Any = postgresql.insert(Student)
+        elif dialect == "sqlite":
+            statement = sqlite.insert(Student)
+        else:
+            raise NotImplementedError(f"Student import does not support {dialect}")
+        return statement.on_conflict_do_update(
+            index_elements=[Student.student_id],
+            set_={name: statement.excluded[name] for name in self.UPSERT_COLUMNS},
+            where=self._upsert_scope_condition(),
+        ).returning(Student.student_id, Student.class_id)
+
+    def _upsert_scope_condition(self) -> Any:
+        """
+        Teacher chỉ ghi đè sinh viên đang thuộc class trong scope. So sánh
+        từng class_id: IN (expanding) không dùng được với executemany
+        """
+        if self._scope.class_ids is None:
+            return None
+        if not self._scope.class_ids:
+            return false()
+        return or_(*(Student.class_id == class_id for class_id in sorted(self._scope.class_ids)))
+
+    @staticmethod
+    def _reject_out_of_scope(
+        batch: StudentBatch, index: int, errors: list[StudentRowError]
+    ) -> int:
+        student_id = batch.student_ids[index]
+        errors.append(StudentRowError(
+            row=batch.rows[index],
+            student_id=student_id,
+            error=f"Student {student_id} belongs to a class not assigned to you"
+        ))
+        return 1
+
+    def _parse_row(
+        self,
+        values: list[str],
+        columns: dict[str, int]
+    ) -> tuple[str, str, Any, float | None, int | None]:
+        """
+        Validate 1 CSV row
+
+        Returns:
+            (student_id, fullname, dob, gpa, class_id)
+
+        Raises:
+            ValueError: Nếu row không hợp lệ
+        """
+        student_id = self._field(values, columns, "student_id")
+        fullname = self._field(values, columns, "fullname")
+
         if not student_id or not fullname:
             raise ValueError("Missing required fields: student_id or fullname")
-        
-        # Parse optional fields
-        dob = self._parse_date(row.get("dob", "").strip())
-        gpa = self._parse_float(row.get("gpa", "").strip())
-        class_id = self._parse_int(row.get("class_id", "").strip())
-        
-        # Check if student exists
-        existing_student = self.session.exec(
-            select(Student).where(Student.student_id == student_id)
-        ).first()
-        
-        if existing_student:
-            # Update existing student
-            existing_student.fullname = fullname
-            existing_student.dob = dob
-            existing_student.gpa = gpa
-            existing_student.class_id = class_id
-            self.session.add(existing_student)
-        else:
-            # Create new student
-            new_student = Student(
-                student_id=student_id,
-                fullname=fullname,
-                dob=dob,
-                gpa=gpa,
-                class_id=class_id,
-                owner_id=current_user.user_id
-            )
-            self.session.add(new_student)
-    
+
+        return (
+            student_id,
+            fullname,
+            self._parse_date(self._field(values, columns, "dob")),
+            self._parse_float(self._field(values, columns, "gpa")),
+            self._resolve_class_id(self._field(values, columns, "class_id")),
+        )
+
+    @staticmethod
+    def _field(values: list[str], columns: dict[str, int], name: str) -> str:
+        index = columns.get(name)
+        if index is None or index >= len(values):
+            return ""
+        return values[index].strip()
+
     @staticmethod
     def _parse_date(date_str: str):
         """Parse date string to date object"""
         if not date_str:
             return None
-        
+
         # Try common date formats
         formats = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"]
-        
+
         for fmt in formats:
             try:
                 return datetime.strptime(date_str, fmt).date()
             except ValueError:
                 continue
-        
+
         return None
-    
+
     @staticmethod
     def _parse_float(value_str: str) -> float | None:
         """Parse string to float"""
@@ -251,7 +462,7 @@ class StudentService:
             return float(value_str)
         except ValueError:
             return None
-    
+
     @staticmethod
     def _parse_int(value_str: str) -> int | None:
         """Parse string to int"""
@@ -261,25 +472,56 @@ class StudentService:
             return int(value_str)
         except ValueError:
             return None
-    
+
     def _update_history_success(
-        self, 
-        history: UploadHistory, 
-        result: Dict[str, int]
+        self,
+        history: UploadHistory,
+        result: dict[str, Any]
     ) -> None:
         """Update history with success result"""
         history.status = "COMPLETED"
         history.total_processed = result["total_processed"]
         history.success_count = result["success_count"]
         history.failure_count = result["failure_count"]
+        if result["errors"]:
+            history.error_message = truncate(
+                "\n".join(f"Row {e.row}: {e.error}" for e in result["errors"]),
+                ERROR_MESSAGE_MAX_LENGTH
+            )
         self.session.add(history)
-    
+
     def _update_history_failure(
-        self, 
-        history: UploadHistory, 
+        self,
+        history: UploadHistory,
         error_message: str
     ) -> None:
         """Update history with failure"""
         history.status = "FAILED"
-        history.error_message = error_message
+        history.error_message = truncate(error_message, ERROR_MESSAGE_MAX_LENGTH)
         self.session.add(history)
+
+    @staticmethod
+    def _publish_events(
+        history: UploadHistory,
+        result: dict[str, Any] | None
+    ) -> None:
+        """Publish import events (after commit) cho cache/statistics/notifications"""
+        class_ids = frozenset(result["class_ids"]) if result else frozenset()
+        events: list[Any] = []
+        if result and result["student_ids"]:
+            events.append(StudentsUpserted(
+                student_ids=frozenset(result["student_ids"]),
+                class_ids=class_ids,
+                upload_id=history.id
+            ))
+        events.append(UploadFinished(
+            upload_id=history.id,
+            user_id=history.created_by_id,
+            file_name=history.file_name,
+            status=history.status,
+            total_processed=history.total_processed,
+            success_count=history.success_count,
+            failure_count=history.failure_count,
+            class_ids=class_ids
+        ))
+        event_bus.publish(*events)
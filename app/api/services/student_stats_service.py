@@ -0,0 +1,111 @@
+"""
+Student Statistics Service
+Aggregate theo class (số sinh viên, GPA trung bình) giữ trong memory,
+chỉ tính lại các class bị ảnh hưởng khi import (event StudentsUpserted).
+
+Write vào bảng student ngoài import qua session của worker này xóa cache;
+write từ worker khác chỉ được thấy sau TTL.
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+
+from sqlmodel import Session, col, func, select
+
+from app.api.schemas.student import ClassStats
+from app.core.cache import invalidate_on_write
+from app.core.config import settings
+from app.models.student_model import Student
+
+
+class ClassStatsCache:
+    """class_id -> ClassStats, cache theo TTL"""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats: dict[int, tuple[float, ClassStats]] = {}
+        # Tăng mỗi lần bump: stats tính trước khi bump không được lưu
+        self.version = 0
+
+    def get_many(self, class_ids: Iterable[int]) -> dict[int, ClassStats]:
+        now = time.monotonic()
+        found = {}
+        for cid in class_ids:
+            entry = self._stats.get(cid)
+            if entry is not None and entry[0] > now:
+                found[cid] = entry[1]
+        return found
+
+    def put_many(self, stats: dict[int, ClassStats], version: int) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if version != self.version:
+                return
+            for class_id, class_stats in stats.items():
+                self._stats[class_id] = (expires_at, class_stats)
+
+    def invalidate(self, class_ids: Iterable[int]) -> None:
+        with self._lock:
+            for class_id in class_ids:
+                self._stats.pop(class_id, None)
+
+    def bump(self, *namespaces: str) -> None:
+        with self._lock:
+            self.version += 1
+            self._stats.clear()
+
+
+class_stats_cache = ClassStatsCache(ttl_seconds=settings.CLASS_STATS_CACHE_TTL_SECONDS)
+
+# Import cập nhật đúng các class bị ảnh hưởng qua StudentsUpserted
+invalidate_on_write(
+    class_stats_cache,
+    {Student.__tablename__: "students"},
+    updated_by_events={Student.__tablename__},
+)
+
+
+class StudentStatsService:
+    """Service to read and refresh per-class student statistics"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_class_stats(self, class_ids: list[int]) -> list[ClassStats]:
+        """Stats cho các class, chỉ query các class chưa có trong cache"""
+        cached = class_stats_cache.get_many(class_ids)
+        missing = [cid for cid in class_ids if cid not in cached]
+        if missing:
+            cached.update(self._compute(missing))
+        return [cached[cid] for cid in class_ids]
+
+    def refresh_classes(self, class_ids: Iterable[int]) -> None:
+        """Invalidate và tính lại các class bị ảnh hưởng trong 1 GROUP BY query"""
+        class_ids = list(set(class_ids))
+        if not class_ids:
+            return
+        class_stats_cache.invalidate(class_ids)
+        self._compute(class_ids)
+
+    def _compute(self, class_ids: list[int]) -> dict[int, ClassStats]:
+        version = class_stats_cache.version
+        rows = self.session.exec(
+            select(Student.class_id, func.count(), func.avg(Student.gpa))
+            .where(col(Student.class_id).in_(class_ids))
+            .group_by(col(Student.class_id))
+            .execution_options(all_students=True)
+        ).all()
+        # Class không còn sinh viên vẫn được cache với count = 0
+        stats = {cid: ClassStats(class_id=cid) for cid in class_ids}
+        for class_id, student_count, avg_gpa in rows:
+            if class_id is None:
+                continue
+            stats[class_id] = ClassStats(
+                class_id=class_id,
+                student_count=student_count,
+                avg_gpa=round(avg_gpa, 4) if avg_gpa is not None else None,
+            )
+        class_stats_cache.put_many(stats, version)
+        return stats
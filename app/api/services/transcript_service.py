@@ -0,0 +1,253 @@
+"""
+Transcript Service
+Bảng điểm của sinh viên: 1 query JOIN student -> score -> course -> intake,
+điểm trung bình có trọng số tín chỉ (Course.tcdh) tính bằng window function.
+
+Kết quả cache theo student_id (LRU), invalidate sau commit khi score/student
+của sinh viên đó bị ghi; ghi vào course/intake xóa toàn bộ cache. Invalidation
+chỉ thấy ghi của worker hiện tại (ORM session): entry hết hạn sau TTL để ghi từ
+worker khác / SQL trực tiếp cũng được thấy.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, and_, case, col, func, select
+
+from app.api.schemas.transcript import Transcript, TranscriptCourse
+from app.core.config import settings
+from app.core.grading import PASSING_SCORE, credits_sql, grade_point_sql
+from app.models.course_model import Course
+from app.models.intake_model import Intake
+from app.models.score_model import Score
+from app.models.student_model import Student
+
+
+class TranscriptCache:
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # student_id -> (expires_at, transcript)
+        self._entries: OrderedDict[str, tuple[float, Transcript]] = OrderedDict()
+        # Tăng mỗi lần invalidate: kết quả tính trước đó không được put vào cache
+        self.generation = 0
+
+    def get(self, student_id: str) -> Transcript | None:
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[student_id]
+                return None
+            self._entries.move_to_end(student_id)
+            return entry[1]
+
+    def put_many(self, transcripts: dict[str, Transcript], generation: int) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation != self.generation:
+                return
+            for student_id, transcript in transcripts.items():
+                self._entries[student_id] = (expires_at, transcript)
+                self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, student_ids: Iterable[str]) -> None:
+        with self._lock:
+            self.generation += 1
+            for student_id in student_ids:
+                self._entries.pop(student_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+transcript_cache = TranscriptCache(
+    settings.TRANSCRIPT_CACHE_MAX_ENTRIES, settings.TRANSCRIPT_CACHE_TTL_SECONDS
+)
+
+
+class TranscriptService:
+    """Service to build student transcripts"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_transcript(self, student_id: str) -> Transcript | None:
+        transcript = transcript_cache.get(student_id)
+        if transcript is None:
+            transcript = self._load(Student.student_id == student_id).get(student_id)
+        return transcript
+
+    def get_class_transcripts(self, class_id: int) -> list[Transcript]:
+        """Transcript của cả class trong 1 query"""
+        return list(self._load(Student.class_id == class_id).values())
+
+    def _load(self, where: Any) -> dict[str, Transcript]:
+        generation = transcript_cache.generation
+        credits = credits_sql(Course.tcdh)
+        point = grade_point_sql(Score.score)
+        counted = col(Score.score).is_not(None)
+        mandatory = and_(counted, Course.is_bb == True)  # noqa: E712
+
+        def per_student(expression: Any) -> Any:
+            return func.sum(case((counted, expression), else_=0)).over(
+                partition_by=Student.student_id
+            )
+
+        def per_student_mandatory(expression: Any) -> Any:
+            return func.sum(case((mandatory, expression), else_=0)).over(
+                partition_by=Student.student_id
+            )
+
+        attempted = per_student(credits)
+        mandatory_credits = per_student_mandatory(credits)
+        rows = self.session.exec(
+            select(  # type: ignore[call-overload, misc]
+                Student.student_id,
+                Student.fullname,
+                Student.class_id,
+                Score.course_id,
+                Course.course_name,
+                credits,
+                Course.is_bb,
+                Intake.kdb,
+                Score.score,
+                point,
+                per_student(Score.score * credits) / func.nullif(attempted, 0),
+                per_student(point * credits) / func.nullif(attempted, 0),
+                per_student_mandatory(point * credits)
+                / func.nullif(mandatory_credits, 0),
+                attempted,
+                func.sum(
+                    case(
+                        (and_(counted, col(Score.score) >= PASSING_SCORE), credits),
+                        else_=0,
+                    )
+                ).over(partition_by=Student.student_id),
+            )
+            .select_from(Student)
+            .outerjoin(Score, col(Score.student_id) == Student.student_id)
+            .outerjoin(Course, col(Course.course_id) == Score.course_id)
+            .outerjoin(Intake, col(Intake.intake_id) == Course.intake_id)
+            .where(where)
+            .order_by(Student.student_id, Course.course_name)
+        ).all()
+
+        transcripts: dict[str, Transcript] = {}
+        for (
+            student_id,
+            fullname,
+            class_id,
+            course_id,
+            course_name,
+            course_credits,
+            is_bb,
+            kdb,
+            score,
+            grade_point,
+            average_score,
+            gpa,
+            mandatory_gpa,
+            attempted_credits,
+            earned_credits,
+        ) in rows:
+            transcript = transcripts.get(student_id)
+            if transcript is None:
+                transcript = transcripts[student_id] = Transcript(
+                    student_id=student_id,
+                    fullname=fullname,
+                    class_id=class_id,
+                    average_score=self._round(average_score),
+                    gpa=self._round(gpa),
+                    mandatory_gpa=self._round(mandatory_gpa),
+                    attempted_credits=attempted_credits or 0,
+                    earned_credits=earned_credits or 0,
+                )
+            if course_id is None:
+                continue
+            transcript.courses.append(
+                TranscriptCourse(
+                    course_id=course_id,
+                    course_name=course_name or "",
+                    credits=course_credits,
+                    is_bb=bool(is_bb),
+                    intake_kdb=kdb,
+                    score=score,
+                    grade_point=grade_point,
+                    passed=score is not None and score >= PASSING_SCORE,
+                )
+            )
+
+        transcript_cache.put_many(transcripts, generation)
+        return transcripts
+
+    @staticmethod
+    def _round(value: float | None) -> float | None:
+        return round(float(value), 4) if value is not None else None
+
+
+# Invalidation sau commit
+
+_PENDING_KEY = "transcript_pending"
+_ALL = "*"
+_STUDENT_TABLES = {"score", "student"}
+_GLOBAL_TABLES = {"course", "intake"}
+
+
+def _pending(session: OrmSession) -> set[str]:
+    pending: set[str] = session.info.setdefault(_PENDING_KEY, set())
+    return pending
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Score, Student)):
+            if obj.student_id is not None:
+                _pending(session).add(obj.student_id)
+        elif isinstance(obj, (Course, Intake)):
+            _pending(session).add(_ALL)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(getattr(state.statement, "table", None), "name", None)
+    if table in _GLOBAL_TABLES:
+        _pending(state.session).add(_ALL)
+    elif table in _STUDENT_TABLES:
+        # Bulk INSERT/UPDATE theo params: biết chính xác student_id bị ảnh hưởng
+        params = state.parameters
+        if isinstance(params, list) and all("student_id" in p for p in params):
+            _pending(state.session).update(p["student_id"] for p in params)
+        else:
+            _pending(state.session).add(_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    student_ids = session.info.pop(_PENDING_KEY, None)
+    if not student_ids:
+        return
+    if _ALL in student_ids:
+        transcript_cache.clear()
+    else:
+        transcript_cache.invalidate(student_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
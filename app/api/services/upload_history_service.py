@@ -0,0 +1,265 @@
+"""
+Upload History Service
+- Lịch sử upload theo user: keyset pagination trên (created_by_id, created_at),
+  chi phí mỗi trang không phụ thuộc kích thước bảng
+- Retention: entry cũ hơn N tháng được gộp vào upload_history_monthly rồi xóa.
+  PostgreSQL: bảng partition theo tháng, partition cũ bị DROP thay vì DELETE
+"""
+
+import base64
+import logging
+import re
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Date, case, literal, text
+from sqlmodel import Session, and_, col, delete, func, or_, select
+
+from app.api.schemas.upload_history import UploadHistoriesPublic
+from app.models.upload_history_model import UploadHistory
+from app.models.upload_history_monthly_model import UploadHistoryMonthly
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "upload_history_p"
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: date, months_offset: int = 0) -> date:
+    """Ngày đầu tháng của `value`, dịch `months_offset` tháng"""
+    index = value.year * 12 + value.month - 1 + months_offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+class UploadHistoryService:
+    """Service to read and maintain upload history"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def list_history(
+        self, user_id: int | None, cursor: str | None, limit: int
+    ) -> UploadHistoriesPublic:
+        """
+        Upload history mới nhất trước, `cursor` lấy từ next_cursor của trang trước
+
+        Args:
+            user_id: Chỉ lấy history của user này (None: tất cả)
+        """
+        statement = select(UploadHistory)
+        if user_id is not None:
+            statement = statement.where(UploadHistory.created_by_id == user_id)
+        if cursor:
+            created_at, history_id = self._decode_cursor(cursor)
+            statement = statement.where(
+                or_(
+                    col(UploadHistory.created_at) < created_at,
+                    and_(
+                        UploadHistory.created_at == created_at,
+                        col(UploadHistory.id) < history_id,
+                    ),
+                )
+            )
+        rows = self.session.exec(
+            statement.order_by(
+                col(UploadHistory.created_at).desc(), col(UploadHistory.id).desc()
+            ).limit(limit + 1)
+        ).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1])
+        return UploadHistoriesPublic(data=rows, next_cursor=next_cursor)
+
+    def list_monthly(self, user_id: int | None) -> list[UploadHistoryMonthly]:
+        statement = select(UploadHistoryMonthly)
+        if user_id is not None:
+            statement = statement.where(UploadHistoryMonthly.created_by_id == user_id)
+        return list(
+            self.session.exec(
+                statement.order_by(col(UploadHistoryMonthly.month).desc())
+            ).all()
+        )
+
+    def compact(self, retention_months: int) -> int:
+        """
+        Gộp các entry trước tháng (hiện tại - retention_months) vào
+        upload_history_monthly và xóa chúng, trong 1 transaction
+
+        Returns:
+            Số entry đã được gộp
+        """
+        cutoff = month_start(datetime.utcnow().date(), -retention_months)
+        cutoff_at = datetime.combine(cutoff, datetime.min.time())
+
+        month = self._month_expression()
+        rows = self.session.exec(
+            select(  # type: ignore[call-overload]
+                month,
+                UploadHistory.created_by_id,
+                func.count(),
+                func.sum(case((col(UploadHistory.status) == "COMPLETED", 1), else_=0)),
+                func.sum(case((col(UploadHistory.status) == "FAILED", 1), else_=0)),
+                func.sum(UploadHistory.total_processed),
+                func.sum(UploadHistory.success_count),
+                func.sum(UploadHistory.failure_count),
+            )
+            .where(col(UploadHistory.created_at) < cutoff_at)
+            .group_by(month, UploadHistory.created_by_id)
+        ).all()
+        if not rows:
+            return 0
+
+        summaries = self._load_summaries({self._as_date(row[0]) for row in rows})
+        compacted = 0
+        for (
+            month_value,
+            created_by_id,
+            uploads,
+            completed,
+            failed,
+            total,
+            success,
+            failure,
+        ) in rows:
+            key = (created_by_id, self._as_date(month_value))
+            summary = summaries.get(key)
+            if summary is None:
+                summary = summaries[key] = UploadHistoryMonthly(
+                    month=key[1], created_by_id=created_by_id
+                )
+            summary.uploads += uploads
+            summary.completed += completed or 0
+            summary.failed += failed or 0
+            summary.total_processed += total or 0
+            summary.success_count += success or 0
+            summary.failure_count += failure or 0
+            self.session.add(summary)
+            compacted += uploads
+        self.session.flush()
+
+        self._delete_before(cutoff)
+        self.session.commit()
+        return compacted
+
+    def ensure_partitions(self, months_ahead: int) -> list[str]:
+        """Tạo partition cho tháng hiện tại và `months_ahead` tháng tới (PostgreSQL)"""
+        if not self._is_partitioned():
+            return []
+        current = month_start(datetime.utcnow().date())
+        existing = set(self._partitions())
+        created = []
+        for offset in range(months_ahead + 1):
+            month = month_start(current, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(text(self._create_partition_ddl(name, month)))
+                created.append(name)
+            except Exception:
+                # Vd. default partition đã có row thuộc tháng này
+                logger.exception("Could not create partition %s", name)
+        self.session.commit()
+        return created
+
+    def _delete_before(self, cutoff: date) -> None:
+        if self._is_partitioned():
+            for name, month in self._partitions().items():
+                if month < cutoff:
+                    self.session.execute(text(f"DROP TABLE {self._quote(name)}"))
+        # Phần còn lại (SQLite, hoặc row trong default partition)
+        self.session.execute(
+            delete(UploadHistory).where(
+                col(UploadHistory.created_at)
+                < datetime.combine(cutoff, datetime.min.time())
+            )
+        )
+
+    def _create_partition_ddl(self, name: str, month: date) -> str:
+        # DDL không nhận bind parameter: tên quote theo dialect, bound render thành literal
+        dialect = self.session.get_bind().dialect
+        lower, upper = (
+            literal(value, Date()).compile(
+                dialect=dialect, compile_kwargs={"literal_binds": True}
+            )
+            for value in (month, month_start(month, 1))
+        )
+        return (
+            f"CREATE TABLE {self._quote(name)} PARTITION OF upload_history "
+            f"FOR VALUES FROM ({lower}) TO ({upper})"
+        )
+
+    def _quote(self, identifier: str) -> str:
+        return self.session.get_bind().dialect.identifier_preparer.quote(identifier)
+
+    def _load_summaries(
+        self, months: set[date]
+    ) -> dict[tuple[int | None, date], UploadHistoryMonthly]:
+        existing = self.session.exec(
+            select(UploadHistoryMonthly).where(
+                col(UploadHistoryMonthly.month).in_(months)
+            )
+        ).all()
+        return {(s.created_by_id, s.month): s for s in existing}
+
+    def _month_expression(self) -> Any:
+        if self.session.get_bind().dialect.name == "postgresql":
+            return func.date_trunc("month", UploadHistory.created_at)
+        return func.strftime("%Y-%m-01", UploadHistory.created_at)
+
+    def _is_partitioned(self) -> bool:
+        if self.session.get_bind().dialect.name != "postgresql":
+            return False
+        relkind: str | None = self.session.execute(
+            text(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass('upload_history')"
+            )
+        ).scalar()
+        return relkind == "p"
+
+    def _partitions(self) -> dict[str, date]:
+        """Partition theo tháng hiện có: tên -> tháng (bỏ qua default partition)"""
+        names = self.session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass('upload_history')"
+            )
+        ).scalars()
+        partitions = {}
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions[name] = date(int(match[1]), int(match[2]), 1)
+        return partitions
+
+    @staticmethod
+    def _as_date(value: Any) -> date:
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value))
+
+    @staticmethod
+    def _encode_cursor(history: UploadHistory) -> str:
+        raw = f"{history.created_at.isoformat()}|{history.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+        try:
+            created_at, history_id = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            )
+            return datetime.fromisoformat(created_at), int(history_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
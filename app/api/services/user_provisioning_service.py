@@ -0,0 +1,318 @@
+"""
+User Provisioning Service
+Tạo hàng loạt tài khoản (teacher) từ JSON hoặc CSV:
+1 query kiểm tra email (không phân biệt hoa thường), 1 query kiểm tra role_id,
+hash password song song, 1 câu INSERT batched.
+
+Các method đều đồng bộ (hash bcrypt + INSERT): route gọi chúng phải là `def`
+để chạy trong threadpool, không chặn event loop.
+"""
+
+import csv
+from io import StringIO
+from typing import Any
+
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, func, insert, select
+
+from app.api.schemas.user import UserBulkResult, UserBulkRowResult, UserCreate
+from app.core.config import settings
+from app.core.security import get_password_hashes
+from app.core.text import truncate
+from app.models.role_model import Role
+from app.models.upload_history_model import ERROR_MESSAGE_MAX_LENGTH, UploadHistory
+from app.models.user_model import User
+
+# (row number, validated user)
+Candidate = tuple[int, UserCreate]
+
+
+class UserProvisioningService:
+    """Service to provision many users at once"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def provision_users(self, users_in: list[UserCreate]) -> UserBulkResult:
+        """Provision users from an already validated JSON payload"""
+        self._check_batch_size(len(users_in))
+        return self._provision(list(enumerate(users_in, start=1)), [])
+
+    def provision_users_from_csv(self, file: UploadFile) -> UserBulkResult:
+        """Provision users from a CSV file (email, password, fullname, role_id)"""
+        candidates, invalid = self.parse_csv(file)
+        return self._provision(candidates, invalid)
+
+    def parse_csv(
+        self, file: UploadFile
+    ) -> tuple[list[Candidate], list[UserBulkRowResult]]:
+        """
+        Parse và validate CSV
+
+        Returns:
+            (rows hợp lệ, kết quả INVALID cho rows lỗi)
+        """
+        if not file.filename or not file.filename.endswith(".csv"):
+            raise HTTPException(
+                status_code=400,
+                detail="Only CSV files are allowed. Please upload a .csv file",
+            )
+        content = file.file.read()
+        try:
+            decoded_content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=400,
+                detail="File encoding error. Please use UTF-8 encoding",
+            )
+
+        csv_reader = csv.DictReader(StringIO(decoded_content))
+        if csv_reader.fieldnames:
+            csv_reader.fieldnames = [
+                name.strip().lower() for name in csv_reader.fieldnames
+            ]
+        fieldnames = csv_reader.fieldnames or []
+        missing_fields = [f for f in ("email", "password") if f not in fieldnames]
+        if missing_fields:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Missing required columns: {', '.join(missing_fields)}. "
+                f"Required: email, password. "
+                f"Optional: fullname, role_id, is_active",
+            )
+
+        rows = list(csv_reader)
+        self._check_batch_size(len(rows))
+
+        candidates: list[Candidate] = []
+        invalid: list[UserBulkRowResult] = []
+        for row_number, row in enumerate(rows, start=1):
+            data = self._clean_row(row)
+            try:
+                candidates.append((row_number, UserCreate.model_validate(data)))
+            except ValidationError as e:
+                invalid.append(
+                    UserBulkRowResult(
+                        row=row_number,
+                        email=str(data.get("email", "")),
+                        status="INVALID",
+                        error="; ".join(err["msg"] for err in e.errors()),
+                    )
+                )
+        return candidates, invalid
+
+    def run_job(
+        self,
+        history_id: int,
+        candidates: list[Candidate],
+        invalid: list[UserBulkRowResult],
+    ) -> None:
+        """Chạy provisioning ở background, ghi kết quả vào UploadHistory"""
+        history = self.session.get(UploadHistory, history_id)
+        if history is None:
+            return
+        history.status = "PROCESSING"
+        self.session.add(history)
+        self.session.commit()
+
+        try:
+            result = self._provision(candidates, invalid)
+            history.status = "COMPLETED"
+            history.total_processed = result.total_processed
+            history.success_count = result.success_count
+            history.failure_count = result.failure_count
+            failures = [r for r in result.results if r.status != "CREATED"]
+            if failures:
+                history.error_message = truncate(
+                    "\n".join(
+                        f"Row {r.row} ({r.email}): {r.status} {r.error or ''}".rstrip()
+                        for r in failures
+                    ),
+                    ERROR_MESSAGE_MAX_LENGTH,
+                )
+        except Exception as e:
+            self.session.rollback()
+            history.status = "FAILED"
+            history.error_message = truncate(str(e), ERROR_MESSAGE_MAX_LENGTH)
+        finally:
+            self.session.add(history)
+            self.session.commit()
+
+    def _provision(
+        self, candidates: list[Candidate], invalid: list[UserBulkRowResult]
+    ) -> UserBulkResult:
+        results: dict[int, UserBulkRowResult] = {r.row: r for r in invalid}
+
+        # Duplicate emails trong cùng batch (không phân biệt hoa thường): giữ row đầu tiên
+        unique: dict[str, Candidate] = {}
+        for row_number, user_in in candidates:
+            key = user_in.email.lower()
+            if key in unique:
+                results[row_number] = UserBulkRowResult(
+                    row=row_number,
+                    email=user_in.email,
+                    status="DUPLICATE",
+                    error=f"Duplicate of row {unique[key][0]}",
+                )
+            else:
+                unique[key] = (row_number, user_in)
+
+        # 1 query cho toàn bộ email, 1 query cho toàn bộ role_id
+        existing_emails = self._existing_emails(list(unique))
+        known_roles = self._known_roles(
+            {
+                user_in.role_id
+                for _, user_in in unique.values()
+                if user_in.role_id is not None
+            }
+        )
+
+        to_create: list[Candidate] = []
+        for key, (row_number, user_in) in unique.items():
+            if key in existing_emails:
+                results[row_number] = UserBulkRowResult(
+                    row=row_number,
+                    email=user_in.email,
+                    status="EXISTS",
+                    error="The user with this email already exists in the system",
+                )
+            elif user_in.role_id is not None and user_in.role_id not in known_roles:
+                results[row_number] = UserBulkRowResult(
+                    row=row_number,
+                    email=user_in.email,
+                    status="INVALID",
+                    error=f"Unknown role_id {user_in.role_id}",
+                )
+            else:
+                to_create.append((row_number, user_in))
+
+        if to_create:
+            hashed_passwords = get_password_hashes(
+                [user_in.password for _, user_in in to_create]
+            )
+            rows = [
+                (
+                    row_number,
+                    {
+                        "email": user_in.email,
+                        "fullname": user_in.fullname,
+                        "is_active": user_in.is_active,
+                        "role_id": user_in.role_id,
+                        "hashed_password": hashed_password,
+                    },
+                )
+                for (row_number, user_in), hashed_password in zip(
+                    to_create, hashed_passwords, strict=True
+                )
+            ]
+            results.update(self._insert(rows))
+
+        ordered = [results[row] for row in sorted(results)]
+        success_count = sum(1 for r in ordered if r.status == "CREATED")
+        return UserBulkResult(
+            total_processed=len(ordered),
+            success_count=success_count,
+            failure_count=len(ordered) - success_count,
+            results=ordered,
+        )
+
+    def _existing_emails(self, lowered_emails: list[str]) -> set[str]:
+        if not lowered_emails:
+            return set()
+        return set(
+            self.session.exec(
+                select(func.lower(User.email)).where(
+                    func.lower(User.email).in_(lowered_emails)
+                )
+            ).all()
+        )
+
+    def _known_roles(self, role_ids: set[int]) -> set[int]:
+        if not role_ids:
+            return set()
+        return set(
+            self.session.exec(
+                select(Role.role_id).where(col(Role.role_id).in_(role_ids))
+            ).all()
+        )
+
+    def _insert(
+        self, rows: list[tuple[int, dict[str, Any]]]
+    ) -> dict[int, UserBulkRowResult]:
+        """
+        1 câu INSERT cho cả batch. Nếu vi phạm constraint (email vừa được tạo
+        bởi request khác, role vừa bị xóa) thì insert lại từng row trong
+        savepoint để chỉ các row đó bị báo lỗi thay vì fail cả batch
+        """
+        try:
+            created = self.session.execute(
+                insert(User).returning(col(User.user_id), col(User.email)),
+                [values for _, values in rows],
+            ).all()
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            return self._insert_one_by_one(rows)
+
+        user_ids = {email: user_id for user_id, email in created}
+        return {
+            row_number: UserBulkRowResult(
+                row=row_number,
+                email=values["email"],
+                status="CREATED",
+                user_id=user_ids.get(values["email"]),
+            )
+            for row_number, values in rows
+        }
+
+    def _insert_one_by_one(
+        self, rows: list[tuple[int, dict[str, Any]]]
+    ) -> dict[int, UserBulkRowResult]:
+        results: dict[int, UserBulkRowResult] = {}
+        for row_number, values in rows:
+            try:
+                with self.session.begin_nested():
+                    user_id = self.session.execute(
+                        insert(User).returning(col(User.user_id)), [values]
+                    ).one()[0]
+            except IntegrityError:
+                exists = bool(self._existing_emails([values["email"].lower()]))
+                results[row_number] = UserBulkRowResult(
+                    row=row_number,
+                    email=values["email"],
+                    status="EXISTS" if exists else "INVALID",
+                    error=(
+                        "The user with this email already exists in the system"
+                        if exists
+                        else f"Unknown role_id {values['role_id']}"
+                    ),
+                )
+                continue
+            results[row_number] = UserBulkRowResult(
+                row=row_number, email=values["email"], status="CREATED", user_id=user_id
+            )
+        self.session.commit()
+        return results
+
+    @staticmethod
+    def _check_batch_size(count: int) -> None:
+        if count > settings.BULK_USER_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many users in one batch: {count}. "
+                f"Maximum is {settings.BULK_USER_MAX_ROWS}",
+            )
+
+    @staticmethod
+    def _clean_row(row: dict[str, str]) -> dict[str, Any]:
+        """Strip values, bỏ cột rỗng để dùng default của schema"""
+        data: dict[str, Any] = {
+            key: value.strip()
+            for key, value in row.items()
+            if key and value is not None and value.strip()
+        }
+        if "is_active" in data:
+            data["is_active"] = data["is_active"].lower() in ("1", "true", "yes")
+        return data
@@ -1,8 +1,15 @@
+from datetime import datetime, timedelta
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import literal
+from sqlmodel import Session, col, delete, insert, select, union
 
+from app.api.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
+from app.models.class_model import Class
+from app.models.notification_model import Notification
+from app.models.upload_history_model import UploadHistory
+from app.models.user_archive_model import UserArchive
 from app.models.user_model import User
 
 
@@ -17,28 +24,89 @@ class UserService:
         )
         return self.session.exec(statement).first()
 
-    # def create_user(self, user_create: UserCreate) -> User:
-    #     db_obj = User.model_validate(
-    #         user_create,
-    #         update={"hashed_password": get_password_hash(user_create.password)},
-    #     )
-    #     self.session.add(db_obj)
-    #     self.session.commit()
-    #     self.session.refresh(db_obj)
-    #     return db_obj
-
-    # def update_user(self, db_user: User, user_in: UserUpdate) -> Any:
-    #     user_data = user_in.model_dump(exclude_unset=True)
-    #     extra_data = {}
-    #     if "password" in user_data:
-    #         password = user_data["password"]
-    #         hashed_password = get_password_hash(password)
-    #         extra_data["hashed_password"] = hashed_password
-    #     db_user.sqlmodel_update(user_data, update=extra_data)
-    #     self.session.add(db_user)
-    #     self.session.commit()
-    #     self.session.refresh(db_user)
-    #     return db_user
+    def create_user(self, user_create: UserCreate) -> User:
+        # Table models are not validated on init, user_id comes from the DB
+        db_obj = User(
+            **user_create.model_dump(exclude={"password"}),
+            hashed_password=get_password_hash(user_create.password),
+        )
+        self.session.add(db_obj)
+        self.session.commit()
+        self.session.refresh(db_obj)
+        return db_obj
+
+    def update_user(self, db_user: User, user_in: UserUpdate) -> Any:
+        user_data = user_in.model_dump(exclude_unset=True)
+        extra_data = {}
+        if "password" in user_data:
+            password = user_data["password"]
+            hashed_password = get_password_hash(password)
+            extra_data["hashed_password"] = hashed_password
+        db_user.sqlmodel_update(user_data, update=extra_data)
+        self.session.add(db_user)
+        self.session.commit()
+        self.session.refresh(db_user)
+        return db_user
+
+    def soft_delete_user(self, db_user: User) -> None:
+        db_user.del_flag = True
+        db_user.deleted_at = datetime.utcnow()
+        self.session.add(db_user)
+        self.session.commit()
+
+    def archive_deleted_users(self, older_than_days: int, batch_size: int) -> int:
+        """
+        Move soft-deleted users older than `older_than_days` into users_archive.
+        Users still referenced by class/upload_history/notification stay as tombstones.
+
+        Returns:
+            Number of archived users
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        referenced = union(
+            select(Class.user_id).where(col(Class.user_id).is_not(None)),
+            select(UploadHistory.created_by_id).where(
+                col(UploadHistory.created_by_id).is_not(None)
+            ),
+            select(Notification.user_id).where(col(Notification.user_id).is_not(None)),
+        )
+        archived = 0
+        while True:
+            user_ids = self.session.exec(
+                select(User.user_id)
+                .where(
+                    col(User.del_flag).is_(True),
+                    col(User.deleted_at) < cutoff,
+                    col(User.user_id).not_in(referenced),
+                )
+                .limit(batch_size)
+                .execution_options(include_deleted=True)
+            ).all()
+            if not user_ids:
+                break
+            self.session.execute(
+                insert(UserArchive).from_select(
+                    ["user_id", "fullname", "email", "role_id", "deleted_at", "archived_at"],
+                    select(  # type: ignore[call-overload]
+                        User.user_id,
+                        User.fullname,
+                        User.email,
+                        User.role_id,
+                        User.deleted_at,
+                        literal(datetime.utcnow()),
+                    ).where(col(User.user_id).in_(user_ids)),
+                ),
+                execution_options={"include_deleted": True},
+            )
+            self.session.execute(
+                delete(User).where(col(User.user_id).in_(user_ids)),
+                execution_options={"include_deleted": True},
+            )
+            self.session.commit()
+            archived += len(user_ids)
+            if len(user_ids) < batch_size:
+                break
+        return archived
 
     def authenticate(self, email: str, password: str) -> User | None:
         db_user = self.get_user_by_email(email=email)
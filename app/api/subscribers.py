@@ -0,0 +1,54 @@
+"""
+Event subscribers: phản ứng với các event từ import pipeline
+"""
+
+from sqlmodel import Session
+
+from app.api.services.notification_service import NotificationService
+from app.api.services.student_rank_service import StudentRankService
+from app.api.services.student_search_service import StudentSearchService
+from app.api.services.student_stats_service import StudentStatsService
+from app.core.db import engine
+from app.core.events import StudentsUpserted, UploadFinished, event_bus
+
+
+@event_bus.subscribe(StudentsUpserted)
+def refresh_class_stats(events: list[StudentsUpserted]) -> None:
+    class_ids = set().union(*(event.class_ids for event in events))
+    if not class_ids:
+        return
+    with Session(engine) as session:
+        StudentStatsService(session).refresh_classes(class_ids)
+
+
+@event_bus.subscribe(StudentsUpserted)
+def refresh_search_index(events: list[StudentsUpserted]) -> None:
+    student_ids = set().union(*(event.student_ids for event in events))
+    with Session(engine) as session:
+        StudentSearchService(session).refresh_index(student_ids)
+
+
+@event_bus.subscribe(StudentsUpserted)
+def refresh_gpa_ranks(events: list[StudentsUpserted]) -> None:
+    student_ids = set().union(*(event.student_ids for event in events))
+    with Session(engine) as session:
+        StudentRankService(session).refresh(student_ids)
+
+
+@event_bus.subscribe(UploadFinished)
+def notify_upload_finished(events: list[UploadFinished]) -> None:
+    with Session(engine) as session:
+        service = NotificationService(session)
+        for event in events:
+            recipients = set(service.class_teacher_ids(event.class_ids))
+            if event.user_id is not None:
+                recipients.add(event.user_id)
+            service.notify_users(
+                recipients,
+                title="Student import finished",
+                message=(
+                    f"{event.file_name}: {event.status}, "
+                    f"{event.success_count}/{event.total_processed} rows imported, "
+                    f"{event.failure_count} failed"
+                ),
+            )
@@ -0,0 +1,255 @@
+"""
+Admission control cho các import nặng (CSV upload).
+
+- Giới hạn số import chạy đồng thời trong 1 worker và trên toàn cluster
+- Hàng đợi có giới hạn; khi đầy hoặc chờ quá lâu thì từ chối với
+  queue position và Retry-After ước lượng từ thời gian import trung bình
+
+Slot toàn cluster (`ClusterSlots`): trên PostgreSQL là K advisory lock
+(`AdvisoryLockClusterSlots`, giống app.core.scheduler), dùng chung giữa mọi
+worker; database khác (SQLite, chỉ dùng khi dev / test) dùng `LocalClusterSlots`
+trong process.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+import zlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Protocol
+
+import anyio
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, queue_position: int, retry_after: int):
+        super().__init__(f"Import queue is full (position {queue_position})")
+        self.queue_position = queue_position
+        self.retry_after = retry_after
+
+
+class ClusterSlots(Protocol):
+    """Gọi trong thread (có thể chạm DB), không gọi trên event loop"""
+
+    def try_acquire(self) -> bool: ...
+
+    def release(self) -> None: ...
+
+
+class LocalClusterSlots:
+    """Stand-in trong process, chỉ đúng khi chạy 1 worker"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._used = 0
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._used = max(0, self._used - 1)
+
+
+class AdvisoryLockClusterSlots:
+    """
+    `limit` slot là các advisory lock (namespace, 0..limit-1) mức session,
+    giữ trên 1 connection AUTOCOMMIT riêng của worker khi worker đang giữ ít
+    nhất 1 slot. Worker chết thì connection đóng và PostgreSQL tự nhả lock.
+    """
+
+    def __init__(self, engine: Engine, limit: int, name: str = "import-slots"):
+        self.engine = engine
+        self.limit = limit
+        # Key 2 phần (int4, int4): không trùng lock 1 key của scheduler
+        self.namespace = zlib.crc32(name.encode()) & 0x7FFFFFFF
+        self._lock = threading.Lock()
+        self._connection: Connection | None = None
+        self._held: list[int] = []
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            try:
+                connection = self._connect()
+                for slot in range(self.limit):
+                    if slot in self._held:
+                        continue
+                    acquired = connection.execute(
+                        text("SELECT pg_try_advisory_lock(:namespace, :slot)"),
+                        {"namespace": self.namespace, "slot": slot},
+                    ).scalar()
+                    if acquired:
+                        self._held.append(slot)
+                        return True
+            except Exception:
+                logger.exception("Could not acquire an import cluster slot")
+                self._reset()
+                return False
+            self._close_if_idle()
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._held or self._connection is None:
+                return
+            slot = self._held.pop()
+            try:
+                self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:namespace, :slot)"),
+                    {"namespace": self.namespace, "slot": slot},
+                )
+            except Exception:
+                logger.exception("Could not release import cluster slot %d", slot)
+                self._reset()
+                return
+            self._close_if_idle()
+
+    def _connect(self) -> Connection:
+        if self._connection is None:
+            self._connection = self.engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+        return self._connection
+
+    def _close_if_idle(self) -> None:
+        if not self._held and self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _reset(self) -> None:
+        # Connection lỗi: đóng hẳn, lock của nó được PostgreSQL nhả
+        self._held.clear()
+        if self._connection is not None:
+            try:
+                self._connection.invalidate()
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+def cluster_slots_for(engine: Engine, limit: int) -> ClusterSlots | None:
+    """limit <= 0: không giới hạn toàn cluster"""
+    if limit <= 0:
+        return None
+    if engine.dialect.name == "postgresql":
+        return AdvisoryLockClusterSlots(engine, limit)
+    return LocalClusterSlots(limit)
+
+
+class ImportAdmission:
+    # Re-check cluster slots định kỳ, vì worker khác release không notify được
+    POLL_INTERVAL_SECONDS = 0.5
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+        cluster_slots: ClusterSlots | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.cluster_slots = cluster_slots
+        self.active = 0
+        self.rejected_total = 0
+        self._waiting: list[object] = []
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # EWMA thời gian 1 import, dùng để ước lượng Retry-After
+        self._avg_duration = 10.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+
+    def retry_after(self, queue_position: int) -> int:
+        rounds = queue_position / max(1, self.max_concurrent)
+        return max(1, math.ceil(rounds * self._avg_duration))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Chiếm 1 slot import, raise AdmissionRejected khi quá tải"""
+        condition = self._get_condition()
+        async with condition:
+            if self._waiting or not await self._try_enter():
+                await self._wait_in_queue(condition)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - started
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            async with condition:
+                self.active -= 1
+                if self.cluster_slots is not None:
+                    await anyio.to_thread.run_sync(self.cluster_slots.release)
+                condition.notify_all()
+
+    async def _wait_in_queue(self, condition: asyncio.Condition) -> None:
+        if len(self._waiting) >= self.max_queue:
+            self._reject(len(self._waiting) + 1)
+        ticket = object()
+        self._waiting.append(ticket)
+        deadline = time.monotonic() + self.queue_timeout_seconds
+        try:
+            while not (self._waiting[0] is ticket and await self._try_enter()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._reject(self._waiting.index(ticket) + 1)
+                try:
+                    await asyncio.wait_for(
+                        condition.wait(), min(remaining, self.POLL_INTERVAL_SECONDS)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiting.remove(ticket)
+            condition.notify_all()
+
+    async def _try_enter(self) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        if self.cluster_slots is not None and not await anyio.to_thread.run_sync(
+            self.cluster_slots.try_acquire
+        ):
+            return False
+        self.active += 1
+        return True
+
+    def _reject(self, queue_position: int) -> None:
+        self.rejected_total += 1
+        raise AdmissionRejected(queue_position, self.retry_after(queue_position))
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Tạo lazily trong event loop của worker
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+
+import_admission = ImportAdmission(
+    max_concurrent=settings.IMPORT_MAX_CONCURRENT,
+    max_queue=settings.IMPORT_MAX_QUEUE,
+    queue_timeout_seconds=settings.IMPORT_QUEUE_TIMEOUT_SECONDS,
+    cluster_slots=cluster_slots_for(engine, settings.IMPORT_MAX_CONCURRENT_CLUSTER),
+)
@@ -0,0 +1,154 @@
+"""
+In-process cache với versioned invalidation cho dữ liệu tham chiếu
+(Major, Intake, Course, Class, Role).
+
+Mỗi namespace có một version counter. Khi bảng tương ứng bị ghi (sau commit),
+version được tăng lên và mọi entry cũ của namespace đó trở thành stale.
+"""
+
+import hashlib
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: bytes
+    etag: str
+    version: int
+    expires_at: float
+
+
+def compute_etag(payload: bytes) -> str:
+    """Strong ETag tính từ nội dung response"""
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+class VersionedCache:
+    """Thread-safe cache, entry hợp lệ khi cùng version và chưa hết TTL"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._entries: dict[tuple[str, str], CacheEntry] = {}
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def bump(self, *namespaces: str) -> None:
+        """Invalidate tất cả entry của các namespace"""
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+                for key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[key]
+
+    def get(self, namespace: str, key: str = "") -> CacheEntry | None:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        if (
+            entry.version != self.version(namespace)
+            or entry.expires_at < time.monotonic()
+        ):
+            return None
+        return entry
+
+    def set(
+        self, namespace: str, value: bytes, key: str = "", version: int | None = None
+    ) -> CacheEntry:
+        """
+        Lưu value. `version` là version đọc được TRƯỚC khi load dữ liệu,
+        nếu trong lúc load có write thì entry sẽ stale ngay lập tức.
+        """
+        entry = CacheEntry(
+            value=value,
+            etag=compute_etag(value),
+            version=self.version(namespace) if version is None else version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._entries[(namespace, key)] = entry
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class Invalidatable(Protocol):
+    def bump(self, *namespaces: str) -> None: ...
+
+
+_PUBLISHED_KEY = "published_writes"
+
+
+@contextmanager
+def publishing_writes(session: Session, *tables: str) -> Iterator[None]:
+    """
+    Trong block, các write vào `tables` của session được publish thành event
+    (vd. import sinh viên -> StudentsUpserted): cache đăng ký với
+    `updated_by_events` tự cập nhật theo event, không bị bump
+    """
+    previous = session.info.get(_PUBLISHED_KEY, frozenset())
+    session.info[_PUBLISHED_KEY] = previous | frozenset(tables)
+    try:
+        yield
+    finally:
+        session.info[_PUBLISHED_KEY] = previous
+
+
+def invalidate_on_write(
+    cache: Invalidatable, tables: dict[str, str], updated_by_events: Iterable[str] = ()
+) -> None:
+    """
+    Đăng ký SQLAlchemy session events để bump namespace khi bảng được ghi.
+
+    Args:
+        cache: Cache (hoặc object có `bump`) cần invalidate
+        tables: Mapping table name -> namespace
+        updated_by_events: Bảng mà cache cập nhật theo event: write trong
+            `publishing_writes` của các bảng này không bump
+    """
+    pending_key = f"cache_pending_{id(cache)}"
+    event_tables = frozenset(updated_by_events)
+
+    def _mark(session: Session, table_names: Any) -> None:
+        skipped = event_tables & session.info.get(_PUBLISHED_KEY, frozenset())
+        namespaces = {
+            tables[name]
+            for name in table_names
+            if name in tables and name not in skipped
+        }
+        if namespaces:
+            session.info.setdefault(pending_key, set()).update(namespaces)
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session: Session, _flush_context: Any) -> None:
+        objects = list(session.new) + list(session.dirty) + list(session.deleted)
+        _mark(session, {getattr(obj, "__tablename__", None) for obj in objects})
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _do_orm_execute(state: ORMExecuteState) -> None:
+        # Bulk insert/update/delete statements không đi qua flush
+        if state.is_insert or state.is_update or state.is_delete:
+            table = getattr(state.statement, "table", None)
+            _mark(state.session, {getattr(table, "name", None)})
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session: Session) -> None:
+        namespaces = session.info.pop(pending_key, None)
+        if namespaces:
+            cache.bump(*namespaces)
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(pending_key, None)
@@ -0,0 +1,149 @@
+"""
+Nén response (gzip, brotli nếu cài package `brotli`) và giải nén upload gzip.
+
+- negotiate: chọn encoding theo Accept-Encoding (q-values), ưu tiên br
+- PrecompressedCache: body đã nén của response cacheable (có ETag), key theo
+  ETag nên cùng payload không bị nén lại mỗi request
+- open_gzip_upload: giải nén upload .csv.gz dạng stream, giới hạn số byte sau
+  giải nén (chống gzip bomb)
+"""
+
+import gzip
+import io
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, BinaryIO
+
+from fastapi import HTTPException
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # optional dependency
+    brotli = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def supported_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Encoding tốt nhất client chấp nhận (q > 0), None nếu không có"""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in supported_encodings():
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        compressed: bytes = brotli.compress(data, quality=brotli_quality)
+        return compressed
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class StreamCompressor:
+    """Nén streaming response theo từng chunk"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress = compressor.process
+            self.finish = compressor.finish
+        else:
+            # wbits 16 + MAX_WBITS: có gzip header/trailer
+            compressor = zlib.compressobj(
+                gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.compress = compressor.compress
+            self.finish = compressor.flush
+
+
+class PrecompressedCache:
+    """LRU (path, etag, encoding) -> body đã nén, giới hạn tổng số byte"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: tuple[str, str, str]) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple[str, str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class _LimitedGzipReader(io.RawIOBase):
+    def __init__(self, fileobj: BinaryIO, max_bytes: int):
+        self._gzip = gzip.GzipFile(fileobj=fileobj, mode="rb")
+        self._max_bytes = max_bytes
+        self._read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        try:
+            count = self._gzip.readinto(buffer)
+        except (gzip.BadGzipFile, EOFError, zlib.error):
+            raise HTTPException(
+                status_code=400, detail="Invalid or truncated gzip file"
+            )
+        self._read += count
+        if self._read > self._max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Decompressed upload too large. Maximum size is {self._max_bytes} bytes",
+            )
+        return count
+
+
+def is_gzip(fileobj: BinaryIO) -> bool:
+    """Kiểm tra magic bytes, giữ nguyên vị trí đọc"""
+    position = fileobj.tell()
+    magic = fileobj.read(2)
+    fileobj.seek(position)
+    return magic == GZIP_MAGIC
+
+
+def open_gzip_upload(fileobj: BinaryIO, max_bytes: int) -> BinaryIO:
+    """Upload gzip -> stream đã giải nén; file thường trả về nguyên vẹn"""
+    if not is_gzip(fileobj):
+        return fileobj
+    return io.BufferedReader(_LimitedGzipReader(fileobj, max_bytes))
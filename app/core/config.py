@@ -75,6 +75,14 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Optional read replica (full SQLAlchemy URL), used by ReadSessionDep routes.
+    # Reads go to the primary right after the user's own writes (sticky window)
+    # and while the replica lags more than READ_REPLICA_MAX_LAG_SECONDS.
+    READ_REPLICA_DATABASE_URI: str | None = None
+    READ_REPLICA_STICKY_SECONDS: float = 5.0
+    READ_REPLICA_MAX_LAG_SECONDS: float = 2.0
+    READ_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -92,6 +100,115 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    # Reference data (major, intake, course, class, roles) cache
+    REFERENCE_CACHE_TTL_SECONDS: int = 300
+    REFERENCE_CACHE_MAX_AGE_SECONDS: int = 60
+
+    # Role -> permission map, reloaded after writes to roles or after TTL
+    PERMISSION_CACHE_TTL_SECONDS: int = 300
+
+    # Teacher -> owned class_ids (row-level scope), reloaded after writes to class or after TTL
+    TEACHER_SCOPE_CACHE_TTL_SECONDS: int = 300
+
+    # Per-class student count / average GPA, reloaded after writes to student or after TTL
+    CLASS_STATS_CACHE_TTL_SECONDS: int = 60
+
+    # In-memory GPA rank index, rebuilt in the background after writes to student
+    # (this worker) or after TTL (writes from other workers)
+    GPA_RANK_INDEX_TTL_SECONDS: int = 300
+
+    # In-memory student name index (non-PostgreSQL), rebuilt from the DB after TTL
+    STUDENT_SEARCH_INDEX_TTL_SECONDS: int = 300
+
+    # Archive soft-deleted users after N days (interval 0 disables the job)
+    USER_ARCHIVE_AFTER_DAYS: int = 90
+    USER_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    USER_ARCHIVE_BATCH_SIZE: int = 1000
+
+    # Notification delivery (long-poll timeout cap, SSE heartbeat)
+    NOTIFICATION_POLL_TIMEOUT_SECONDS: int = 30
+    NOTIFICATION_SSE_HEARTBEAT_SECONDS: int = 15
+    # Latest notification id known per user, only trusted with a shared broker
+    NOTIFICATION_LATEST_ID_TTL_SECONDS: int = 10
+
+    # Upload admission control: IMPORT_MAX_CONCURRENT per worker and
+    # IMPORT_MAX_CONCURRENT_CLUSTER across workers (PostgreSQL advisory locks,
+    # in-process on SQLite; 0 disables the cluster limit)
+    IMPORT_MAX_BODY_BYTES: int = 20 * 1024 * 1024
+    IMPORT_MAX_CONCURRENT: int = 2
+    IMPORT_MAX_CONCURRENT_CLUSTER: int = 4
+    IMPORT_MAX_QUEUE: int = 8
+    IMPORT_QUEUE_TIMEOUT_SECONDS: int = 30
+    # gzip / zip uploads: limit on the decompressed size (zip: all members together)
+    IMPORT_MAX_DECOMPRESSED_BYTES: int = 200 * 1024 * 1024
+    IMPORT_MAX_ZIP_MEMBERS: int = 100
+
+    # Rate limits: token bucket per client (user id from the token, else IP),
+    # CAPACITY = burst, PER_MINUTE = refill rate. DEFAULT applies to every API
+    # request on top of the route limits; 0 disables it. LOGIN_USERNAME is a
+    # second login bucket per submitted username, across all IPs.
+    # Behind a proxy / load balancer, set FORWARDED_ALLOW_IPS to the proxy
+    # address so the client IP comes from X-Forwarded-For; otherwise every
+    # anonymous client shares the proxy's bucket.
+    # Buckets are kept in process memory (per worker): with N workers a client
+    # gets up to N times these limits until a shared backend is used
+    RATE_LIMIT_LOGIN_CAPACITY: int = 10
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10
+    RATE_LIMIT_LOGIN_USERNAME_CAPACITY: int = 10
+    RATE_LIMIT_LOGIN_USERNAME_PER_MINUTE: int = 5
+    RATE_LIMIT_SIGNUP_CAPACITY: int = 5
+    RATE_LIMIT_SIGNUP_PER_MINUTE: int = 2
+    RATE_LIMIT_DEFAULT_CAPACITY: int = 200
+    RATE_LIMIT_DEFAULT_PER_MINUTE: int = 0
+
+    # Readiness probe: DB check (SELECT 1) result is reused for INTERVAL seconds.
+    # Not ready when the DB check fails, pool usage or event-loop lag reach the
+    # limits, or the import queue is full
+    READINESS_CHECK_INTERVAL_SECONDS: float = 5.0
+    READINESS_DB_TIMEOUT_SECONDS: float = 2.0
+    READINESS_MAX_POOL_USAGE: float = 0.9
+    READINESS_MAX_LOOP_LAG_SECONDS: float = 0.5
+    # Event-loop lag sampling; a stack sample is taken when the loop is blocked
+    # longer than LOOP_BLOCKING_THRESHOLD_SECONDS (0 disables the watchdog)
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.1
+    LOOP_BLOCKING_THRESHOLD_SECONDS: float = 0.2
+
+    # Upper bound for one on-demand sampling profile (/utils/profile)
+    PROFILER_MAX_SECONDS: int = 60
+
+    # Response compression (gzip; brotli when the `brotli` package is installed).
+    # Compressed bodies of responses with an ETag are cached up to CACHE_MAX_BYTES
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: list[str] = [
+        "application/json",
+        "text/csv",
+        "text/plain",
+        "text/html",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Per-student transcript cache (LRU, invalidated by score/course writes in
+    # this worker; entries expire after TTL to pick up writes from other workers)
+    TRANSCRIPT_CACHE_MAX_ENTRIES: int = 10_000
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 60
+
+    # Graduation progress: a student is at risk when missing this many mandatory
+    # courses the cohort has already taken, or earning below ratio * cohort median
+    GRADUATION_AT_RISK_OVERDUE_MANDATORY: int = 2
+    GRADUATION_AT_RISK_CREDIT_RATIO: float = 0.8
+
+    # Upload history: keep detail rows N months, older ones are compacted into
+    # monthly summaries; on PostgreSQL monthly partitions are created ahead
+    UPLOAD_HISTORY_RETENTION_MONTHS: int = 12
+    UPLOAD_HISTORY_PARTITIONS_AHEAD: int = 3
+    UPLOAD_HISTORY_MAINTENANCE_INTERVAL_SECONDS: int = 24 * 3600
+
+    # Bulk user provisioning
+    BULK_USER_MAX_ROWS: int = 5000
+    PASSWORD_HASH_WORKERS: int = 4
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
@@ -1,9 +1,60 @@
-from sqlmodel import create_engine
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, with_loader_criteria
+from sqlmodel import Session, create_engine
 
 from app.core.config import settings
+from app.core.replica import ReplicaRouter, track_writes
+from app.models.user_model import User
 
 engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
+# Optional read replica for ReadSessionDep routes
+read_engine = (
+    create_engine(settings.READ_REPLICA_DATABASE_URI)
+    if settings.READ_REPLICA_DATABASE_URI
+    else None
+)
+replica_router = ReplicaRouter(
+    primary=engine,
+    replica=read_engine,
+    sticky_seconds=settings.READ_REPLICA_STICKY_SECONDS,
+    max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+    lag_check_seconds=settings.READ_REPLICA_LAG_CHECK_SECONDS,
+)
+track_writes(replica_router)
+
+
+# Models with a `del_flag` soft-delete column
+SOFT_DELETE_MODELS: tuple[Any, ...] = (User,)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_soft_deleted(state: ORMExecuteState) -> None:
+    """
+    Hide soft-deleted rows from every ORM query (SELECT/UPDATE/DELETE),
+    matching the partial indexes `WHERE NOT del_flag`.
+    Opt out with `.execution_options(include_deleted=True)`.
+    """
+    if (
+        state.is_column_load
+        or state.is_relationship_load
+        or state.execution_options.get("include_deleted", False)
+    ):
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(
+            *(
+                with_loader_criteria(
+                    model,
+                    lambda cls: cls.del_flag == False,  # noqa: E712
+                    include_aliases=True,
+                )
+                for model in SOFT_DELETE_MODELS
+            )
+        )
+
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
 # otherwise, SQLModel might fail to initialize relationships properly
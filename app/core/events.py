@@ -0,0 +1,128 @@
+"""
+Internal event bus.
+
+Event được publish sau commit và dispatch bất đồng bộ trên 1 thread riêng.
+Các event cùng loại đến gần nhau được gom thành batch, handler nhận `list[event]`
+để chỉ xử lý đúng các key bị ảnh hưởng (một lần cho cả batch).
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+E = TypeVar("E")
+Handler = Callable[[list[Any]], None]
+
+
+@dataclass(frozen=True)
+class StudentsUpserted:
+    """Students created/updated by an import (class_ids include old and new classes)"""
+
+    student_ids: frozenset[str]
+    class_ids: frozenset[int]
+    upload_id: int | None = None
+
+
+@dataclass(frozen=True)
+class UploadFinished:
+    upload_id: int
+    user_id: int | None
+    file_name: str
+    status: str
+    total_processed: int = 0
+    success_count: int = 0
+    failure_count: int = 0
+    class_ids: frozenset[int] = field(default_factory=frozenset)
+
+
+class EventBus:
+    def __init__(self, batch_size: int = 500, linger_seconds: float = 0.05):
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self._handlers: dict[type, list[Handler]] = defaultdict(list)
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, event_type: type[E]
+    ) -> Callable[[Callable[[list[E]], None]], Callable[[list[E]], None]]:
+        """Decorator: đăng ký handler nhận batch event của `event_type`"""
+
+        def decorator(handler: Callable[[list[E]], None]) -> Callable[[list[E]], None]:
+            self._handlers[event_type].append(handler)
+            return handler
+
+        return decorator
+
+    def publish(self, *events: Any) -> None:
+        self._ensure_started()
+        for event in events:
+            self._queue.put(event)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Dispatch nốt các event đang chờ rồi dừng thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="event-bus", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            batch = [event]
+            stopping = False
+            deadline = time.monotonic() + self.linger_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            self._dispatch(batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch: list[Any]) -> None:
+        by_type: dict[type, list[Any]] = defaultdict(list)
+        for event in batch:
+            by_type[type(event)].append(event)
+        for event_type, events in by_type.items():
+            for handler in self._handlers.get(event_type, []):
+                try:
+                    handler(events)
+                except Exception:
+                    logger.exception(
+                        "Event handler %s failed for %s",
+                        handler.__name__,
+                        event_type.__name__,
+                    )
+
+
+event_bus = EventBus()
@@ -0,0 +1,60 @@
+"""
+Quy chế điểm tín chỉ: điểm học phần thang 10 -> điểm chữ / điểm hệ 4.
+Dùng chung cho transcript, tiến độ tốt nghiệp và xếp hạng.
+"""
+
+import re
+from typing import Any
+
+from sqlalchemy import Float, case, cast
+
+# Điểm học phần tối thiểu để đạt (D)
+PASSING_SCORE = 4.0
+
+# Course.tcdh là chuỗi tự do ("3", "2.5", "", "3(2-1)"): chỉ số thập phân
+# khớp pattern này mới là số tín chỉ, còn lại (kể cả NULL) tính 0
+CREDITS_PATTERN = r"^\s*[0-9]+(\.[0-9]+)?\s*$"
+_CREDITS = re.compile(CREDITS_PATTERN)
+
+# (điểm thang 10 tối thiểu, điểm hệ 4), giảm dần
+GRADE_POINTS: tuple[tuple[float, float], ...] = (
+    (8.5, 4.0),
+    (8.0, 3.5),
+    (7.0, 3.0),
+    (6.5, 2.5),
+    (5.5, 2.0),
+    (5.0, 1.5),
+    (4.0, 1.0),
+)
+
+
+def grade_point(score: float | None) -> float | None:
+    if score is None:
+        return None
+    for minimum, point in GRADE_POINTS:
+        if score >= minimum:
+            return point
+    return 0.0
+
+
+def grade_point_sql(score: Any) -> Any:
+    """SQL expression tương đương `grade_point`"""
+    return case(
+        *((score >= minimum, point) for minimum, point in GRADE_POINTS),
+        else_=case((score.is_(None), None), else_=0.0),
+    )
+
+
+def parse_credits(tcdh: str | None) -> float:
+    """Số tín chỉ của Course.tcdh; giá trị không hợp lệ tính 0"""
+    if tcdh is None or not _CREDITS.match(tcdh):
+        return 0.0
+    return float(tcdh)
+
+
+def credits_sql(tcdh: Any) -> Any:
+    """
+    SQL expression tương đương `parse_credits`: chỉ CAST khi khớp pattern,
+    CAST trực tiếp chuỗi không phải số bị PostgreSQL báo lỗi
+    """
+    return case((tcdh.regexp_match(CREDITS_PATTERN), cast(tcdh, Float)), else_=0.0)
@@ -0,0 +1,191 @@
+"""
+Liveness / readiness của worker.
+
+- Liveness không kiểm tra dependency nào
+- ReadinessProbe: DB check (SELECT 1, có timeout) được cache theo interval nên
+  mỗi worker tốn tối đa 1 query / interval dù load balancer probe dày đến đâu.
+  Pool, hàng đợi import và loop lag đọc trực tiếp từ bộ nhớ mỗi lần probe
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+import anyio
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.admission import ImportAdmission, import_admission
+from app.core.config import settings
+from app.core.db import engine
+from app.core.loop_monitor import LoopLagMonitor, loop_lag_monitor
+
+
+@dataclass
+class DependencyStatus:
+    ok: bool
+    latency_ms: float | None = None
+    detail: str | None = None
+    # Tuổi (giây) của kết quả cache
+    age_seconds: float = 0.0
+
+
+@dataclass
+class PoolStatus:
+    checked_out: int
+    # None: pool không giới hạn / không phải QueuePool
+    capacity: int | None
+    usage: float | None
+
+
+@dataclass
+class ReadinessReport:
+    ready: bool
+    database: DependencyStatus
+    pool: PoolStatus
+    import_queue_depth: int
+    import_queue_limit: int
+    loop_lag_ms: float
+    reasons: list[str] = field(default_factory=list)
+
+
+def pool_status(engine: Engine) -> PoolStatus:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return PoolStatus(checked_out=0, capacity=None, usage=None)
+    checked_out = pool.checkedout()
+    max_overflow = pool._max_overflow
+    if max_overflow < 0:
+        return PoolStatus(checked_out=checked_out, capacity=None, usage=None)
+    capacity = pool.size() + max_overflow
+    return PoolStatus(
+        checked_out=checked_out,
+        capacity=capacity,
+        usage=round(checked_out / capacity, 4) if capacity else None,
+    )
+
+
+class ReadinessProbe:
+    def __init__(
+        self,
+        engine: Engine,
+        admission: ImportAdmission,
+        lag_monitor: LoopLagMonitor,
+        interval_seconds: float,
+        db_timeout_seconds: float,
+        max_pool_usage: float,
+        max_loop_lag_seconds: float,
+    ):
+        self.engine = engine
+        self.admission = admission
+        self.lag_monitor = lag_monitor
+        self.interval_seconds = interval_seconds
+        self.db_timeout_seconds = db_timeout_seconds
+        self.max_pool_usage = max_pool_usage
+        self.max_loop_lag_seconds = max_loop_lag_seconds
+        self._database: DependencyStatus | None = None
+        self._checked_at = 0.0
+        # Query bị bỏ lại sau timeout vẫn chạy trong thread: không mở query thứ 2
+        self._pinging = threading.Event()
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def check(self) -> ReadinessReport:
+        pool = pool_status(self.engine)
+        database = await self._cached_database(pool)
+        queue_depth = self.admission.queue_depth
+        lag = self.lag_monitor.lag_seconds
+
+        reasons = []
+        if not database.ok:
+            reasons.append(f"database: {database.detail}")
+        if pool.usage is not None and pool.usage >= self.max_pool_usage:
+            reasons.append(f"connection pool {pool.usage:.0%} used")
+        if queue_depth >= self.admission.max_queue:
+            reasons.append("import queue full")
+        if lag >= self.max_loop_lag_seconds:
+            reasons.append(f"event loop lag {lag * 1000:.0f} ms")
+        return ReadinessReport(
+            ready=not reasons,
+            database=database,
+            pool=pool,
+            import_queue_depth=queue_depth,
+            import_queue_limit=self.admission.max_queue,
+            loop_lag_ms=round(lag * 1000, 1),
+            reasons=reasons,
+        )
+
+    async def _cached_database(self, pool: PoolStatus) -> DependencyStatus:
+        if self._fresh():
+            return self._aged()
+        async with self._get_lock():
+            # Probe đồng thời chờ lock rồi dùng kết quả vừa đo
+            if not self._fresh():
+                self._database = await self._check_database(pool)
+                self._checked_at = time.monotonic()
+        return self._aged()
+
+    def _fresh(self) -> bool:
+        return (
+            self._database is not None
+            and time.monotonic() - self._checked_at < self.interval_seconds
+        )
+
+    def _aged(self) -> DependencyStatus:
+        assert self._database is not None
+        age = round(time.monotonic() - self._checked_at, 3)
+        return DependencyStatus(
+            ok=self._database.ok,
+            latency_ms=self._database.latency_ms,
+            detail=self._database.detail,
+            age_seconds=age,
+        )
+
+    async def _check_database(self, pool: PoolStatus) -> DependencyStatus:
+        if pool.capacity is not None and pool.checked_out >= pool.capacity:
+            # Checkout sẽ chờ tới pool_timeout: pool cạn là chưa sẵn sàng
+            return DependencyStatus(ok=False, detail="connection pool exhausted")
+        if self._pinging.is_set():
+            return DependencyStatus(ok=False, detail="previous check still running")
+        started = time.perf_counter()
+        try:
+            with anyio.fail_after(self.db_timeout_seconds):
+                await anyio.to_thread.run_sync(self._ping, abandon_on_cancel=True)
+        except TimeoutError:
+            return DependencyStatus(
+                ok=False, detail=f"timed out after {self.db_timeout_seconds:g}s"
+            )
+        except Exception as exc:
+            return DependencyStatus(ok=False, detail=type(exc).__name__)
+        return DependencyStatus(
+            ok=True, latency_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
+
+    def _ping(self) -> None:
+        self._pinging.set()
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        finally:
+            self._pinging.clear()
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Tạo lazily trong event loop của worker
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+
+readiness_probe = ReadinessProbe(
+    engine=engine,
+    admission=import_admission,
+    lag_monitor=loop_lag_monitor,
+    interval_seconds=settings.READINESS_CHECK_INTERVAL_SECONDS,
+    db_timeout_seconds=settings.READINESS_DB_TIMEOUT_SECONDS,
+    max_pool_usage=settings.READINESS_MAX_POOL_USAGE,
+    max_loop_lag_seconds=settings.READINESS_MAX_LOOP_LAG_SECONDS,
+)
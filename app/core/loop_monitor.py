@@ -0,0 +1,253 @@
+"""
+Đo event-loop lag và phát hiện code đồng bộ chặn event loop.
+
+- Heartbeat: task asyncio ngủ `interval` giây, lag = thời gian thức dậy muộn
+- Watchdog: thread riêng kiểm tra heartbeat; khi loop bị chặn quá `threshold`
+  thì lấy 1 stack sample của thread chạy loop (sys._current_frames), tối đa 1
+  sample mỗi lần bị chặn nên không tốn gì khi loop chạy bình thường
+- Quy về route qua task đang chạy trên loop (LoopMonitorMiddleware trong
+  app.core.middleware ghi task -> ASGI scope), call site là frame trong code
+  của app gần nhất với frame đang chặn (vd. service gọi session.exec)
+
+Kết quả: log warning mỗi lần bị chặn, thống kê theo (route, call site) trong
+`metrics()`.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from starlette.types import Scope
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Frame của chính middleware / monitor không phải call site
+_SKIP_FILES = (
+    os.path.abspath(__file__),
+    os.path.join(APP_ROOT, "core", "middleware.py"),
+)
+
+
+@dataclass
+class BlockingSample:
+    route: str | None
+    call_site: str | None
+    # Frame trong cùng (thường là thư viện: sqlalchemy, bcrypt, ...)
+    blocking_frame: str
+    stack: list[str]
+
+
+@dataclass
+class BlockingSite:
+    route: str | None
+    call_site: str | None
+    blocking_frame: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    stack: list[str] | None = None
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        interval_seconds: float,
+        blocking_threshold_seconds: float,
+        max_sites: int = 200,
+        stack_limit: int = 30,
+    ):
+        self.interval_seconds = interval_seconds
+        self.blocking_threshold_seconds = blocking_threshold_seconds
+        self.max_sites = max_sites
+        self.stack_limit = stack_limit
+        # Lag của lần đo gần nhất và lớn nhất kể từ khi start
+        self.lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.stalls_total = 0
+        self._lock = threading.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._heartbeat = time.monotonic()
+        # Sample của lần bị chặn hiện tại, heartbeat tương ứng
+        self._pending: tuple[float, BlockingSample] | None = None
+        # task đang xử lý request -> ASGI scope (scope["route"] có sau routing)
+        self._requests: dict[asyncio.Task[Any], Scope] = {}
+        self._sites: OrderedDict[tuple[str | None, str | None, str], BlockingSite] = (
+            OrderedDict()
+        )
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = self._loop.create_task(self._run())
+        if self.blocking_threshold_seconds > 0:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def track(self, task: asyncio.Task[Any], scope: Scope) -> None:
+        self._requests[task] = scope
+
+    def untrack(self, task: asyncio.Task[Any]) -> None:
+        self._requests.pop(task, None)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            sites = sorted(
+                self._sites.values(), key=lambda site: site.total_ms, reverse=True
+            )
+            return {
+                "lag_ms": round(self.lag_seconds * 1000, 1),
+                "max_lag_ms": round(self.max_lag_seconds * 1000, 1),
+                "blocking_threshold_ms": round(
+                    self.blocking_threshold_seconds * 1000, 1
+                ),
+                "stalls_total": self.stalls_total,
+                "sites": [asdict(site) for site in sites],
+            }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.lag_seconds = max(0.0, loop.time() - expected)
+            self.max_lag_seconds = max(self.max_lag_seconds, self.lag_seconds)
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._heartbeat = time.monotonic()
+            threshold = self.blocking_threshold_seconds
+            if threshold > 0 and self.lag_seconds >= threshold:
+                self._record(
+                    pending[1] if pending is not None else None, self.lag_seconds
+                )
+
+    def _watch(self) -> None:
+        poll = min(self.interval_seconds, self.blocking_threshold_seconds) / 2
+        while not self._stopped.wait(poll):
+            with self._lock:
+                heartbeat = self._heartbeat
+                sampled = self._pending is not None and self._pending[0] == heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked < self.blocking_threshold_seconds or sampled:
+                continue
+            sample = self._sample()
+            if sample is None:
+                continue
+            with self._lock:
+                # Loop đã chạy lại trong lúc lấy sample: bỏ
+                if self._heartbeat == heartbeat:
+                    self._pending = (heartbeat, sample)
+
+    def _sample(self) -> BlockingSample | None:
+        if self._loop_thread is None or self._loop is None:
+            return None
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame, limit=self.stack_limit)
+        call_site = next(
+            (
+                summary
+                for summary in reversed(stack)
+                if summary.filename.startswith(APP_ROOT)
+                and os.path.abspath(summary.filename) not in _SKIP_FILES
+            ),
+            None,
+        )
+        return BlockingSample(
+            route=self.current_route(),
+            call_site=self._format(call_site) if call_site is not None else None,
+            blocking_frame=self._format(stack[-1]),
+            stack=[self._format(summary) for summary in stack],
+        )
+
+    def current_route(self) -> str | None:
+        """Route của task đang chạy trên loop (gọi được từ thread khác)"""
+        task = asyncio.current_task(self._loop)
+        scope = self._requests.get(task) if task is not None else None
+        if scope is None:
+            # Không phải request (scheduler, event bus, ...): tên coroutine của task
+            return (
+                getattr(task.get_coro(), "__qualname__", None)
+                if task is not None
+                else None
+            )
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path")
+        return f"{scope.get('method', '')} {path}".strip()
+
+    def _record(self, sample: BlockingSample | None, blocked_seconds: float) -> None:
+        blocked_ms = round(blocked_seconds * 1000, 1)
+        if sample is None:
+            sample = BlockingSample(
+                route=None, call_site=None, blocking_frame="unknown", stack=[]
+            )
+        key = (sample.route, sample.call_site, sample.blocking_frame)
+        with self._lock:
+            self.stalls_total += 1
+            site = self._sites.pop(key, None) or BlockingSite(
+                route=sample.route,
+                call_site=sample.call_site,
+                blocking_frame=sample.blocking_frame,
+            )
+            site.count += 1
+            site.total_ms = round(site.total_ms + blocked_ms, 1)
+            site.max_ms = max(site.max_ms, blocked_ms)
+            site.last_seen = time.time()
+            site.stack = sample.stack or site.stack
+            self._sites[key] = site
+            while len(self._sites) > self.max_sites:
+                self._sites.popitem(last=False)
+        logger.warning(
+            "Event loop blocked %.0f ms in %s at %s (%s)",
+            blocked_ms,
+            sample.route or "unknown route",
+            sample.call_site or "unknown call site",
+            sample.blocking_frame,
+        )
+
+    @staticmethod
+    def _format(summary: traceback.FrameSummary) -> str:
+        filename = summary.filename
+        if filename.startswith(APP_ROOT):
+            filename = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+        return f"{filename}:{summary.lineno} in {summary.name}"
+
+
+loop_lag_monitor = LoopLagMonitor(
+    interval_seconds=settings.LOOP_LAG_INTERVAL_SECONDS,
+    blocking_threshold_seconds=settings.LOOP_BLOCKING_THRESHOLD_SECONDS,
+)
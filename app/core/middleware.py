@@ -0,0 +1,463 @@
+"""
+ASGI middlewares
+- Upload routes: giới hạn body size trong lúc stream và admission control
+  trước khi body được đọc
+- Nén response (gzip / brotli) theo ngưỡng kích thước và content-type
+- Rate limit theo route + principal, từ chối trước khi route chạm DB / bcrypt
+- Ghi task -> request cho LoopLagMonitor (quy lần chặn event loop về route)
+"""
+
+import asyncio
+import json
+from collections.abc import Iterable, Mapping
+
+import anyio
+import jwt
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import security
+from app.core.admission import AdmissionRejected, ImportAdmission
+from app.core.compression import (
+    PrecompressedCache,
+    StreamCompressor,
+    compress,
+    negotiate,
+)
+from app.core.config import settings
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.rate_limit import RateLimiter, RateLimitRule
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+async def _send_json(
+    send: Send,
+    status_code: int,
+    body: Mapping[str, object],
+    headers: dict[str, str] | None = None,
+) -> None:
+    payload = json.dumps(body).encode("utf-8")
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(payload)).encode()),
+    ]
+    raw_headers += [
+        (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+    ]
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": raw_headers}
+    )
+    await send({"type": "http.response.body", "body": payload})
+
+
+class MaxBodySizeMiddleware:
+    """413 khi body vượt `max_bytes`: kiểm tra Content-Length và đếm byte khi stream"""
+
+    def __init__(self, app: ASGIApp, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = {"detail": f"Upload too large. Maximum size is {self.max_bytes} bytes"}
+        for name, value in scope["headers"]:
+            if (
+                name == b"content-length"
+                and value.isdigit()
+                and int(value) > self.max_bytes
+            ):
+                await _send_json(send, 413, detail)
+                return
+
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, too_large
+            if too_large:
+                raise _BodyTooLarge()
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    too_large = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                # Form parsing (FastAPI) bắt exception từ receive và trả 400:
+                # thay response đó bằng 413
+                if too_large:
+                    await _send_json(send, 413, detail)
+                    return
+            if too_large:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await _send_json(send, 413, detail)
+
+
+class AdmissionMiddleware:
+    """Giới hạn số request import chạy đồng thời, 429 + Retry-After khi quá tải"""
+
+    def __init__(self, app: ASGIApp, admission: ImportAdmission, paths: Iterable[str]):
+        self.app = app
+        self.admission = admission
+        self.paths = set(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        try:
+            async with self.admission.slot():
+                await self.app(scope, receive, send)
+        except AdmissionRejected as e:
+            await _send_json(
+                send,
+                429,
+                {
+                    "detail": "Too many imports in progress, please retry later",
+                    "queue_position": e.queue_position,
+                    "retry_after": e.retry_after,
+                },
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+
+class CompressionMiddleware:
+    """
+    Nén response khi client hỗ trợ, body >= `minimum_size` và content-type nằm
+    trong allowlist. Response có ETag và không private/no-store được cache
+    dạng đã nén (ETag chuyển thành weak vì representation khác).
+    """
+
+    # Body lớn hơn ngưỡng này được nén trong worker thread, không block event loop
+    THREAD_THRESHOLD = 256 * 1024
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        content_types: Iterable[str],
+        cache: PrecompressedCache,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = {content_type.lower() for content_type in content_types}
+        self.cache = cache
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: StreamCompressor | None = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            assert start is not None
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                # Streaming response đang được nén
+                chunk = compressor.compress(body)
+                if not more_body:
+                    chunk += compressor.finish()
+                if chunk or not more_body:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": more_body,
+                        }
+                    )
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._should_compress(start["status"], headers, body, more_body):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+
+            if more_body:
+                compressor = StreamCompressor(
+                    encoding, self.gzip_level, self.brotli_quality
+                )
+                del headers["Content-Length"]
+                await send(start)
+                chunk = compressor.compress(body)
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+                return
+
+            compressed = await self._compress_body(
+                scope["path"], etag, headers, body, encoding
+            )
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+    def _should_compress(
+        self, status: int, headers: MutableHeaders, body: bytes, more_body: bool
+    ) -> bool:
+        if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if media_type not in self.content_types:
+            return False
+        if more_body:
+            # Streaming: chỉ biết kích thước nếu có Content-Length
+            length = headers.get("content-length")
+            return (
+                length is None
+                or not length.isdigit()
+                or int(length) >= self.minimum_size
+            )
+        return len(body) >= self.minimum_size
+
+    async def _compress_body(
+        self,
+        path: str,
+        etag: str | None,
+        headers: MutableHeaders,
+        body: bytes,
+        encoding: str,
+    ) -> bytes:
+        cache_control = headers.get("cache-control", "").lower()
+        cacheable = (
+            etag is not None
+            and "no-store" not in cache_control
+            and "private" not in cache_control
+        )
+        key = (path, etag or "", encoding)
+        if cacheable:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if len(body) > self.THREAD_THRESHOLD:
+            compressed = await anyio.to_thread.run_sync(
+                compress, body, encoding, self.gzip_level, self.brotli_quality
+            )
+        else:
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        if cacheable:
+            self.cache.put(key, compressed)
+        return compressed
+
+
+class RateLimitMiddleware:
+    """
+    Token bucket theo (rule, principal). `routes` map "METHOD path" -> rule;
+    `default_rule` (nếu có) áp dụng thêm cho mọi request có path bắt đầu bằng
+    `default_prefix`. `username_routes` (form login): thêm 1 bucket theo field
+    `username` của form, để đoán password 1 tài khoản từ nhiều IP cũng bị chặn.
+    Vượt limit: 429 + Retry-After.
+
+    Principal không có token là IP trong scope["client"]: sau load balancer /
+    reverse proxy, uvicorn phải tin X-Forwarded-For của proxy
+    (FORWARDED_ALLOW_IPS / --forwarded-allow-ips), nếu không mọi client dùng
+    chung 1 bucket là địa chỉ của proxy.
+    """
+
+    # Form login lớn hơn mức này bị từ chối thay vì bỏ qua bucket username
+    MAX_FORM_BYTES = 64 * 1024
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter,
+        routes: dict[str, RateLimitRule],
+        default_rule: RateLimitRule | None = None,
+        default_prefix: str = "/",
+        username_routes: dict[str, RateLimitRule] | None = None,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.routes = routes
+        self.default_rule = default_rule
+        self.default_prefix = default_prefix
+        self.username_routes = username_routes or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = f"{scope['method']} {scope['path']}"
+        rules = []
+        route_rule = self.routes.get(route)
+        if route_rule is not None:
+            rules.append(route_rule)
+        if self.default_rule is not None and scope["path"].startswith(
+            self.default_prefix
+        ):
+            rules.append(self.default_rule)
+        username_rule = self.username_routes.get(route)
+        if not rules and username_rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        principal = self._principal(scope)
+        for rule in rules:
+            if not await self._check(rule, principal, send):
+                return
+        if username_rule is not None:
+            body = await self._read_body(receive)
+            if body is None:
+                await _send_json(send, 413, {"detail": "Request body too large"})
+                return
+            username = await self._form_username(scope, body)
+            if username is not None and not await self._check(
+                username_rule, f"username:{username}", send
+            ):
+                return
+            receive = self._replay(body, receive)
+        await self.app(scope, receive, send)
+
+    async def _check(self, rule: RateLimitRule, key: str, send: Send) -> bool:
+        allowed, retry_after = self.limiter.check(rule, key)
+        if not allowed:
+            await _send_json(
+                send,
+                429,
+                {
+                    "detail": "Too many requests, please retry later",
+                    "retry_after": retry_after,
+                },
+                headers={"Retry-After": str(retry_after)},
+            )
+        return allowed
+
+    async def _read_body(self, receive: Receive) -> bytes | None:
+        """Đọc hết body (tối đa MAX_FORM_BYTES), None nếu vượt"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.MAX_FORM_BYTES:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _form_username(scope: Scope, body: bytes) -> str | None:
+        """Field `username` của form (urlencoded hoặc multipart), chuẩn hóa lowercase"""
+
+        async def receive_body() -> Message:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        try:
+            form = await Request(scope, receive_body).form()
+        except Exception:
+            # Form lỗi: route tự trả 422, chỉ còn bucket theo principal
+            return None
+        try:
+            username = form.get("username")
+        finally:
+            await form.close()
+        if not isinstance(username, str) or not username.strip():
+            return None
+        return username.strip().lower()
+
+    @staticmethod
+    def _replay(body: bytes, receive: Receive) -> Receive:
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
+
+    @staticmethod
+    def _principal(scope: Scope) -> str:
+        """user:<id> nếu bearer token hợp lệ (chỉ decode JWT), ngược lại ip:<client>"""
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = jwt.decode(
+                    token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+                )
+                if payload.get("sub") is not None:
+                    return f"user:{payload['sub']}"
+            except jwt.InvalidTokenError:
+                pass
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+
+class LoopMonitorMiddleware:
+    """Ghi lại task đang xử lý request để quy lần chặn loop về route"""
+
+    def __init__(self, app: ASGIApp, monitor: LoopLagMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task() if scope["type"] == "http" else None
+        if task is None:
+            await self.app(scope, receive, send)
+            return
+        self.monitor.track(task, scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.untrack(task)
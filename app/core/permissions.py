@@ -0,0 +1,121 @@
+"""
+Permission resolution từ Role.
+
+Bảng `roles` rất nhỏ nên được load một lần vào map immutable (role_id -> permissions).
+Map được reload khi bảng roles bị ghi (session events) hoặc sau TTL
+(cho các worker khác), nên kiểm tra quyền không tốn thêm query nào.
+"""
+
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from enum import Enum
+from types import MappingProxyType
+
+from sqlmodel import Session, select
+
+from app.core.cache import invalidate_on_write
+from app.core.config import settings
+from app.models.role_model import Role
+
+
+class Permission(str, Enum):
+    USERS_READ = "users:read"
+    USERS_WRITE = "users:write"
+    STUDENTS_READ = "students:read"
+    STUDENTS_IMPORT = "students:import"
+    SCORES_READ = "scores:read"
+    SCORES_WRITE = "scores:write"
+    REFERENCE_WRITE = "reference:write"
+    NOTIFICATIONS_SEND = "notifications:send"
+    SYSTEM_ADMIN = "system:admin"
+
+
+ALL_PERMISSIONS = frozenset(Permission)
+
+# Permissions theo role_name cho các role không phải superuser
+ROLE_PERMISSIONS: dict[str, frozenset[Permission]] = {
+    "Teacher": frozenset(
+        {
+            Permission.STUDENTS_READ,
+            Permission.STUDENTS_IMPORT,
+            Permission.SCORES_READ,
+            Permission.SCORES_WRITE,
+        }
+    ),
+}
+
+
+@dataclass(frozen=True)
+class RolePermissions:
+    role_id: int
+    role_name: str
+    is_superuser: bool
+    permissions: frozenset[Permission]
+
+
+# User không có role (role_id NULL, vd. tự đăng ký qua /users/signup) hoặc role
+# không có trong ROLE_PERMISSIONS: không có permission nào. Trước khi có
+# require_permissions, mọi user đăng nhập đều upload được sinh viên; nay phải
+# được gán role (vd. Teacher) mới import được
+NO_ROLE = RolePermissions(
+    role_id=0, role_name="", is_superuser=False, permissions=frozenset()
+)
+
+
+class PermissionRegistry:
+    """Immutable role map, swapped atomically on refresh"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._roles: Mapping[int, RolePermissions] = MappingProxyType({})
+        self._expires_at = 0.0
+
+    def bump(self, *namespaces: str) -> None:
+        """Đánh dấu stale, lần resolve tiếp theo sẽ reload"""
+        self._expires_at = 0.0
+
+    def refresh(self, session: Session) -> None:
+        roles = session.exec(select(Role)).all()
+        self._roles = MappingProxyType(
+            {
+                role.role_id: RolePermissions(
+                    role_id=role.role_id,
+                    role_name=role.role_name,
+                    is_superuser=role.is_superuser,
+                    permissions=ALL_PERMISSIONS
+                    if role.is_superuser
+                    else ROLE_PERMISSIONS.get(role.role_name, frozenset()),
+                )
+                for role in roles
+            }
+        )
+        self._expires_at = time.monotonic() + self.ttl_seconds
+
+    def resolve(self, session: Session, role_id: int | None) -> RolePermissions:
+        """Resolve role của user, chỉ query khi map stale"""
+        if time.monotonic() >= self._expires_at:
+            with self._lock:
+                if time.monotonic() >= self._expires_at:
+                    self.refresh(session)
+        if role_id is None:
+            return NO_ROLE
+        return self._roles.get(role_id, NO_ROLE)
+
+    def is_superuser(self, session: Session, role_id: int | None) -> bool:
+        return self.resolve(session, role_id).is_superuser
+
+    def has_permissions(
+        self, session: Session, role_id: int | None, *permissions: Permission
+    ) -> bool:
+        granted = self.resolve(session, role_id).permissions
+        return all(permission in granted for permission in permissions)
+
+
+permission_registry = PermissionRegistry(
+    ttl_seconds=settings.PERMISSION_CACHE_TTL_SECONDS
+)
+
+invalidate_on_write(permission_registry, {Role.__tablename__: "roles"})
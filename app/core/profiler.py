@@ -0,0 +1,158 @@
+"""
+Sampling CPU profiler chạy theo yêu cầu trên worker đang sống.
+
+Thread profiler lấy stack của mọi thread (sys._current_frames) mỗi `interval`
+trong `seconds` giây, gộp thành collapsed stacks (định dạng của flamegraph.pl /
+speedscope): "route;thread;frame;...;frame count". Không có hook / tracer nào
+được cài, nên khi không profile thì không tốn gì.
+
+Route của 1 stack: frame đầu tiên là endpoint của route (cả async trên event
+loop lẫn sync endpoint trong threadpool); code trên event loop ngoài endpoint
+(middleware, serialize response) lấy route theo task đang chạy (LoopLagMonitor).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+from types import CodeType, FrameType
+from typing import Any
+
+from app.core.config import settings
+from app.core.loop_monitor import APP_ROOT, loop_lag_monitor
+
+# Frame lá của thread đang chờ (idle): bỏ qua trừ khi include_idle
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+_IDLE_FUNCTIONS = {"wait", "select", "get", "_wait_for_tstate_lock", "acquire"}
+MAX_DEPTH = 128
+# Mỗi sample giữ GIL khi duyệt stack mọi thread: interval nhỏ hơn làm chậm
+# chính worker đang được profile
+MIN_INTERVAL_MS = 5
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self, max_seconds: float, min_interval_seconds: float):
+        self.max_seconds = max_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self._running = threading.Lock()
+
+    def profile(
+        self,
+        seconds: float,
+        interval_seconds: float,
+        routes: Iterable[Any] = (),
+        loop_thread: int | None = None,
+        include_idle: bool = False,
+    ) -> tuple[str, int]:
+        """
+        Chạy đồng bộ (gọi trong thread riêng): (collapsed stacks, số sample)
+
+        Args:
+            routes: app.routes, để gắn route theo code object của endpoint
+            loop_thread: thread id của event loop, gắn nhãn "loop" và route theo task
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            seconds = min(max(seconds, 0.0), self.max_seconds)
+            interval_seconds = max(interval_seconds, self.min_interval_seconds)
+            endpoints = self._endpoints(routes)
+            stacks: Counter[str] = Counter()
+            samples = 0
+            own_thread = threading.get_ident()
+            stop = threading.Event()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                thread_names = {
+                    thread.ident: thread.name for thread in threading.enumerate()
+                }
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if thread_id == loop_thread:
+                        thread_name = "loop"
+                    else:
+                        thread_name = thread_names.get(thread_id, str(thread_id))
+                    stack = self._collapse(
+                        frame,
+                        thread_name,
+                        endpoints,
+                        thread_id == loop_thread,
+                        include_idle,
+                    )
+                    if stack is not None:
+                        stacks[stack] += 1
+                samples += 1
+                stop.wait(interval_seconds)
+            output = "\n".join(
+                f"{stack} {count}" for stack, count in stacks.most_common()
+            )
+            return output, samples
+        finally:
+            self._running.release()
+
+    @staticmethod
+    def _endpoints(routes: Iterable[Any]) -> dict[CodeType, str]:
+        endpoints = {}
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            code = getattr(endpoint, "__code__", None)
+            if code is not None:
+                methods = ",".join(sorted(getattr(route, "methods", None) or ()))
+                endpoints[code] = f"{methods} {route.path}".strip()
+        return endpoints
+
+    def _collapse(
+        self,
+        frame: FrameType | None,
+        thread_name: str,
+        endpoints: dict[CodeType, str],
+        on_loop: bool,
+        include_idle: bool,
+    ) -> str | None:
+        frames: list[FrameType] = []
+        while frame is not None and len(frames) < MAX_DEPTH:
+            frames.append(frame)
+            frame = frame.f_back
+        if not frames:
+            return None
+        leaf = frames[0].f_code
+        if (
+            not include_idle
+            and leaf.co_name in _IDLE_FUNCTIONS
+            and os.path.basename(leaf.co_filename) in _IDLE_FILES
+        ):
+            return None
+        frames.reverse()
+
+        route = next(
+            (endpoints[f.f_code] for f in frames if f.f_code in endpoints), None
+        )
+        if route is None and on_loop:
+            route = loop_lag_monitor.current_route()
+        labels = [route or "-", thread_name.replace(";", ":")]
+        labels += [self._label(f.f_code) for f in frames]
+        return ";".join(labels)
+
+    @staticmethod
+    def _label(code: CodeType) -> str:
+        filename = code.co_filename
+        if filename.startswith(APP_ROOT):
+            filename = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+        else:
+            filename = os.path.basename(filename)
+        # co_qualname chỉ có từ Python 3.11 (image chạy 3.10)
+        name = getattr(code, "co_qualname", code.co_name)
+        return f"{name} ({filename})".replace(";", ":")
+
+
+profiler = SamplingProfiler(
+    max_seconds=settings.PROFILER_MAX_SECONDS,
+    min_interval_seconds=MIN_INTERVAL_MS / 1000,
+)
@@ -0,0 +1,85 @@
+"""
+In-process pub/sub cho realtime delivery (SSE / long-poll).
+
+`LocalBroker` chỉ fan-out trong 1 worker; đây là stand-in cho broker dùng chung
+giữa các worker (Redis, PostgreSQL LISTEN/NOTIFY...) với cùng interface `Broker`.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, topic: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.topic = topic
+        self.loop = loop
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=maxsize)
+
+    def _put(self, message: Any) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Subscriber queue full on %s, dropping message", self.topic)
+
+    async def get(self, timeout: float | None = None) -> Any:
+        """Chờ message tiếp theo, raise TimeoutError khi hết timeout"""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class Broker(Protocol):
+    # True khi mọi worker nhận message của nhau (Redis, LISTEN/NOTIFY...)
+    shared: bool
+
+    def publish(self, topic: str, message: Any) -> None: ...
+
+    def subscribe(self, topic: str) -> Any: ...
+
+
+class LocalBroker:
+    """Topic -> subscribers, publish an toàn từ thread bất kỳ"""
+
+    shared = False
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+
+    def publish(self, topic: str, message: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, message)
+            except RuntimeError:
+                # Event loop of the subscriber is already closed
+                continue
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[Subscription]:
+        subscription = Subscription(topic, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscribers[topic].discard(subscription)
+                if not self._subscribers[topic]:
+                    del self._subscribers[topic]
+
+    def subscriber_count(self, topic: str | None = None) -> int:
+        with self._lock:
+            if topic is not None:
+                return len(self._subscribers.get(topic, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+broker = LocalBroker()
@@ -0,0 +1,151 @@
+"""
+Rate limiting bằng token bucket theo (rule, principal).
+
+- Principal: user_id trong bearer token (chỉ decode JWT, không query DB),
+  nếu không có token hợp lệ thì client IP; login có thêm bucket theo username
+- Mỗi rule có bảng bucket riêng dạng mảng (array) + dict key -> slot; bucket
+  đã đầy lại (idle đủ lâu) bị quét định kỳ và slot được dùng lại
+- `LocalRateLimitBackend` là stand-in trong process cho backend dùng chung giữa
+  các worker (vd. Redis + Lua script) với cùng interface `RateLimitBackend`
+"""
+
+import math
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    name: str
+    # Số request tối đa liên tiếp (burst) và tốc độ nạp lại
+    capacity: int
+    per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_minute / 60.0
+
+
+class RateLimitBackend(Protocol):
+    def acquire(self, rule: RateLimitRule, key: str) -> tuple[bool, float]:
+        """(allowed, retry_after seconds)"""
+        ...
+
+
+class TokenBucketTable:
+    """Bucket của 1 rule: tokens / thời điểm cập nhật lưu trong array('d')"""
+
+    # Quét bucket idle sau mỗi N lần acquire
+    SWEEP_EVERY = 4096
+
+    def __init__(self, rule: RateLimitRule):
+        self.rule = rule
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._tokens = array("d")
+        self._updated = array("d")
+        self._operations = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def acquire(self, key: str, now: float) -> tuple[bool, float]:
+        capacity = self.rule.capacity
+        rate = self.rule.refill_per_second
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._allocate(key, now)
+        tokens = min(capacity, self._tokens[slot] + (now - self._updated[slot]) * rate)
+        self._updated[slot] = now
+
+        self._operations += 1
+        if self._operations % self.SWEEP_EVERY == 0:
+            self.sweep(now)
+
+        if tokens >= 1:
+            self._tokens[slot] = tokens - 1
+            return True, 0.0
+        self._tokens[slot] = tokens
+        return False, (1 - tokens) / rate if rate > 0 else math.inf
+
+    def sweep(self, now: float) -> int:
+        """Giải phóng bucket đã nạp đầy lại (trạng thái giống bucket mới)"""
+        rate = self.rule.refill_per_second
+        if rate <= 0:
+            return 0
+        full_after = self.rule.capacity / rate
+        idle = [
+            key
+            for key, slot in self._slots.items()
+            if now - self._updated[slot] >= full_after
+        ]
+        for key in idle:
+            self._free.append(self._slots.pop(key))
+        return len(idle)
+
+    def _allocate(self, key: str, now: float) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._tokens[slot] = self.rule.capacity
+            self._updated[slot] = now
+        else:
+            slot = len(self._tokens)
+            self._tokens.append(self.rule.capacity)
+            self._updated.append(now)
+        self._slots[key] = slot
+        return slot
+
+
+class LocalRateLimitBackend:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tables: dict[str, TokenBucketTable] = {}
+
+    def acquire(self, rule: RateLimitRule, key: str) -> tuple[bool, float]:
+        with self._lock:
+            table = self._tables.get(rule.name)
+            if table is None:
+                table = self._tables[rule.name] = TokenBucketTable(rule)
+            return table.acquire(key, time.monotonic())
+
+    def bucket_counts(self) -> dict[str, int]:
+        with self._lock:
+            return {name: len(table) for name, table in self._tables.items()}
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        # rule name -> [allowed, rejected]
+        self._counters: dict[str, list[int]] = {}
+
+    def check(self, rule: RateLimitRule, principal: str) -> tuple[bool, int]:
+        """(allowed, Retry-After giây)"""
+        allowed, retry_after = self.backend.acquire(rule, principal)
+        with self._lock:
+            counters = self._counters.setdefault(rule.name, [0, 0])
+            counters[0 if allowed else 1] += 1
+        if allowed:
+            return True, 0
+        return False, max(1, math.ceil(min(retry_after, 3600)))
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            metrics = {
+                name: {"allowed": allowed, "rejected": rejected}
+                for name, (allowed, rejected) in self._counters.items()
+            }
+        bucket_counts = getattr(self.backend, "bucket_counts", None)
+        if bucket_counts is not None:
+            for name, buckets in bucket_counts().items():
+                metrics.setdefault(name, {"allowed": 0, "rejected": 0})["buckets"] = (
+                    buckets
+                )
+        return metrics
+
+
+rate_limiter = RateLimiter(LocalRateLimitBackend())
@@ -0,0 +1,137 @@
+"""
+Read replica routing.
+
+- Read-your-writes: sau khi user commit 1 write, các read của user đó đi vào
+  primary trong `sticky_seconds`
+- Replica lag vượt `max_lag_seconds` (hoặc replica không kết nối được)
+  thì mọi read fallback về primary cho tới lần check lag tiếp theo
+
+Thời điểm write gần nhất được giữ trong process; với nhiều worker, request đọc
+có thể tới worker khác, nên sticky window nên lớn hơn replication lag thông thường.
+"""
+
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL standby: 0 khi đã replay hết WAL nhận được
+_PG_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: Engine,
+        replica: Engine | None,
+        sticky_seconds: float,
+        max_lag_seconds: float,
+        lag_check_seconds: float,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self._lock = threading.Lock()
+        # user_id -> monotonic time hết sticky window
+        self._sticky_until: dict[int, float] = {}
+        self._lag: float | None = None
+        self._lag_checked_at = float("-inf")
+
+    def record_write(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._sticky_until[user_id] = now + self.sticky_seconds
+            # Dọn các entry hết hạn, tránh dict lớn dần
+            if len(self._sticky_until) > 10_000:
+                self._sticky_until = {
+                    uid: until
+                    for uid, until in self._sticky_until.items()
+                    if until > now
+                }
+
+    def is_sticky(self, user_id: int | None) -> bool:
+        if user_id is None:
+            return False
+        return self._sticky_until.get(user_id, 0.0) > time.monotonic()
+
+    def engine_for_read(self, user_id: int | None = None) -> Engine:
+        if self.replica is None or self.is_sticky(user_id):
+            return self.primary
+        lag = self.replica_lag()
+        if lag is None or lag > self.max_lag_seconds:
+            return self.primary
+        return self.replica
+
+    def replica_lag(self) -> float | None:
+        """Replica lag (giây), cache `lag_check_seconds`; None nếu replica lỗi"""
+        now = time.monotonic()
+        if now - self._lag_checked_at < self.lag_check_seconds:
+            return self._lag
+        with self._lock:
+            if now - self._lag_checked_at >= self.lag_check_seconds:
+                self._lag = self._measure_lag()
+                self._lag_checked_at = now
+        return self._lag
+
+    def _measure_lag(self) -> float | None:
+        assert self.replica is not None
+        try:
+            with self.replica.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    return float(conn.execute(_PG_LAG_QUERY).scalar_one())
+                # Không có thông tin replication (vd. SQLite): chỉ check kết nối
+                conn.execute(text("SELECT 1"))
+                return 0.0
+        except Exception:
+            logger.warning(
+                "Read replica unavailable, reading from primary", exc_info=True
+            )
+            return None
+
+
+def track_writes(router: ReplicaRouter) -> None:
+    """
+    Đăng ký session events: commit có write trên primary của 1 user
+    (session.info["user_id"]) bắt đầu sticky window của user đó.
+    """
+
+    def _mark(session: OrmSession) -> None:
+        if session.get_bind() is router.primary:
+            session.info["replica_wrote"] = True
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session: Session, _flush_context: Any) -> None:
+        _mark(session)
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _do_orm_execute(state: ORMExecuteState) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            _mark(state.session)
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session: Session) -> None:
+        wrote = session.info.pop("replica_wrote", False)
+        user_id = session.info.get("user_id")
+        if wrote and user_id is not None:
+            router.record_write(user_id)
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session: Session) -> None:
+        session.info.pop("replica_wrote", None)
@@ -0,0 +1,83 @@
+"""
+Periodic background jobs chạy trong process của worker.
+
+Mỗi job chạy trong threadpool với Session riêng. Trên PostgreSQL job được bảo vệ
+bằng advisory lock nên khi chạy nhiều worker chỉ một worker thực thi mỗi lượt.
+"""
+
+import asyncio
+import logging
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import text
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PeriodicJob:
+    name: str
+    interval_seconds: float
+    func: Callable[[Session], Any]
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._jobs: list[PeriodicJob] = []
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def add_job(
+        self, name: str, interval_seconds: float, func: Callable[[Session], Any]
+    ) -> None:
+        """Register a job, interval <= 0 disables it"""
+        if interval_seconds > 0:
+            self._jobs.append(PeriodicJob(name, interval_seconds, func))
+
+    def start(self) -> None:
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._loop(job), name=job.name))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _loop(self, job: PeriodicJob) -> None:
+        while True:
+            await asyncio.sleep(job.interval_seconds)
+            try:
+                await run_in_threadpool(self.run_once, job)
+            except Exception:
+                logger.exception("Periodic job %s failed", job.name)
+
+    @staticmethod
+    def run_once(job: PeriodicJob) -> Any:
+        if engine.dialect.name != "postgresql":
+            with Session(engine) as session:
+                return job.func(session)
+
+        # Session-level advisory lock giữ trên 1 connection riêng,
+        # vì job có thể commit nhiều lần (mỗi batch)
+        lock_id = zlib.crc32(job.name.encode())
+        with engine.connect() as lock_conn:
+            acquired = lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}
+            ).scalar()
+            if not acquired:
+                return None
+            try:
+                with Session(engine) as session:
+                    return job.func(session)
+            finally:
+                lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id}
+                )
+                lock_conn.commit()
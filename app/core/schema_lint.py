@@ -0,0 +1,98 @@
+"""
+Schema lint cho `app.models`, chạy trong scripts/lint.sh:
+
+    python -m app.core.schema_lint
+
+- Foreign key không có index (cột FK phải là cột đầu của 1 index / unique /
+  primary key): JOIN, lọc theo FK và cascade khi xóa bảng cha đều phải scan
+- Natural key thiếu unique: bảng trong NATURAL_KEYS phải có unique constraint
+  hoặc unique index (kể cả partial) đúng trên các cột đó. Bảng có >= 2 FK phải
+  nằm trong NATURAL_KEYS hoặc WITHOUT_NATURAL_KEY, để model mới phải khai báo
+"""
+
+import sys
+from collections.abc import Iterator
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, Table, UniqueConstraint
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401  (đăng ký toàn bộ bảng vào metadata)
+
+NATURAL_KEYS: dict[str, tuple[str, ...]] = {
+    "users": ("email",),
+    "roles": ("role_name",),
+    "class": ("class_name",),
+    "score": ("student_id", "course_id"),
+    "upload_history_monthly": ("created_by_id", "month"),
+}
+
+# Bảng nhiều FK nhưng định danh bằng id từ dữ liệu nguồn
+WITHOUT_NATURAL_KEY = frozenset({"course"})
+
+
+def _leading_columns(table: Table) -> Iterator[tuple[tuple[str, ...], bool]]:
+    """(các cột, unique) của mọi index / constraint có thể dùng để tra cứu"""
+    for constraint in table.constraints:
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint)):
+            columns = tuple(column.name for column in constraint.columns)
+            if columns:
+                yield columns, True
+    for index in table.indexes:
+        columns = tuple(column.name for column in index.columns)
+        if columns:
+            yield columns, bool(index.unique)
+
+
+def unindexed_foreign_keys(table: Table) -> list[str]:
+    covered = [columns for columns, _ in _leading_columns(table)]
+    problems = []
+    for foreign_key in table.foreign_key_constraints:
+        fk_columns = tuple(column.name for column in foreign_key.columns)
+        if not any(columns[: len(fk_columns)] == fk_columns for columns in covered):
+            problems.append(
+                f"{table.name}({', '.join(fk_columns)}): foreign key without index"
+            )
+    return problems
+
+
+def missing_natural_key(table: Table) -> list[str]:
+    key = NATURAL_KEYS.get(table.name)
+    if key is None:
+        if (
+            len(table.foreign_key_constraints) >= 2
+            and table.name not in WITHOUT_NATURAL_KEY
+        ):
+            return [
+                f"{table.name}: add its natural key to NATURAL_KEYS or WITHOUT_NATURAL_KEY"
+            ]
+        return []
+    for columns, unique in _leading_columns(table):
+        if unique and set(columns) == set(key):
+            return []
+    return [f"{table.name}({', '.join(key)}): natural key is not unique"]
+
+
+def lint(metadata: MetaData = SQLModel.metadata) -> list[str]:
+    problems: list[str] = []
+    for table in metadata.sorted_tables:
+        problems += unindexed_foreign_keys(table)
+        problems += missing_natural_key(table)
+    unknown = (set(NATURAL_KEYS) | WITHOUT_NATURAL_KEY) - set(metadata.tables)
+    problems += [
+        f"{name}: listed in schema lint but not a table" for name in sorted(unknown)
+    ]
+    return problems
+
+
+def main() -> int:
+    problems = lint()
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        print(f"schema lint: {len(problems)} problem(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
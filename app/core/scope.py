@@ -0,0 +1,134 @@
+"""
+Row-level scope cho dữ liệu sinh viên / điểm.
+
+Giáo viên chỉ thấy sinh viên thuộc các class mình phụ trách (Class.user_id).
+Tập class_id của mỗi giáo viên được cache, nên lọc 1 query chỉ là 1 `IN` trên
+student.class_id (có index) thay vì JOIN sang class. Cache bị xóa khi bảng class
+bị ghi (session events) hoặc sau TTL.
+
+Scope của request được gắn vào session (`restrict_session`) và áp cho mọi ORM
+SELECT trên student / score của session đó, giống soft delete trong app.core.db.
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, false, true
+from sqlalchemy.orm import ORMExecuteState, with_loader_criteria
+from sqlmodel import Session, col, select
+
+from app.core.cache import invalidate_on_write
+from app.core.config import settings
+from app.models.class_model import Class
+from app.models.score_model import Score
+from app.models.student_model import Student
+
+
+@dataclass(frozen=True)
+class StudentScope:
+    """class_ids None: không giới hạn (superuser)"""
+
+    class_ids: frozenset[int] | None = None
+
+    @property
+    def unrestricted(self) -> bool:
+        return self.class_ids is None
+
+    def allows_class(self, class_id: int | None) -> bool:
+        if self.class_ids is None:
+            return True
+        return class_id is not None and class_id in self.class_ids
+
+    def condition(self, class_column: Any = Student.class_id) -> Any:
+        """Điều kiện WHERE cho query sinh viên (hoặc bảng có class_id)"""
+        if self.class_ids is None:
+            return true()
+        if not self.class_ids:
+            return false()
+        return col(class_column).in_(sorted(self.class_ids))
+
+    def students(self) -> Any:
+        """Subquery student_id trong scope, dùng cho query trên bảng score"""
+        return select(Student.student_id).where(self.condition())
+
+    def filter_classes(self, class_ids: Iterable[int]) -> list[int]:
+        return [class_id for class_id in class_ids if self.allows_class(class_id)]
+
+
+UNRESTRICTED = StudentScope()
+
+_SESSION_KEY = "student_scope"
+
+
+def restrict_session(session: Session, scope: StudentScope) -> None:
+    """Áp scope cho mọi ORM SELECT trên student / score của session"""
+    if scope.unrestricted:
+        session.info.pop(_SESSION_KEY, None)
+    else:
+        session.info[_SESSION_KEY] = scope
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_out_of_scope(state: ORMExecuteState) -> None:
+    """
+    Hide students (and their scores) outside the session's scope from ORM
+    SELECTs. Opt out with `.execution_options(all_students=True)` for queries
+    that must see every student: shared caches / indexes, cohort comparisons,
+    conflict checks on import.
+    """
+    scope = state.session.info.get(_SESSION_KEY)
+    if (
+        scope is None
+        or not state.is_select
+        or state.is_column_load
+        or state.is_relationship_load
+        or state.execution_options.get("all_students", False)
+    ):
+        return
+    class_ids = sorted(scope.class_ids)
+    state.statement = state.statement.options(
+        with_loader_criteria(
+            Student, lambda cls: col(cls.class_id).in_(class_ids), include_aliases=True
+        ),
+        with_loader_criteria(
+            Score,
+            lambda cls: col(cls.student_id).in_(
+                select(Student.student_id).where(col(Student.class_id).in_(class_ids))
+            ),
+            include_aliases=True,
+        ),
+    )
+
+
+class TeacherClassRegistry:
+    """user_id -> class_id của giáo viên, cache theo TTL"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[int, tuple[float, frozenset[int]]] = {}
+
+    def bump(self, *namespaces: str) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def class_ids(self, session: Session, user_id: int) -> frozenset[int]:
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        class_ids = frozenset(
+            session.exec(select(Class.class_id).where(Class.user_id == user_id)).all()
+        )
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, class_ids)
+        return class_ids
+
+
+teacher_class_registry = TeacherClassRegistry(
+    ttl_seconds=settings.TEACHER_SCOPE_CACHE_TTL_SECONDS
+)
+
+invalidate_on_write(teacher_class_registry, {Class.__tablename__: "classes"})
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -11,6 +12,12 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+# bcrypt releases the GIL, so a thread pool hashes in parallel.
+# Threads are only started on first use.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
@@ -25,3 +32,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def get_password_hashes(passwords: list[str]) -> list[str]:
+    """Hash many passwords in parallel on the worker pool, keeping order"""
+    if len(passwords) <= 1:
+        return [get_password_hash(password) for password in passwords]
+    return list(_hash_executor.map(get_password_hash, passwords))
@@ -0,0 +1,33 @@
+import unicodedata
+
+# Các ký tự không tách được dấu bằng NFD
+_SPECIAL_CHARS = str.maketrans({"đ": "d", "Đ": "d"})
+
+
+def normalize_name(value: str | None) -> str:
+    """
+    Lowercase, bỏ dấu tiếng Việt và gộp khoảng trắng:
+    "Nguyễn  Văn Ánh" -> "nguyen van anh"
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFD", value.translate(_SPECIAL_CHARS))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def trigrams(value: str) -> set[str]:
+    """Trigrams của chuỗi đã normalize, có padding giống pg_trgm"""
+    grams: set[str] = set()
+    for word in value.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def truncate(value: str, max_length: int) -> str:
+    """Cắt chuỗi dài, giữ đầu chuỗi và ghi chú độ dài ban đầu"""
+    if len(value) <= max_length:
+        return value
+    suffix = f"... (truncated, {len(value)} characters)"
+    return value[: max(0, max_length - len(suffix))] + suffix
@@ -1,11 +1,28 @@
 import sentry_sdk
 import traceback
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api import subscribers  # noqa: F401  (registers event handlers)
+from app.api.jobs import scheduler
 from app.api.main import api_router
+from app.core.admission import import_admission
 from app.core.config import settings
+from app.core.events import event_bus
+from app.core.loop_monitor import loop_lag_monitor
+from app.core.rate_limit import RateLimitRule, rate_limiter
+from app.core.compression import PrecompressedCache
+from app.core.middleware import (
+    AdmissionMiddleware,
+    CompressionMiddleware,
+    LoopMonitorMiddleware,
+    MaxBodySizeMiddleware,
+    RateLimitMiddleware,
+)
 print("=== ENV CHECK ===")
 print("POSTGRES_SERVER:", settings.POSTGRES_SERVER)
 print("POSTGRES_DB:", settings.POSTGRES_DB)
@@ -20,13 +37,73 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    scheduler.start()
+    loop_lag_monitor.start()
+    yield
+    await loop_lag_monitor.stop()
+    await scheduler.stop()
+    event_bus.stop()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     debug=True,  
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
 
+# Heavy upload routes: admission control first, then body size while streaming
+UPLOAD_PATHS = [
+    f"{settings.API_V1_STR}/students/upload-csv",
+    f"{settings.API_V1_STR}/users/bulk/upload-csv",
+    f"{settings.API_V1_STR}/users/bulk/jobs",
+    f"{settings.API_V1_STR}/reference/bulk-load",
+]
+# Trong cùng: chạy trên cùng task với route
+app.add_middleware(LoopMonitorMiddleware, monitor=loop_lag_monitor)
+app.add_middleware(
+    MaxBodySizeMiddleware, max_bytes=settings.IMPORT_MAX_BODY_BYTES, paths=UPLOAD_PATHS
+)
+app.add_middleware(AdmissionMiddleware, admission=import_admission, paths=UPLOAD_PATHS)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    cache=PrecompressedCache(settings.COMPRESSION_CACHE_MAX_BYTES),
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Rate limit ngoài cùng: request bị từ chối không chạm tới DB / bcrypt
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    routes={
+        f"POST {settings.API_V1_STR}/login/access-token": RateLimitRule(
+            "login", settings.RATE_LIMIT_LOGIN_CAPACITY, settings.RATE_LIMIT_LOGIN_PER_MINUTE
+        ),
+        f"POST {settings.API_V1_STR}/users/signup": RateLimitRule(
+            "signup", settings.RATE_LIMIT_SIGNUP_CAPACITY, settings.RATE_LIMIT_SIGNUP_PER_MINUTE
+        ),
+    },
+    default_rule=RateLimitRule(
+        "default", settings.RATE_LIMIT_DEFAULT_CAPACITY, settings.RATE_LIMIT_DEFAULT_PER_MINUTE
+    )
+    if settings.RATE_LIMIT_DEFAULT_PER_MINUTE > 0
+    else None,
+    default_prefix=settings.API_V1_STR,
+    username_routes={
+        f"POST {settings.API_V1_STR}/login/access-token": RateLimitRule(
+            "login_username",
+            settings.RATE_LIMIT_LOGIN_USERNAME_CAPACITY,
+            settings.RATE_LIMIT_LOGIN_USERNAME_PER_MINUTE,
+        ),
+    },
+)
+
 @app.middleware("http")
 async def log_exceptions(request, call_next):
     try:
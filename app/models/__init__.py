@@ -9,6 +9,8 @@ from app.models.course_model import Course
 from app.models.score_model import Score
 from app.models.notification_model import Notification
 from app.models.upload_history_model import UploadHistory
+from app.models.upload_history_monthly_model import UploadHistoryMonthly
+from app.models.user_archive_model import UserArchive
 
 __all__ = [
     "User",
@@ -21,4 +23,6 @@ __all__ = [
     "Score",
     "Notification",
     "UploadHistory",
+    "UploadHistoryMonthly",
+    "UserArchive",
 ]
@@ -12,9 +12,9 @@ class Class(SQLModel, table=True):
     
     class_id: int = Field(primary_key=True)
     class_name: str = Field(max_length=255, unique=True)
-    major_id: Optional[int] = Field(default=None, foreign_key="major.major_id")
-    user_id: Optional[int] = Field(default=None, foreign_key="users.user_id")  # Teacher
-    intake_id: Optional[int] = Field(default=None, foreign_key="intake.intake_id")
+    major_id: Optional[int] = Field(default=None, foreign_key="major.major_id", index=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="users.user_id", index=True)  # Teacher
+    intake_id: Optional[int] = Field(default=None, foreign_key="intake.intake_id", index=True)
     
     # Relationships
     major: Optional["Major"] = Relationship(back_populates="classes")
@@ -13,8 +13,8 @@ class Course(SQLModel, table=True):
     course_name: str = Field(max_length=255)
     tcdh: Optional[str] = Field(default=None, max_length=50)  # Tín chỉ đại học
     is_bb: Optional[bool] = Field(default=False)  # Bắt buộc
-    major_id: Optional[int] = Field(default=None, foreign_key="major.major_id")
-    intake_id: Optional[int] = Field(default=None, foreign_key="intake.intake_id")
+    major_id: Optional[int] = Field(default=None, foreign_key="major.major_id", index=True)
+    intake_id: Optional[int] = Field(default=None, foreign_key="intake.intake_id", index=True)
     
     # Relationships
     major: Optional["Major"] = Relationship(back_populates="courses")
@@ -1,5 +1,6 @@
 from typing import Optional, TYPE_CHECKING
-from datetime import date
+from datetime import date, datetime
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
 if TYPE_CHECKING:
@@ -7,12 +8,20 @@ if TYPE_CHECKING:
 
 class Notification(SQLModel, table=True):
     __tablename__ = "notification"
+    __table_args__ = (
+        # Inbox listing / catch-up: WHERE user_id = ? AND notification_id > ?
+        Index("ix_notification_user_id_notification_id", "user_id", "notification_id"),
+    )
     
     notification_id: int = Field(primary_key=True)
-    fullname: Optional[str] = Field(default=None, max_length=255)
-    dob: Optional[date] = Field(default=None)
-    gpa: Optional[float] = Field(default=None)
-    user_id: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    fullname: str | None = Field(default=None, max_length=255)
+    dob: date | None = Field(default=None)
+    gpa: float | None = Field(default=None)
+    user_id: int | None = Field(default=None, foreign_key="users.user_id")
+    title: str | None = Field(default=None, max_length=255)
+    message: str | None = Field(default=None)
+    is_read: bool = Field(default=False)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationship
     user: Optional["User"] = Relationship(back_populates="notifications")
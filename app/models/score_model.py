@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING, Optional
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -7,10 +8,15 @@ if TYPE_CHECKING:
 
 class Score(SQLModel, table=True):
     __tablename__ = "score"
+    __table_args__ = (
+        # 1 điểm cho mỗi (sinh viên, học phần): import upsert theo key này;
+        # cũng là index cho lookup theo student_id
+        UniqueConstraint("student_id", "course_id", name="uq_score_student_id_course_id"),
+    )
     
     id_score: int = Field(primary_key=True)
     student_id: Optional[str] = Field(default=None, foreign_key="student.student_id")
-    course_id: Optional[int] = Field(default=None, foreign_key="course.course_id")
+    course_id: Optional[int] = Field(default=None, foreign_key="course.course_id", index=True)
     score: Optional[float] = Field(default=None)
     
     # Relationships
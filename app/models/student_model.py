@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Optional, List
 from datetime import date
+from sqlalchemy import DDL, Index, event
 from sqlmodel import Field, SQLModel, Relationship
 
 if TYPE_CHECKING:
@@ -8,13 +9,33 @@ if TYPE_CHECKING:
 
 class Student(SQLModel, table=True):
     __tablename__ = "student"
+    __table_args__ = (
+        # Trigram index for fuzzy search on PostgreSQL (plain index elsewhere)
+        Index(
+            "ix_student_fullname_normalized_trgm",
+            "fullname_normalized",
+            postgresql_using="gin",
+            postgresql_ops={"fullname_normalized": "gin_trgm_ops"},
+        ),
+    )
     
     student_id: str = Field(primary_key=True, max_length=50)
     fullname: str = Field(max_length=255)
+    # Lowercased, diacritic-stripped fullname (app.core.text.normalize_name)
+    fullname_normalized: str = Field(default="", max_length=255)
     dob: Optional[date] = Field(default=None)
     gpa: Optional[float] = Field(default=None)
-    class_id: Optional[int] = Field(default=None, foreign_key="class.class_id")
+    class_id: Optional[int] = Field(default=None, foreign_key="class.class_id", index=True)
     
     # Relationships
     class_: Optional["Class"] = Relationship(back_populates="students")
     scores: List["Score"] = Relationship(back_populates="student")
+
+
+event.listen(
+    Student.__table__,  # type: ignore[attr-defined]
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(  # type: ignore[no-untyped-call]
+        dialect="postgresql"
+    ),
+)
@@ -1,12 +1,24 @@
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
 if TYPE_CHECKING:
     from app.models.user_model import User
 
+# error_message được cắt ở độ dài này (app.core.text.truncate)
+ERROR_MESSAGE_MAX_LENGTH = 4000
+
 class UploadHistory(SQLModel, table=True):
+    """
+    PostgreSQL: partition theo tháng (RANGE created_at), xem migration
+    d81f3a5c7e92; entry cũ được gộp vào UploadHistoryMonthly.
+    """
     __tablename__ = "upload_history"
+    __table_args__ = (
+        # Lịch sử upload của 1 user, mới nhất trước (keyset pagination)
+        Index("ix_upload_history_created_by_id_created_at", "created_by_id", "created_at"),
+    )
 
     id: int = Field(primary_key=True)
     file_name: str
@@ -14,7 +26,7 @@ class UploadHistory(SQLModel, table=True):
     success_count: int = Field(default=0)
     failure_count: int = Field(default=0)
     total_processed: int = Field(default=0)
-    error_message: Optional[str] = Field(default=None)  # Error message if failed
+    error_message: Optional[str] = Field(default=None, max_length=ERROR_MESSAGE_MAX_LENGTH)  # Error message if failed
     created_at: datetime = Field(default_factory=datetime.utcnow)
     created_by_id: Optional[int] = Field(default=None, foreign_key="users.user_id")
     
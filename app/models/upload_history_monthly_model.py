@@ -0,0 +1,27 @@
+from datetime import date
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class UploadHistoryMonthly(SQLModel, table=True):
+    """Upload history cũ được gộp theo tháng và user bởi retention job"""
+
+    __tablename__ = "upload_history_monthly"
+    __table_args__ = (
+        UniqueConstraint(
+            "created_by_id", "month", name="uq_upload_history_monthly_user_month"
+        ),
+    )
+
+    id: int = Field(primary_key=True)
+    # Ngày đầu tháng
+    month: date
+    # Không có FK để không chặn việc archive user
+    created_by_id: int | None = Field(default=None)
+    uploads: int = Field(default=0)
+    completed: int = Field(default=0)
+    failed: int = Field(default=0)
+    total_processed: int = Field(default=0)
+    success_count: int = Field(default=0)
+    failure_count: int = Field(default=0)
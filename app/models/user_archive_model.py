@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class UserArchive(SQLModel, table=True):
+    """Soft-deleted users moved out of `users` by the archival job"""
+
+    __tablename__ = "users_archive"
+
+    user_id: int = Field(primary_key=True)
+    fullname: str | None = Field(default=None, max_length=255)
+    email: str = Field(max_length=255, index=True)
+    role_id: int | None = Field(default=None)
+    deleted_at: datetime | None = Field(default=None)
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
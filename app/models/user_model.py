@@ -1,4 +1,6 @@
+from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -9,13 +11,33 @@ if TYPE_CHECKING:
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Soft-deleted rows are excluded so the email can be registered again
+        Index(
+            "ix_users_email_active",
+            "email",
+            unique=True,
+            postgresql_where=text("NOT del_flag"),
+            postgresql_include=["is_active"],
+            sqlite_where=text("NOT del_flag"),
+        ),
+        # Listings (ORDER BY user_id) only walk live rows
+        Index(
+            "ix_users_user_id_active",
+            "user_id",
+            postgresql_where=text("NOT del_flag"),
+            sqlite_where=text("NOT del_flag"),
+        ),
+    )
 
     user_id: int = Field(primary_key=True)
-    fullname: Optional[str] = Field(default=None, max_length=255)
-    email: str = Field(unique=True, index=True, max_length=255)
+    fullname: str | None = Field(default=None, max_length=255)
+    email: str = Field(max_length=255)
     hashed_password: str
     is_active: bool = Field(default=True)
-    role_id: Optional[int] = Field(default=None, foreign_key="roles.role_id")
+    role_id: int | None = Field(default=None, foreign_key="roles.role_id", index=True)
+    del_flag: bool = Field(default=False)  # Soft delete
+    deleted_at: datetime | None = Field(default=None)
     
     # Relationships
     role: Optional["Role"] = Relationship(back_populates="users")
@@ -0,0 +1,96 @@
+"""
+Memory per row of the student import pipeline.
+
+Compares the previous representation (csv.DictReader dicts + one pending
+SQLModel `Student` per row in the session) with the `StudentBatch` column
+representation produced by `StudentService._parse_csv`. Peak allocations are
+measured with tracemalloc; no database writes happen.
+
+Usage:
+    python -m benchmarks.import_memory --rows 200000
+"""
+import argparse
+import csv
+import gc
+import io
+import os
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+os.environ.setdefault("POSTGRES_SERVER", "sqlite")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+from starlette.datastructures import UploadFile  # noqa: E402
+
+from app.api.services.student_service import StudentService  # noqa: E402
+from app.core.text import normalize_name  # noqa: E402
+from app.models import Class, Student  # noqa: E402
+from benchmarks.seed import build_students_csv  # noqa: E402
+
+
+def measure(build: Callable[[], Any]) -> int:
+    """Peak bytes allocated while building (and holding) the result"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def dict_rows(content: bytes, session: Session) -> list[Student]:
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    students = []
+    for row in list(reader):
+        student = Student(
+            student_id=row["student_id"],
+            fullname=row["fullname"],
+            fullname_normalized=normalize_name(row["fullname"]),
+            dob=StudentService._parse_date(row["dob"]),
+            gpa=StudentService._parse_float(row["gpa"]),
+            class_id=StudentService._parse_int(row["class_id"]),
+        )
+        session.add(student)
+        students.append(student)
+    return students
+
+
+def column_batch(content: bytes, service: StudentService) -> Any:
+    upload = UploadFile(io.BytesIO(content), size=len(content), filename="students.csv")
+    batch, _ = service._parse_csv(upload)
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    content = build_students_csv(args.rows, existing_students=0)
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Class), [{"class_id": i, "class_name": f"CLASS{i:03d}"} for i in range(1, 51)]
+        )
+
+    with Session(engine) as session:
+        legacy = measure(lambda: dict_rows(content, session))
+        session.expunge_all()
+    with Session(engine) as session:
+        service = StudentService(session)
+        service._load_class_lookup()
+        compact = measure(lambda: column_batch(content, service))
+
+    print(f"rows: {args.rows}, csv: {len(content) / 1024 / 1024:.1f} MB")
+    print(f"{'representation':<28}{'peak MB':>10}{'bytes/row':>12}")
+    for name, peak in (("dict rows + Student objects", legacy), ("StudentBatch", compact)):
+        print(f"{name:<28}{peak / 1024 / 1024:>10.1f}{peak / args.rows:>12.0f}")
+    print(f"reduction: {legacy / compact:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
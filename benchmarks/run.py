@@ -0,0 +1,364 @@
+"""
+Load-testing benchmark for app.main:app
+
+Boots the app with uvicorn against a throwaway database, seeds synthetic
+students/scores, drives the endpoints with concurrent clients and reports
+throughput, p50/p95/p99 latency and server memory.
+
+Usage:
+    # SQLite in a temp directory
+    python -m benchmarks.run --students 10000
+
+    # Throwaway local PostgreSQL (POSTGRES_* taken from the environment / .env).
+    # Seeding drops and recreates all tables.
+    python -m benchmarks.run --database postgres --allow-drop --students 1000000
+
+    # Save a baseline, later compare against it (exit code 1 on regression).
+    # benchmarks/baseline.json is the committed SQLite baseline; compare with
+    # the same arguments (see its "config"), on comparable hardware
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_PASSWORD = "bench-password"
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int = 0
+    errors: int = 0
+    duration_seconds: float = 0.0
+    throughput_rps: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_rss_mb: float = 0.0
+    status_codes: dict[str, int] = field(default_factory=dict)
+
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def read_rss_mb(pid: int) -> float:
+    """Resident memory of the server process and its workers (Linux /proc)"""
+    total_kb = 0
+    pids = [pid]
+    children = Path(f"/proc/{pid}/task/{pid}/children")
+    if children.exists():
+        pids += [int(p) for p in children.read_text().split()]
+    for p in pids:
+        try:
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+        except FileNotFoundError:
+            continue
+    return total_kb / 1024
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def build_env(args: argparse.Namespace) -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("PROJECT_NAME", "FSI Benchmark")
+    env.setdefault("POSTGRES_USER", "postgres")
+    env.setdefault("FIRST_SUPERUSER", ADMIN_EMAIL)
+    env.setdefault("FIRST_SUPERUSER_PASSWORD", ADMIN_PASSWORD)
+    env.setdefault("FIRST_SUPERUSER_NAME", "Benchmark Admin")
+    env.setdefault("SECRET_KEY", "benchmark-secret-key")
+    # Measure the endpoints, not the rate limiter: the login scenario would
+    # otherwise get 429 after RATE_LIMIT_LOGIN_CAPACITY requests
+    for rule in ("LOGIN", "LOGIN_USERNAME", "SIGNUP"):
+        env.setdefault(f"RATE_LIMIT_{rule}_CAPACITY", "1000000000")
+        env.setdefault(f"RATE_LIMIT_{rule}_PER_MINUTE", "1000000000")
+    if args.database == "sqlite":
+        env["POSTGRES_SERVER"] = "sqlite"
+    env["PYTHONPATH"] = str(REPO_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def seed(args: argparse.Namespace, env: dict[str, str], workdir: Path) -> None:
+    """Seed in a subprocess so settings are read from the benchmark env"""
+    code = (
+        "from app.core.db import engine\n"
+        "from benchmarks.seed import seed_database\n"
+        f"seed_database(engine, students={args.students}, "
+        f"scores_per_student={args.scores_per_student}, "
+        f"admin_email={ADMIN_EMAIL!r}, admin_password={ADMIN_PASSWORD!r})\n"
+    )
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=workdir, check=True)
+    print(f"Seeded {args.students} students in {time.perf_counter() - started:.1f}s")
+
+
+def start_server(
+    args: argparse.Namespace, env: dict[str, str], workdir: Path, port: int
+) -> subprocess.Popen[bytes]:
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    server = subprocess.Popen(command, env=env, cwd=workdir, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/openapi.json", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not start within 60s")
+
+
+async def run_scenario(
+    name: str,
+    request: Request,
+    *,
+    base_url: str,
+    clients: int,
+    duration: float,
+    max_requests: int | None,
+    server_pid: int,
+) -> ScenarioResult:
+    latencies: list[float] = []
+    status_codes: dict[str, int] = {}
+    errors = 0
+    max_rss = read_rss_mb(server_pid)
+    deadline = time.perf_counter() + duration
+    issued = 0
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal errors, issued
+        while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            started = time.perf_counter()
+            try:
+                response = await request(client)
+                status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def sample_memory() -> None:
+        nonlocal max_rss
+        while time.perf_counter() < deadline:
+            max_rss = max(max_rss, read_rss_mb(server_pid))
+            await asyncio.sleep(0.25)
+
+    limits = httpx.Limits(max_connections=clients)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        sampler = asyncio.create_task(sample_memory())
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        sampler.cancel()
+    elapsed = time.perf_counter() - started
+    max_rss = max(max_rss, read_rss_mb(server_pid))
+
+    latencies.sort()
+    return ScenarioResult(
+        name=name,
+        requests=len(latencies),
+        errors=errors,
+        duration_seconds=round(elapsed, 3),
+        throughput_rps=round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        max_rss_mb=round(max_rss, 1),
+        status_codes=status_codes,
+    )
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    response = await client.post(
+        "/api/v1/login/access-token",
+        data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+    )
+    response.raise_for_status()
+    return str(response.json()["access_token"])
+
+
+def build_scenarios(token: str, upload_csv: bytes) -> dict[str, tuple[Request, bool]]:
+    """name -> (request, heavy). Heavy scenarios are capped by --upload-requests"""
+    auth = {"Authorization": f"Bearer {token}"}
+
+    def get(path: str) -> Request:
+        return lambda client: client.get(path, headers=auth)
+
+    return {
+        "login": (
+            lambda client: client.post(
+                "/api/v1/login/access-token",
+                data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+            ),
+            False,
+        ),
+        "list_users": (get("/api/v1/users/?limit=100"), False),
+        "reference_classes": (get("/api/v1/reference/classes"), False),
+        "reference_courses": (get("/api/v1/reference/courses"), False),
+        "upload_csv": (
+            lambda client: client.post(
+                "/api/v1/students/upload-csv",
+                headers=auth,
+                files={"file": ("bench.csv", upload_csv, "text/csv")},
+            ),
+            True,
+        ),
+    }
+
+
+def compare(
+    results: list[ScenarioResult], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Regressions vs baseline: p95 slower or throughput lower than tolerance"""
+    regressions = []
+    previous = {r["name"]: r for r in baseline.get("results", [])}
+    for result in results:
+        base = previous.get(result.name)
+        if not base:
+            continue
+        if base["p95_ms"] and result.p95_ms > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p95 {result.p95_ms}ms > baseline {base['p95_ms']}ms"
+            )
+        if base["throughput_rps"] and result.throughput_rps < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput_rps}rps < baseline {base['throughput_rps']}rps"
+            )
+    return regressions
+
+
+def print_report(results: list[ScenarioResult]) -> None:
+    header = f"{'scenario':<20}{'reqs':>8}{'err':>6}{'rps':>10}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'rssMB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.name:<20}{r.requests:>8}{r.errors:>6}{r.throughput_rps:>10}"
+            f"{r.p50_ms:>10}{r.p95_ms:>10}{r.p99_ms:>10}{r.max_rss_mb:>9}"
+        )
+
+
+async def drive(args: argparse.Namespace, base_url: str, server_pid: int) -> list[ScenarioResult]:
+    from benchmarks.seed import build_students_csv
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        token = await login(client)
+    upload_csv = build_students_csv(args.upload_rows, existing_students=args.students)
+
+    results = []
+    for name, (request, heavy) in build_scenarios(token, upload_csv).items():
+        if args.scenarios and name not in args.scenarios:
+            continue
+        print(f"Running {name}...")
+        results.append(
+            await run_scenario(
+                name,
+                request,
+                base_url=base_url,
+                clients=min(args.clients, args.upload_requests) if heavy else args.clients,
+                duration=args.duration,
+                max_requests=args.upload_requests if heavy else None,
+                server_pid=server_pid,
+            )
+        )
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--scores-per-student", type=int, default=5)
+    parser.add_argument("--upload-rows", type=int, default=1_000)
+    parser.add_argument("--upload-requests", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per scenario")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenarios to run")
+    parser.add_argument("--allow-drop", action="store_true", help="allow seeding (drop_all) a PostgreSQL database")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the existing database")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--save-baseline", type=Path, help="write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.database == "postgres" and not args.skip_seed and not args.allow_drop:
+        print("Seeding drops every table, pass --allow-drop for a throwaway PostgreSQL database")
+        return 2
+    workdir = Path(tempfile.mkdtemp(prefix="fsi-bench-")) if args.database == "sqlite" else REPO_ROOT
+    env = build_env(args)
+    # benchmarks.seed imports app settings in this process too
+    os.environ.update(env)
+    if not args.skip_seed:
+        seed(args, env, workdir)
+
+    port = free_port()
+    server = start_server(args, env, workdir, port)
+    try:
+        results = asyncio.run(drive(args, f"http://127.0.0.1:{port}", server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print_report(results)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "results": [asdict(r) for r in results],
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(report, indent=2))
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
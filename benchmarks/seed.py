@@ -0,0 +1,176 @@
+"""
+Synthetic data for benchmarks: roles, admin user, majors, intakes, classes,
+courses, students and scores, inserted with batched Core INSERTs.
+"""
+import csv
+import random
+from datetime import date, timedelta
+from io import StringIO
+
+from sqlalchemy import Engine, insert
+from sqlmodel import SQLModel
+
+from app.core.security import get_password_hash
+from app.core.text import normalize_name
+from app.models import Class, Course, Intake, Major, Role, Score, Student, User
+
+BATCH_SIZE = 10_000
+
+LAST_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Hoang", "Huynh", "Phan", "Vu", "Vo", "Dang"]
+MIDDLE_NAMES = ["Van", "Thi", "Minh", "Ngoc", "Duc", "Thanh", "Quoc", "Gia"]
+FIRST_NAMES = ["An", "Binh", "Chi", "Dung", "Giang", "Hoa", "Khanh", "Linh", "Nam", "Trang"]
+
+
+def student_id(index: int) -> str:
+    return f"SV{index:07d}"
+
+
+def random_fullname(rng: random.Random) -> str:
+    return " ".join(
+        (rng.choice(LAST_NAMES), rng.choice(MIDDLE_NAMES), rng.choice(FIRST_NAMES))
+    )
+
+
+def _insert_batches(engine: Engine, table: object, rows: list[dict[str, object]]) -> None:
+    with engine.begin() as conn:
+        for start in range(0, len(rows), BATCH_SIZE):
+            conn.execute(insert(table), rows[start : start + BATCH_SIZE])  # type: ignore[arg-type]
+
+
+def seed_database(
+    engine: Engine,
+    *,
+    students: int,
+    scores_per_student: int,
+    admin_email: str,
+    admin_password: str,
+    classes: int = 50,
+    courses: int = 40,
+    seed: int = 42,
+) -> None:
+    """Create all tables and fill them with `students` synthetic students"""
+    rng = random.Random(seed)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    _insert_batches(
+        engine,
+        Role,
+        [
+            {"role_id": 1, "role_name": "Admin", "is_superuser": True},
+            {"role_id": 2, "role_name": "Teacher", "is_superuser": False},
+        ],
+    )
+    _insert_batches(
+        engine,
+        User,
+        [
+            {
+                "user_id": 1,
+                "email": admin_email,
+                "fullname": "Benchmark Admin",
+                "hashed_password": get_password_hash(admin_password),
+                "is_active": True,
+                "role_id": 1,
+                "del_flag": False,
+            }
+        ],
+    )
+    _insert_batches(
+        engine, Major, [{"major_id": i, "major_name": f"Major {i}"} for i in range(1, 6)]
+    )
+    _insert_batches(
+        engine,
+        Intake,
+        [
+            {"intake_id": i, "kdb": f"K{60 + i}", "tdc": str(2020 + i), "sum_tc": 150}
+            for i in range(1, 5)
+        ],
+    )
+    _insert_batches(
+        engine,
+        Class,
+        [
+            {
+                "class_id": i,
+                "class_name": f"CLASS{i:03d}",
+                "major_id": rng.randint(1, 5),
+                "intake_id": rng.randint(1, 4),
+                "user_id": 1,
+            }
+            for i in range(1, classes + 1)
+        ],
+    )
+    _insert_batches(
+        engine,
+        Course,
+        [
+            {
+                "course_id": i,
+                "course_name": f"Course {i}",
+                "tcdh": str(rng.choice([2, 3, 4])),
+                "is_bb": rng.random() < 0.6,
+                "major_id": rng.randint(1, 5),
+                "intake_id": rng.randint(1, 4),
+            }
+            for i in range(1, courses + 1)
+        ],
+    )
+
+    base_dob = date(2000, 1, 1)
+    score_id = 1
+    with engine.begin() as conn:
+        for start in range(0, students, BATCH_SIZE):
+            end = min(start + BATCH_SIZE, students)
+            student_rows = [
+                {
+                    "student_id": student_id(i),
+                    "fullname": (fullname := random_fullname(rng)),
+                    "fullname_normalized": normalize_name(fullname),
+                    "dob": base_dob + timedelta(days=rng.randint(0, 2000)),
+                    "gpa": round(rng.uniform(1.0, 4.0), 2),
+                    "class_id": rng.randint(1, classes),
+                }
+                for i in range(start, end)
+            ]
+            conn.execute(insert(Student), student_rows)
+
+            score_rows = []
+            for i in range(start, end):
+                for course_id in rng.sample(range(1, courses + 1), scores_per_student):
+                    score_rows.append(
+                        {
+                            "id_score": score_id,
+                            "student_id": student_id(i),
+                            "course_id": course_id,
+                            "score": round(rng.uniform(0, 10), 1),
+                        }
+                    )
+                    score_id += 1
+            if score_rows:
+                conn.execute(insert(Score), score_rows)
+
+
+def build_students_csv(
+    rows: int, *, existing_students: int, classes: int = 50, seed: int = 7
+) -> bytes:
+    """CSV for /students/upload-csv, half updates of existing students, half new"""
+    rng = random.Random(seed)
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["student_id", "fullname", "dob", "gpa", "class_id"])
+    for i in range(rows):
+        if existing_students and i % 2 == 0:
+            index = rng.randrange(existing_students)
+        else:
+            index = existing_students + i
+        writer.writerow(
+            [
+                student_id(index),
+                random_fullname(rng),
+                f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2001",
+                round(rng.uniform(1.0, 4.0), 2),
+                rng.randint(1, classes),
+            ]
+        )
+    return buffer.getvalue().encode("utf-8")
@@ -26,6 +26,8 @@ def create_tables():
         score_model,
         student_model,
         upload_history_model,
+        upload_history_monthly_model,
+        user_archive_model,
         user_model,
     )
     
@@ -0,0 +1,9 @@
+import os
+
+# Settings cần các biến môi trường này; test chạy trên SQLite, không cần .env
+os.environ.setdefault("PROJECT_NAME", "test")
+os.environ.setdefault("POSTGRES_SERVER", "sqlite")
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("FIRST_SUPERUSER", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "test-password")
+os.environ.setdefault("FIRST_SUPERUSER_NAME", "Admin")
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionRejected, ImportAdmission, LocalClusterSlots
+
+
+def test_cluster_slots_are_shared_between_workers() -> None:
+    slots = LocalClusterSlots(1)
+    workers = [
+        ImportAdmission(
+            max_concurrent=2,
+            max_queue=1,
+            queue_timeout_seconds=0.1,
+            cluster_slots=slots,
+        )
+        for _ in range(2)
+    ]
+
+    async def run() -> None:
+        async with workers[0].slot():
+            # Worker kia còn slot riêng nhưng cluster đã hết slot
+            with pytest.raises(AdmissionRejected):
+                async with workers[1].slot():
+                    pass
+        async with workers[1].slot():
+            assert workers[1].active == 1
+
+    asyncio.run(run())
+    assert slots._used == 0
+    assert workers[1].rejected_total == 1
@@ -0,0 +1,22 @@
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.grading import credits_sql, parse_credits
+from app.models import Course
+
+TCDH = ["3", "2.5", " 4 ", "", "3(2-1)", "abc", "1e3", None]
+
+
+def test_credits_sql_matches_parse_credits() -> None:
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [Course(course_id=i, course_name=f"C{i}", tcdh=v) for i, v in enumerate(TCDH)]
+        )
+        session.commit()
+        result = session.exec(
+            select(Course.tcdh, credits_sql(Course.tcdh)).order_by(Course.course_id)
+        ).all()
+
+    assert [parse_credits(v) for v in TCDH] == [3.0, 2.5, 4.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    assert [credits for _, credits in result] == [parse_credits(v) for v in TCDH]
@@ -0,0 +1,51 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.middleware import RateLimitMiddleware
+from app.core.rate_limit import LocalRateLimitBackend, RateLimiter, RateLimitRule
+
+
+async def login(request: Request) -> JSONResponse:
+    form = await request.form()
+    return JSONResponse({"username": form.get("username")})
+
+
+def _client(client: str) -> TestClient:
+    return TestClient(_app, client=(client, 50000))
+
+
+_app = RateLimitMiddleware(
+    Starlette(routes=[Route("/login", login, methods=["POST"])]),
+    limiter=RateLimiter(LocalRateLimitBackend()),
+    routes={"POST /login": RateLimitRule("login", 100, 0)},
+    username_routes={"POST /login": RateLimitRule("login_username", 3, 0)},
+)
+
+
+def test_login_is_limited_per_username_across_ips() -> None:
+    codes = [
+        _client(f"10.0.0.{i}")
+        .post("/login", data={"username": "Admin@Example.com ", "password": "x"})
+        .status_code
+        for i in range(4)
+    ]
+    assert codes == [200, 200, 200, 429]
+
+    # multipart cũng bị đếm, username không phân biệt hoa thường
+    response = _client("10.0.0.9").post(
+        "/login", files={"username": (None, "admin@example.com"), "password": (None, "x")}
+    )
+    assert response.status_code == 429
+
+    other = _client("10.0.0.1").post("/login", data={"username": "other", "password": "x"})
+    assert other.status_code == 200
+    # Body đã đọc được phát lại cho route
+    assert other.json() == {"username": "other"}
+
+
+def test_oversized_login_body_is_rejected() -> None:
+    body = {"username": "u", "password": "x" * (RateLimitMiddleware.MAX_FORM_BYTES + 1)}
+    assert _client("10.0.1.1").post("/login", data=body).status_code == 413
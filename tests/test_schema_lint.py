@@ -0,0 +1,5 @@
+from app.core.schema_lint import lint
+
+
+def test_models_pass_schema_lint() -> None:
+    assert lint() == []
@@ -0,0 +1,44 @@
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.scope import StudentScope, restrict_session
+from app.models import Class, Score, Student
+
+
+def _session() -> Session:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all([Class(class_id=1, class_name="C1"), Class(class_id=2, class_name="C2")])
+    session.add_all(
+        [
+            Student(student_id="S1", fullname="A", class_id=1),
+            Student(student_id="S2", fullname="B", class_id=2),
+            Score(student_id="S1", score=8),
+            Score(student_id="S2", score=9),
+        ]
+    )
+    session.commit()
+    return session
+
+
+def test_restricted_session_hides_students_and_scores_outside_scope() -> None:
+    with _session() as session:
+        restrict_session(session, StudentScope(class_ids=frozenset({1})))
+
+        assert session.exec(select(Student.student_id)).all() == ["S1"]
+        assert session.exec(select(Score.student_id)).all() == ["S1"]
+        assert session.get(Student, "S2") is None
+
+
+def test_all_students_opt_out_and_unrestricted() -> None:
+    with _session() as session:
+        restrict_session(session, StudentScope(class_ids=frozenset()))
+        assert session.exec(select(Student.student_id)).all() == []
+        unscoped = select(Student.student_id).execution_options(all_students=True)
+        assert sorted(session.exec(unscoped).all()) == ["S1", "S2"]
+
+        restrict_session(session, StudentScope())
+        assert sorted(session.exec(select(Student.student_id)).all()) == ["S1", "S2"]
@@ -0,0 +1,102 @@
+import time
+from io import BytesIO
+from typing import Any
+
+from fastapi import UploadFile
+from sqlalchemy import insert
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.api.schemas.student import ClassStats
+from app.api.services.student_rank_service import gpa_rank_index
+from app.api.services.student_service import StudentService
+from app.api.services.student_stats_service import class_stats_cache
+from app.core.scope import StudentScope
+from app.models import Class, Student, User
+
+CSV = "student_id,fullname,class_id\nS1,Nguyen Van A,1\nS2,Tran Thi B,1\n"
+
+
+def _session() -> Session:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all(
+        [
+            User(user_id=1, email="t@example.com", hashed_password="x"),
+            Class(class_id=1, class_name="C1", user_id=1),
+            Class(class_id=2, class_name="C2"),
+        ]
+    )
+    session.commit()
+    return session
+
+
+def _import(
+    session: Session, scope: StudentScope, racing_class_id: int | None = None
+) -> Any:
+    """
+    Import CSV; racing_class_id: 1 import khác tạo S1 trong class này giữa lúc
+    đọc sinh viên đã có và lúc ghi
+    """
+    service = StudentService(session)
+    upsert_statement = service._upsert_statement
+
+    def racing_upsert_statement() -> Any:
+        session.execute(
+            insert(Student).values(
+                student_id="S1", fullname="Concurrent", class_id=racing_class_id
+            )
+        )
+        return upsert_statement()
+
+    if racing_class_id is not None:
+        service._upsert_statement = racing_upsert_statement  # type: ignore[method-assign]
+    user = session.get(User, 1)
+    file = UploadFile(BytesIO(CSV.encode()), filename="s.csv")
+    return service.import_students_from_csv(file, user, scope=scope)
+
+
+def test_concurrent_insert_of_same_student_is_upserted() -> None:
+    with _session() as session:
+        result = _import(session, StudentScope(), racing_class_id=2)
+
+        assert (result.status, result.success_count, result.errors) == ("COMPLETED", 2, [])
+        assert session.exec(select(Student.fullname).order_by(Student.student_id)).all() == [
+            "Nguyen Van A",
+            "Tran Thi B",
+        ]
+
+
+def test_concurrent_insert_outside_scope_is_rejected() -> None:
+    with _session() as session:
+        result = _import(session, StudentScope(class_ids=frozenset({1})), racing_class_id=2)
+
+        assert (result.status, result.success_count) == ("COMPLETED", 1)
+        assert [(e.row, e.student_id) for e in result.errors] == [(1, "S1")]
+        s1 = session.get(Student, "S1")
+        assert (s1.fullname, s1.class_id) == ("Concurrent", 2)
+
+
+def test_import_leaves_class_stats_and_ranks_to_events() -> None:
+    with _session() as session:
+        class_stats_cache.bump()
+        class_stats_cache.put_many(
+            {2: ClassStats(class_id=2, student_count=0)}, class_stats_cache.version
+        )
+        gpa_rank_index.bump("classes")
+        assert gpa_rank_index.start_build()
+        gpa_rank_index.build([], gpa_rank_index.generation, time.monotonic())
+
+        _import(session, StudentScope())
+        # Class 2 không bị ảnh hưởng: import không xóa toàn bộ cache,
+        # rank index không phải build lại
+        assert list(class_stats_cache.get_many([2])) == [2]
+        assert not gpa_rank_index.stale
+
+        session.add(Student(student_id="S9", fullname="Direct", class_id=2))
+        session.commit()
+        assert class_stats_cache.get_many([2]) == {}
+        assert gpa_rank_index.stale
@@ -0,0 +1,45 @@
+import time
+
+from app.api.services.student_rank_service import GpaRankIndex
+
+ROWS = [("S1", 3.0, 1, None, None), ("S2", 2.0, 1, None, None)]
+
+
+def _built(ttl_seconds: float = 60) -> GpaRankIndex:
+    index = GpaRankIndex(ttl_seconds=ttl_seconds)
+    assert index.start_build()
+    index.build(ROWS, index.generation, time.monotonic())
+    return index
+
+
+def test_student_write_keeps_index_until_rebuilt() -> None:
+    index = _built()
+    assert not index.stale and not index.start_build()
+
+    index.bump("students")
+    assert index.built and index.stale
+    assert index.lookup("S2")[1]["class_rank"].rank == 2
+
+    assert index.start_build()
+    updated = [("S1", 3.0, 1, None, None), ("S2", 4.0, 1, None, None)]
+    index.build(updated, index.generation, time.monotonic())
+    assert not index.stale
+    assert index.lookup("S2")[1]["class_rank"].rank == 1
+
+
+def test_write_during_build_leaves_index_stale() -> None:
+    index = _built()
+    index.bump("students")
+    assert index.start_build()
+    started_at = time.monotonic()
+    index.bump("students")
+    index.build(ROWS, index.generation, started_at)
+    assert index.built and index.stale
+
+
+def test_class_write_drops_index_and_ttl_expires() -> None:
+    index = _built()
+    index.bump("classes")
+    assert not index.built and index.lookup("S1") is None
+
+    assert _built(ttl_seconds=0).stale
@@ -0,0 +1,72 @@
+import time
+
+from app.api.services.student_search_service import TrigramIndex
+
+
+def test_exact_match_survives_common_postings() -> None:
+    index = TrigramIndex()
+    rows = [(f"A{i}", "tran thi hoa", 1) for i in range(5000)]
+    rows += [(f"B{i}", "nguyen van hung", 1) for i in range(50000)]
+    rows.append(("EXACT", "nguyen van hoa", 1))
+    index.build(rows)
+
+    results = index.search("nguyen van hoa", 10)
+
+    assert results[0][0] == "EXACT"
+
+
+def test_scope_is_applied_before_truncation() -> None:
+    index = TrigramIndex()
+    rows = [(f"N{i}", f"nguyen van hung {i}", 2) for i in range(TrigramIndex.MAX_CANDIDATES * 2)]
+    rows.append(("MINE", "nguyen thi lan", 1))
+    index.build(rows)
+
+    assert [sid for sid, _ in index.search("nguyen van hung", 10, frozenset({1}))] == ["MINE"]
+    assert index.search("nguyen van hung", 10, frozenset()) == []
+
+
+def test_upsert_moves_student_between_classes() -> None:
+    index = TrigramIndex()
+    index.build([("S1", "vo minh duc", 1)])
+
+    index.upsert([("S1", "vo minh duc", 2)])
+
+    assert index.search("vo minh duc", 5, frozenset({1})) == []
+    assert [sid for sid, _ in index.search("vo minh duc", 5, frozenset({2}))] == ["S1"]
+
+
+def test_upsert_replaces_name_and_compacts() -> None:
+    count = TrigramIndex.COMPACT_MIN_TOMBSTONES
+    index = TrigramIndex()
+    index.build([(f"S{i}", f"le van an {i}", 1) for i in range(count)])
+
+    index.upsert([(f"S{i}", "pham thi binh", 1) for i in range(count)])
+
+    assert index._tombstones == 0
+    assert index._names == ["pham thi binh"]
+    assert index.search("le van an", 5) == []
+    assert [sid for sid, _ in index.search("pham thi binh", 3)] == ["S0", "S1", "S2"]
+
+
+def test_stale_after_ttl() -> None:
+    index = TrigramIndex(ttl_seconds=0)
+    assert index.stale
+    index.build([("S1", "vo minh duc", None)])
+    assert index.stale
+    fresh = TrigramIndex(ttl_seconds=60)
+    fresh.build([("S1", "vo minh duc", None)])
+    assert not fresh.stale
+
+
+def test_single_builder_and_write_during_build_leaves_index_stale() -> None:
+    index = TrigramIndex(ttl_seconds=60)
+    assert index.start_build()
+    assert not index.start_build()
+    started_at = time.monotonic()
+    index.mark_written()
+    index.build([("S1", "vo minh duc", None)], started_at)
+    assert index.built and index.stale
+
+    assert index.start_build()
+    index.build([("S1", "vo minh duc", None)], time.monotonic())
+    assert not index.stale and not index.start_build()
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from app.api.services.upload_history_service import UploadHistoryService, month_start
+from app.models import User
+from app.models.upload_history_model import UploadHistory
+from app.models.upload_history_monthly_model import UploadHistoryMonthly
+
+
+def _session() -> Session:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all(
+        [
+            User(user_id=1, email="a@example.com", hashed_password="x"),
+            User(user_id=2, email="b@example.com", hashed_password="x"),
+        ]
+    )
+    session.commit()
+    return session
+
+
+def test_keyset_pagination_returns_every_row_once_newest_first() -> None:
+    with _session() as session:
+        now = datetime(2026, 10, 1, 12, 0)
+        # Nhiều entry cùng created_at: thứ tự phải ổn định theo id
+        for i in range(25):
+            session.add(
+                UploadHistory(
+                    file_name=f"f{i}.csv",
+                    created_at=now - timedelta(minutes=i // 3),
+                    created_by_id=1 if i % 5 else 2,
+                )
+            )
+        session.commit()
+
+        service = UploadHistoryService(session)
+        seen = []
+        cursor = None
+        while True:
+            page = service.list_history(user_id=1, cursor=cursor, limit=4)
+            assert len(page.data) <= 4
+            seen += [(h.created_at, h.id) for h in page.data]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        expected = session.exec(
+            select(UploadHistory.created_at, UploadHistory.id).where(
+                UploadHistory.created_by_id == 1
+            )
+        ).all()
+        assert len(seen) == len(set(seen)) == 20
+        assert seen == sorted(expected, reverse=True)
+
+
+def test_compact_moves_old_rows_into_monthly_summaries() -> None:
+    with _session() as session:
+        old = datetime.combine(month_start(datetime.utcnow().date(), -14), datetime.min.time())
+        recent = datetime.utcnow() - timedelta(days=1)
+        session.add_all(
+            [
+                UploadHistory(
+                    file_name="a.csv", status="COMPLETED", total_processed=10,
+                    success_count=9, failure_count=1, created_at=old, created_by_id=1,
+                ),
+                UploadHistory(
+                    file_name="b.csv", status="FAILED", total_processed=5,
+                    failure_count=5, created_at=old + timedelta(days=2), created_by_id=1,
+                ),
+                UploadHistory(
+                    file_name="c.csv", status="COMPLETED", created_at=old, created_by_id=2,
+                ),
+                UploadHistory(file_name="d.csv", created_at=recent, created_by_id=1),
+            ]
+        )
+        session.commit()
+
+        service = UploadHistoryService(session)
+        assert service.compact(retention_months=12) == 3
+        assert session.exec(select(UploadHistory.file_name)).all() == ["d.csv"]
+
+        summary = service.list_monthly(user_id=1)
+        assert len(summary) == 1
+        assert summary[0].month == old.date()
+        assert (summary[0].uploads, summary[0].completed, summary[0].failed) == (2, 1, 1)
+        assert (
+            summary[0].total_processed,
+            summary[0].success_count,
+            summary[0].failure_count,
+        ) == (15, 9, 6)
+
+        # Chạy lại không gộp 2 lần
+        assert service.compact(retention_months=12) == 0
+        assert session.exec(select(func.count()).select_from(UploadHistoryMonthly)).one() == 2